@@ -4,7 +4,7 @@ from sqlalchemy import pool
 from alembic import context
 from app.core.config import settings
 from app.db.base_class import Base
-from app.models import user, health_record, risk_assessment, insurance_policy
+from app.models import user, health_record, risk_assessment, insurance_policy, insurance_product, job_checkpoint
 
 config = context.config
 
@@ -0,0 +1,38 @@
+"""composite index for keyset pagination of risk assessments
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_risk_assessments_user_id_created_at_id'
+
+
+def upgrade() -> None:
+    # Tables may already carry the index if they were created by init_db
+    if not op.get_context().as_sql:
+        existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('risk_assessments')}
+        if INDEX_NAME in existing:
+            return
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(
+                INDEX_NAME, 'risk_assessments', ['user_id', 'created_at', 'id'],
+                postgresql_concurrently=True
+            )
+    else:
+        op.create_index(INDEX_NAME, 'risk_assessments', ['user_id', 'created_at', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='risk_assessments')
@@ -0,0 +1,43 @@
+"""per-user pointer to the latest risk assessment
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('latest_risk_assessments'):
+        return
+    op.create_table(
+        'latest_risk_assessments',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('risk_assessment_id', sa.Integer(), sa.ForeignKey('risk_assessments.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    # Backfill from existing history, newest (created_at, id) per user
+    op.execute(
+        """
+        INSERT INTO latest_risk_assessments (user_id, risk_assessment_id, created_at)
+        SELECT user_id, id, created_at FROM (
+            SELECT user_id, id, created_at,
+                   row_number() OVER (PARTITION BY user_id ORDER BY created_at DESC, id DESC) AS rank
+            FROM risk_assessments
+        ) ranked
+        WHERE rank = 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('latest_risk_assessments')
@@ -0,0 +1,35 @@
+"""index health records on (user_id, date) for metric range reads
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'ix_health_records_user_id_date'
+
+
+def upgrade() -> None:
+    # Tables may already carry the index if they were created by init_db
+    if not op.get_context().as_sql:
+        existing = {index['name'] for index in sa.inspect(op.get_bind()).get_indexes('health_records')}
+        if INDEX_NAME in existing:
+            return
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(INDEX_NAME, 'health_records', ['user_id', 'date'], postgresql_concurrently=True)
+    else:
+        op.create_index(INDEX_NAME, 'health_records', ['user_id', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name='health_records')
@@ -0,0 +1,33 @@
+"""checkpoints for resumable batch jobs
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('job_checkpoints'):
+        return
+    op.create_table(
+        'job_checkpoints',
+        sa.Column('job_id', sa.String(), primary_key=True),
+        sa.Column('position', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('state', sa.JSON(), nullable=False),
+        sa.Column('completed', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_checkpoints')
@@ -0,0 +1,30 @@
+"""record the model version behind each risk assessment
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Tables may already have the column if they were created by init_db
+    if not op.get_context().as_sql:
+        existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('risk_assessments')}
+        if 'model_version' in existing:
+            return
+    # Nullable without a default, so adding it does not rewrite the table
+    op.add_column('risk_assessments', sa.Column('model_version', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('risk_assessments', 'model_version')
@@ -0,0 +1,115 @@
+"""typed, indexed health_data columns for cohort queries
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('age', sa.Integer),
+    ('bmi', sa.Float),
+    ('smoking_status', sa.String),
+    ('exercise_frequency', sa.String),
+]
+INDEXES = [
+    ('risk_assessments', 'ix_risk_assessments_smoking_status_age', ['smoking_status', 'age'], False),
+    ('risk_assessments', 'ix_risk_assessments_age', ['age'], False),
+    ('risk_assessments', 'ix_risk_assessments_overall_risk_score', ['overall_risk_score'], False),
+    ('risk_assessments', 'ix_risk_assessments_cardiovascular_risk', ['cardiovascular_risk'], False),
+    ('risk_assessments', 'ix_risk_assessments_diabetes_risk', ['diabetes_risk'], False),
+    ('latest_risk_assessments', 'ix_latest_risk_assessments_risk_assessment_id', ['risk_assessment_id'], True),
+]
+GIN_INDEX = 'ix_risk_assessments_health_data'
+
+# Same coercion as app.models.risk_assessment.promoted_columns: wrongly typed values become NULL
+POSTGRESQL_BACKFILL = """
+    UPDATE risk_assessments SET
+        age = CASE WHEN jsonb_typeof(health_data -> 'age') = 'number'
+                   THEN round((health_data ->> 'age')::numeric)::integer END,
+        bmi = CASE WHEN jsonb_typeof(health_data -> 'bmi') = 'number'
+                   THEN (health_data ->> 'bmi')::double precision END,
+        smoking_status = CASE WHEN jsonb_typeof(health_data -> 'smoking_status') = 'string'
+                              THEN health_data ->> 'smoking_status' END,
+        exercise_frequency = CASE WHEN jsonb_typeof(health_data -> 'exercise_frequency') = 'string'
+                                  THEN health_data ->> 'exercise_frequency' END
+"""
+SQLITE_BACKFILL = """
+    UPDATE risk_assessments SET
+        age = CASE WHEN json_type(health_data, '$.age') IN ('integer', 'real')
+                   THEN CAST(round(json_extract(health_data, '$.age')) AS INTEGER) END,
+        bmi = CASE WHEN json_type(health_data, '$.bmi') IN ('integer', 'real')
+                   THEN json_extract(health_data, '$.bmi') END,
+        smoking_status = CASE WHEN json_type(health_data, '$.smoking_status') = 'text'
+                              THEN json_extract(health_data, '$.smoking_status') END,
+        exercise_frequency = CASE WHEN json_type(health_data, '$.exercise_frequency') = 'text'
+                                  THEN json_extract(health_data, '$.exercise_frequency') END
+"""
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    existing_columns, existing_indexes = {}, set()
+    # Tables may already have the columns and indexes if they were created by init_db
+    if not op.get_context().as_sql:
+        inspector = sa.inspect(op.get_bind())
+        existing_columns = {column['name']: column['type'] for column in inspector.get_columns('risk_assessments')}
+        existing_indexes = {
+            index['name']
+            for table in ('risk_assessments', 'latest_risk_assessments')
+            for index in inspector.get_indexes(table)
+        }
+
+    if dialect == 'postgresql' and not isinstance(existing_columns.get('health_data'), postgresql.JSONB):
+        # Binary JSON so containment filters can use a GIN index; rewrites the table once
+        op.alter_column(
+            'risk_assessments', 'health_data',
+            type_=postgresql.JSONB(), postgresql_using='health_data::jsonb'
+        )
+
+    # Nullable without defaults, so adding them does not rewrite the table; the backfill does
+    missing = [(name, type_) for name, type_ in COLUMNS if name not in existing_columns]
+    for name, type_ in missing:
+        op.add_column('risk_assessments', sa.Column(name, type_(), nullable=True))
+    if missing:
+        op.execute(POSTGRESQL_BACKFILL if dialect == 'postgresql' else SQLITE_BACKFILL)
+
+    indexes = [index for index in INDEXES if index[1] not in existing_indexes]
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for table, name, columns, unique in indexes:
+                op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+            if GIN_INDEX not in existing_indexes:
+                op.create_index(
+                    GIN_INDEX, 'risk_assessments', ['health_data'],
+                    postgresql_using='gin', postgresql_ops={'health_data': 'jsonb_path_ops'},
+                    postgresql_concurrently=True
+                )
+    else:
+        for table, name, columns, unique in indexes:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index(GIN_INDEX, table_name='risk_assessments')
+    for table, name, columns, unique in INDEXES:
+        op.drop_index(name, table_name=table)
+    for name, _ in COLUMNS:
+        op.drop_column('risk_assessments', name)
+    if dialect == 'postgresql':
+        op.alter_column(
+            'risk_assessments', 'health_data',
+            type_=sa.JSON(), postgresql_using='health_data::json'
+        )
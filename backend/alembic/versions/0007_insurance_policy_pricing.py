@@ -0,0 +1,42 @@
+"""record deductible and pricing inputs on insurance policies
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+COLUMNS = [
+    ('deductible', sa.Float, None),
+    ('risk_assessment_id', sa.Integer, 'risk_assessments.id'),
+    ('risk_adjustment_factor', sa.Float, None),
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    existing = set()
+    # Tables may already have the columns if they were created by init_db
+    if not op.get_context().as_sql:
+        existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('insurance_policies')}
+    # Nullable without defaults, so adding them does not rewrite the table; existing
+    # policies keep NULL pricing inputs since they were priced client-side
+    for name, type_, target in COLUMNS:
+        if name not in existing:
+            # SQLite cannot add a constraint to an existing table; the column is still added
+            foreign_keys = [sa.ForeignKey(target)] if target and dialect != 'sqlite' else []
+            op.add_column('insurance_policies', sa.Column(name, type_(), *foreign_keys, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(COLUMNS):
+        op.drop_column('insurance_policies', name)
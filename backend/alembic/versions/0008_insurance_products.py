@@ -0,0 +1,53 @@
+"""insurance product catalog
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+POLICY_TYPES = ('HEALTH', 'LIFE', 'CRITICAL_ILLNESS', 'DISABILITY')
+
+
+def upgrade() -> None:
+    if not op.get_context().as_sql and sa.inspect(op.get_bind()).has_table('insurance_products'):
+        return
+    op.create_table(
+        'insurance_products',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('provider', sa.String(), nullable=True),
+        # Same enum type as insurance_policies.policy_type, which already exists on Postgres
+        sa.Column(
+            'policy_type',
+            sa.Enum(*POLICY_TYPES, name='policytype').with_variant(
+                postgresql.ENUM(*POLICY_TYPES, name='policytype', create_type=False), 'postgresql'
+            ),
+            nullable=False
+        ),
+        sa.Column('coverage_amount', sa.Float(), nullable=False),
+        sa.Column('base_premium', sa.Float(), nullable=False),
+        sa.Column('min_age', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('max_age', sa.Integer(), nullable=False, server_default='120'),
+        sa.Column('max_overall_risk_score', sa.Float(), nullable=False, server_default='1.0'),
+        sa.Column('target_profile', sa.JSON(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.true()),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_insurance_products_id', 'insurance_products', ['id'])
+    op.create_index('ix_insurance_products_updated_at', 'insurance_products', ['updated_at'])
+
+
+def downgrade() -> None:
+    op.drop_table('insurance_products')
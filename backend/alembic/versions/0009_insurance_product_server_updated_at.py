@@ -0,0 +1,27 @@
+"""stamp insurance_products.updated_at with the database clock
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Batch mode so SQLite, which cannot alter a column default, recreates the table
+    with op.batch_alter_table('insurance_products') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('insurance_products') as batch_op:
+        batch_op.alter_column('updated_at', existing_type=sa.DateTime(), server_default=None)
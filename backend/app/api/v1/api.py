@@ -1,5 +1,9 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import risk_assessment
+from app.api.v1.endpoints import cohort, health_records, policies, profile, risk_assessment
 
 api_router = APIRouter()
-api_router.include_router(risk_assessment.router, prefix="/risk-assessment", tags=["risk-assessment"]) 
\ No newline at end of file
+api_router.include_router(risk_assessment.router, prefix="/risk-assessment", tags=["risk-assessment"])
+api_router.include_router(health_records.router, prefix="/health-records", tags=["health-records"])
+api_router.include_router(profile.router, prefix="/profile", tags=["profile"])
+api_router.include_router(cohort.router, prefix="/cohort", tags=["cohort"])
+api_router.include_router(policies.router, prefix="/policies", tags=["policies"])
\ No newline at end of file
@@ -0,0 +1,104 @@
+from typing import Any, List
+from fastapi import APIRouter, Depends
+from sqlalchemy import Integer, func, literal_column, select, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import deps
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.models.user import User
+from app.schemas.cohort import CohortQuery, CohortSummary
+
+router = APIRouter()
+
+# Every filter below maps onto a typed column, so nothing is parsed out of JSON per row. Only age,
+# smoking_status and the overall, cardiovascular and diabetes scores are indexed (migration 0006);
+# the other columns are checked on the rows those indexes and the latest-pointer join select
+RANGE_COLUMNS = {
+    name: getattr(RiskAssessment, name)
+    for name in ('age', 'bmi', 'overall_risk_score', 'cardiovascular_risk', 'diabetes_risk',
+                 'respiratory_risk', 'metabolic_risk', 'lifestyle_risk')
+}
+VALUE_COLUMNS = {
+    name: getattr(RiskAssessment, name) for name in ('smoking_status', 'exercise_frequency', 'model_version')
+}
+GROUP_KEYS = {
+    'smoking_status': RiskAssessment.smoking_status,
+    'exercise_frequency': RiskAssessment.exercise_frequency,
+    'model_version': RiskAssessment.model_version,
+    # Inline constants, so Postgres sees the same expression in SELECT and GROUP BY
+    'age_band': (RiskAssessment.age // literal_column('10', Integer)) * literal_column('10', Integer),
+}
+RANGE_OPERATORS = {
+    'gt': lambda column, bound: column > bound,
+    'ge': lambda column, bound: column >= bound,
+    'lt': lambda column, bound: column < bound,
+    'le': lambda column, bound: column <= bound,
+}
+
+def _health_data_filters(matches: dict, dialect_name: str) -> List[Any]:
+    """Exact matches on non-promoted keys: one GIN-indexed containment test on Postgres"""
+    if dialect_name == 'postgresql':
+        return [type_coerce(RiskAssessment.health_data, JSONB).contains(matches)]
+    filters = []
+    for key, value in matches.items():
+        element = RiskAssessment.health_data[key]
+        if isinstance(value, bool):
+            filters.append(element.as_boolean() == value)
+        elif isinstance(value, (int, float)):
+            filters.append(element.as_float() == value)
+        else:
+            filters.append(element.as_string() == value)
+    return filters
+
+def cohort_filters(query_in: CohortQuery, dialect_name: str) -> List[Any]:
+    filters = []
+    for name, column in RANGE_COLUMNS.items():
+        bounds = getattr(query_in, name)
+        if bounds is not None:
+            filters.extend(
+                RANGE_OPERATORS[op](column, bound)
+                for op, bound in bounds.model_dump(exclude_none=True).items()
+            )
+    for name, column in VALUE_COLUMNS.items():
+        values = getattr(query_in, name)
+        if values is not None:
+            filters.append(column.in_(values))
+    if query_in.health_data:
+        filters.extend(_health_data_filters(query_in.health_data, dialect_name))
+    return filters
+
+def cohort_query(query_in: CohortQuery, dialect_name: str) -> Any:
+    """One aggregate statement: member count and averages per group"""
+    keys = [GROUP_KEYS[query_in.group_by].label('key')] if query_in.group_by else []
+    query = select(
+        *keys,
+        func.count().label('members'),
+        *(func.avg(column).label(f'avg_{name}') for name, column in RANGE_COLUMNS.items()),
+        func.max(RiskAssessment.overall_risk_score).label('max_overall_risk_score')
+    ).select_from(RiskAssessment)
+    if query_in.latest_only:
+        query = query.join(LatestRiskAssessment, LatestRiskAssessment.risk_assessment_id == RiskAssessment.id)
+    query = query.where(*cohort_filters(query_in, dialect_name))
+    if keys:
+        query = query.group_by(*keys).order_by(*keys)
+    return query
+
+@router.post("/", response_model=CohortSummary)
+async def query_cohort(
+    *,
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    query_in: CohortQuery,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Size and average risk scores of the members matching every filter.
+
+    Filtering and aggregation run in the database against typed columns; a
+    filter on an indexed column keeps the cost in line with the size of the
+    cohort rather than of the whole table.
+    """
+    result = await db.execute(cohort_query(query_in, db.get_bind().dialect.name))
+    groups = [dict(row._mapping) for row in result]
+    if not query_in.group_by and groups and not groups[0]['members']:
+        groups = []
+    return {'members': sum(group['members'] for group in groups), 'groups': groups}
@@ -0,0 +1,167 @@
+import io
+from datetime import date
+from typing import Any, Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import deps
+from app.models.health_record import HealthRecord
+from app.models.user import User
+from app.db.session import engine
+from app.schemas.health_record import HealthMetricPoint, HealthRecordImportReport
+
+router = APIRouter()
+
+# API metric name -> HealthRecord column; names follow the HealthRecord schema
+METRIC_COLUMNS = {
+    'height': HealthRecord.height,
+    'weight': HealthRecord.weight,
+    'bmi': HealthRecord.bmi,
+    'blood_pressure_systolic': HealthRecord.systolic_bp,
+    'blood_pressure_diastolic': HealthRecord.diastolic_bp,
+    'heart_rate': HealthRecord.heart_rate,
+    'temperature': HealthRecord.temperature,
+    'cholesterol_total': HealthRecord.cholesterol_total,
+    'cholesterol_hdl': HealthRecord.cholesterol_hdl,
+    'cholesterol_ldl': HealthRecord.cholesterol_ldl,
+    'triglycerides': HealthRecord.triglycerides,
+    'blood_sugar': HealthRecord.blood_sugar,
+}
+DEFAULT_METRICS = ['bmi', 'blood_pressure_systolic', 'blood_pressure_diastolic', 'heart_rate']
+MAX_REPORTED_IMPORT_ERRORS = 1000
+# LTTB runs over the min/max of this many SQL buckets per output point (MinMaxLTTB preselection)
+MINMAX_PRESELECT_RATIO = 2
+
+def _bucket_extremes(metrics: List[str], filters: List[Any], n_buckets: int, total: int) -> Any:
+    """Rows holding a bucket's lowest or highest reading of any metric, plus the first and last row.
+
+    Rows are split into ``n_buckets`` equal-count buckets in date order, the
+    same buckets the downsamplers use, so at most ``2 * n_buckets * len(metrics) + 2``
+    real readings come back however many rows the range holds.
+    """
+    order = (HealthRecord.date, HealthRecord.id)
+    readings = select(
+        HealthRecord.id,
+        HealthRecord.date,
+        *(METRIC_COLUMNS[name].label(name) for name in metrics),
+        func.ntile(n_buckets).over(order_by=order).label('bucket'),
+        func.row_number().over(order_by=order).label('position')
+    ).filter(*filters).subquery()
+
+    ranks = []
+    for name in metrics:
+        for direction in ('asc', 'desc'):
+            ranks.append(func.row_number().over(
+                partition_by=readings.c.bucket,
+                order_by=(getattr(readings.c[name], direction)().nulls_last(), readings.c.id)
+            ).label(f"{name}_{direction}"))
+    ranked = select(readings, *ranks).subquery()
+
+    return select(ranked.c.date, *(ranked.c[name] for name in metrics)).filter(or_(
+        ranked.c.position.in_((1, total)),
+        *(ranked.c[rank.name] == 1 for rank in ranks)
+    )).order_by(ranked.c.date, ranked.c.id)
+
+@router.get(
+    "/metrics",
+    response_model=List[HealthMetricPoint],
+    response_model_exclude_unset=True,
+    response_class=ORJSONResponse
+)
+async def read_health_metrics(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    metrics: List[str] = Query(DEFAULT_METRICS),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    points: int = Query(500, ge=3, le=5000),
+    method: Literal['lttb', 'minmax'] = 'lttb',
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Time series of the current user's health metrics, oldest first.
+
+    Only the requested columns are read. Histories longer than ``points``
+    readings are reduced in SQL to the lowest and highest reading of each
+    metric per equal-count bucket, and those candidates are downsampled to at
+    most ``points`` rows, so the rows shipped to the app stay bounded however
+    long the history is.
+    """
+    unknown = sorted(set(metrics) - METRIC_COLUMNS.keys())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown metrics: {', '.join(unknown)}")
+    metrics = list(dict.fromkeys(metrics))
+
+    filters = [HealthRecord.user_id == current_user.id]
+    if start is not None:
+        filters.append(HealthRecord.date >= start)
+    if end is not None:
+        filters.append(HealthRecord.date <= end)
+    total = (await db.execute(select(func.count()).select_from(HealthRecord).filter(*filters))).scalar_one()
+
+    if total <= points:
+        result = await db.execute(
+            select(HealthRecord.date, *(METRIC_COLUMNS[name] for name in metrics))
+            .filter(*filters).order_by(HealthRecord.date, HealthRecord.id)
+        )
+        rows = result.all()
+    else:
+        # numpy stays out of the startup import graph (see benchmarks/cold_start.py)
+        import numpy as np
+        from app.services.downsampling import downsample_rows
+
+        n_buckets = points // 2 if method == 'minmax' else points * MINMAX_PRESELECT_RATIO
+        result = await db.execute(_bucket_extremes(metrics, filters, n_buckets, total))
+        rows = result.all()
+        dates = np.fromiter((row[0].toordinal() for row in rows), dtype=np.float64, count=len(rows))
+        values = np.array([row[1:] for row in rows], dtype=np.float64)  # None -> NaN
+        keep = downsample_rows(dates, values.T, points, method)
+        rows = [rows[i] for i in keep]
+
+    # Points already have the schema's shape (only the requested metrics), so they skip validation
+    return ORJSONResponse([
+        {'date': row[0], **dict(zip(metrics, row[1:]))}
+        for row in rows
+    ])
+
+@router.post("/import", response_model=HealthRecordImportReport)
+def import_health_records(
+    file: UploadFile = File(...),
+    format: Optional[Literal['csv', 'ndjson']] = None,
+    job_id: Optional[str] = None,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Bulk-load health records from a CSV or NDJSON upload.
+
+    The upload is streamed in chunks that commit independently; re-sending the
+    same file (or job_id) after a failure resumes after the last committed chunk.
+    """
+    from app.services import bulk_import
+
+    file.file.seek(0, io.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    job_id = job_id or bulk_import.default_job_id(
+        file.filename or "upload", size, digest=bulk_import.content_digest(file.file)
+    )
+    fmt = format or bulk_import.guess_format(file.filename or "")
+
+    errors: List[Dict[str, Any]] = []
+    truncated = False
+
+    def collect(chunk: "bulk_import.ChunkReport") -> None:
+        nonlocal truncated
+        room = MAX_REPORTED_IMPORT_ERRORS - len(errors)
+        errors.extend({'chunk': chunk.chunk, **error} for error in chunk.errors[:max(room, 0)])
+        truncated = truncated or len(chunk.errors) > room
+
+    source = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        result = bulk_import.import_health_records(engine, source, fmt, job_id, on_chunk=collect)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise HTTPException(status_code=400, detail=f"Could not read upload: {e}")
+    finally:
+        source.detach()
+
+    return {**result.__dict__, 'errors': errors, 'errors_truncated': truncated}
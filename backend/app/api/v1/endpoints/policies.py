@@ -0,0 +1,220 @@
+from datetime import date
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import deps
+from app.models.insurance_policy import InsurancePolicy, PolicyStatus, PolicyType
+from app.models.insurance_product import InsuranceProduct
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.models.user import User
+from app.schemas.insurance_policy import PolicyCreate, PolicyQuotePage, PolicyResponse
+from app.schemas.insurance_product import ProductCreate, ProductRecommendationPage, ProductResponse, ProductUpdate
+from app.services import runtime
+
+router = APIRouter()
+
+async def _latest_assessment(db: AsyncSession, current_user: User) -> RiskAssessment:
+    result = await db.execute(
+        select(RiskAssessment).join(
+            LatestRiskAssessment, LatestRiskAssessment.risk_assessment_id == RiskAssessment.id
+        ).filter(LatestRiskAssessment.user_id == current_user.id)
+    )
+    risk_assessment = result.scalars().first()
+    if risk_assessment is None:
+        raise HTTPException(status_code=404, detail="No risk assessment yet; quotes are priced from the latest one")
+    return risk_assessment
+
+def _quote_options(
+    risk_assessment: RiskAssessment,
+    policy_types: Optional[List[PolicyType]],
+    coverage_amount: Optional[float] = None,
+    deductible: Optional[float] = None
+) -> List[dict]:
+    quote_engine = runtime.get_quote_engine()
+    risk_scores = {name: getattr(risk_assessment, name) for name in quote_engine.dimensions}
+    try:
+        quotes = quote_engine.quote(risk_scores, policy_types)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return quote_engine.options(quotes, coverage_amount, deductible)
+
+@router.get("/quotes", response_model=PolicyQuotePage)
+async def read_policy_quotes(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    policy_type: Optional[List[PolicyType]] = Query(None),
+    coverage_amount: Optional[float] = None,
+    deductible: Optional[float] = None,
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Premiums for every offered policy type, coverage tier and deductible,
+    priced from the current user's latest risk assessment.
+    """
+    risk_assessment = await _latest_assessment(db, current_user)
+    return {
+        'risk_assessment_id': risk_assessment.id,
+        'quotes': _quote_options(risk_assessment, policy_type, coverage_amount, deductible)
+    }
+
+def _age(risk_assessment: RiskAssessment, user: User) -> int:
+    """Age recorded with the assessment, else today's age from the profile"""
+    if risk_assessment.age is not None:
+        return int(risk_assessment.age)
+    today, born = date.today(), user.date_of_birth
+    return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+async def _index_product(db: AsyncSession, product: InsuranceProduct) -> None:
+    """Visible to this process's index at once; other processes pick it up on their next refresh"""
+    product_index = runtime.get_product_index()
+    await product_index.refresh(db)
+    product_index.apply([product])
+
+@router.get("/recommendations", response_model=ProductRecommendationPage)
+async def read_policy_recommendations(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    policy_type: Optional[List[PolicyType]] = Query(None),
+    k: int = Query(5, ge=1, le=100),
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    The k products the current user is eligible for whose target risk profile
+    is closest to their latest risk assessment, best match first.
+    """
+    risk_assessment = await _latest_assessment(db, current_user)
+    product_index = runtime.get_product_index()
+    await product_index.refresh(db)
+    matches = product_index.search(
+        _age(risk_assessment, current_user),
+        {name: getattr(risk_assessment, name) for name in product_index.dimensions},
+        risk_assessment.overall_risk_score,
+        policy_type,
+        k
+    )
+    return {
+        'risk_assessment_id': risk_assessment.id,
+        'recommendations': [
+            {
+                'id': entry.id,
+                'name': entry.name,
+                'provider': entry.provider,
+                'policy_type': entry.policy_type,
+                'coverage_amount': entry.coverage_amount,
+                'base_premium': entry.base_premium,
+                'match_score': match_score,
+            }
+            for entry, match_score in matches
+        ]
+    }
+
+@router.post("/products", response_model=ProductResponse)
+async def create_product(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_in: ProductCreate,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Add a product to the catalog.
+    """
+    if product_in.max_age < product_in.min_age:
+        raise HTTPException(status_code=400, detail="max_age must not be below min_age")
+    product = InsuranceProduct(**product_in.model_dump())
+    db.add(product)
+    await db.commit()
+    await _index_product(db, product)
+    return product
+
+@router.put("/products/{product_id}", response_model=ProductResponse)
+async def update_product(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_id: int,
+    product_in: ProductUpdate,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Update a product; set is_active to false to withdraw it.
+    """
+    product = await db.get(InsuranceProduct, product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    for field, value in product_in.model_dump(exclude_unset=True).items():
+        setattr(product, field, value)
+    if product.max_age < product.min_age:
+        raise HTTPException(status_code=400, detail="max_age must not be below min_age")
+    await db.commit()
+    await _index_product(db, product)
+    return product
+
+@router.delete("/products/{product_id}", response_model=ProductResponse)
+async def delete_product(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    product_id: int,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Withdraw a product. It is kept, inactive, so every process's index sees the removal.
+    """
+    product = await db.get(InsuranceProduct, product_id)
+    if product is None:
+        raise HTTPException(status_code=404, detail="Product not found")
+    product.is_active = False
+    await db.commit()
+    await _index_product(db, product)
+    return product
+
+@router.get("/", response_model=List[PolicyResponse])
+async def read_policies(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    The current user's policies, most recent start date first.
+    """
+    result = await db.execute(
+        select(InsurancePolicy).filter(InsurancePolicy.user_id == current_user.id)
+        .order_by(InsurancePolicy.start_date.desc(), InsurancePolicy.id.desc())
+    )
+    return result.scalars().all()
+
+@router.post("/", response_model=PolicyResponse)
+async def create_policy(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    policy_in: PolicyCreate,
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Apply for a policy at the premium quoted from the current user's latest
+    risk assessment. The policy starts out pending.
+    """
+    if policy_in.end_date <= policy_in.start_date:
+        raise HTTPException(status_code=400, detail="end_date must be after start_date")
+    risk_assessment = await _latest_assessment(db, current_user)
+    options = _quote_options(
+        risk_assessment, [policy_in.policy_type], policy_in.coverage_amount, policy_in.deductible
+    )
+    if not options:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{policy_in.policy_type.value} is not offered with that coverage amount and deductible"
+        )
+
+    policy = InsurancePolicy(
+        user_id=current_user.id,
+        policy_type=policy_in.policy_type,
+        status=PolicyStatus.PENDING,
+        coverage_amount=policy_in.coverage_amount,
+        deductible=policy_in.deductible,
+        premium=options[0]['premium'],
+        risk_assessment_id=risk_assessment.id,
+        risk_adjustment_factor=options[0]['risk_adjustment_factor'],
+        start_date=policy_in.start_date,
+        end_date=policy_in.end_date
+    )
+    db.add(policy)
+    await db.flush()
+    await db.commit()
+    return policy
@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from app.api import deps
+from app.db.pagination import keyset_page, split_page
+from app.models.health_record import HealthRecord
+from app.models.insurance_policy import InsurancePolicy
+from app.models.risk_assessment import RiskAssessment
+from app.models.user import User
+from app.schemas.profile import UserProfile, UserProfilePage
+
+router = APIRouter()
+
+# Collection -> newest-first ordering used both to pick the recent rows and to return them
+RECENT_ORDER = {
+    'health_records': (HealthRecord, (HealthRecord.date.desc(), HealthRecord.id.desc())),
+    'risk_assessments': (RiskAssessment, (RiskAssessment.created_at.desc(), RiskAssessment.id.desc())),
+    'insurance_policies': (InsurancePolicy, (InsurancePolicy.start_date.desc(), InsurancePolicy.id.desc())),
+}
+SORT_KEYS = {
+    'health_records': lambda record: (record.date, record.id),
+    'risk_assessments': lambda assessment: (assessment.created_at, assessment.id),
+    'insurance_policies': lambda policy: (policy.start_date, policy.id),
+}
+
+def _recent(model: Any, order_by: Sequence[Any], user_ids: List[int], limit: int) -> Any:
+    """Criteria keeping each user's ``limit`` newest rows; ranks only the users being loaded"""
+    ranked = select(
+        model.id,
+        func.row_number().over(partition_by=model.user_id, order_by=order_by).label('position')
+    ).where(model.user_id.in_(user_ids)).subquery()
+    return model.id.in_(select(ranked.c.id).where(ranked.c.position <= limit))
+
+def profile_options(user_ids: List[int], limit: int) -> List[Any]:
+    """One selectin query per collection, whatever the number of users"""
+    return [
+        selectinload(getattr(User, name).and_(_recent(model, order_by, user_ids, limit)))
+        for name, (model, order_by) in RECENT_ORDER.items()
+    ]
+
+async def load_profiles(db: AsyncSession, user_ids: List[int], limit: int) -> List[Dict[str, Any]]:
+    """Profiles for ``user_ids`` in the given order: one query for the users plus one per collection"""
+    if not user_ids:
+        return []
+    result = await db.execute(
+        select(User).where(User.id.in_(user_ids)).options(*profile_options(user_ids, limit))
+        .execution_options(populate_existing=True)
+    )
+    users = {user.id: user for user in result.scalars().all()}
+    return [
+        dict(
+            {name: sorted(getattr(users[user_id], name), key=SORT_KEYS[name], reverse=True) for name in RECENT_ORDER},
+            user=users[user_id]
+        )
+        for user_id in user_ids if user_id in users
+    ]
+
+@router.get("/me", response_model=UserProfile)
+async def read_my_profile(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    recent: int = Query(5, ge=1, le=50),
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    The current user's profile with their most recent health records, risk
+    assessments and policies, loaded in a fixed number of queries.
+    """
+    profiles = await load_profiles(db, [current_user.id], recent)
+    if not profiles:
+        raise HTTPException(status_code=404, detail="User not found")
+    return profiles[0]
+
+@router.get("/", response_model=UserProfilePage)
+async def read_profiles(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    recent: int = Query(5, ge=1, le=50),
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Member profiles, newest members first, for admin views.
+
+    The page costs the same number of queries however many members it holds.
+    """
+    try:
+        query = keyset_page(select(User.id, User.created_at), User, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await db.execute(query)
+
+    rows, next_cursor = split_page(result.all(), limit)
+    items = await load_profiles(db, [row.id for row in rows], recent)
+    return {'items': items, 'next_cursor': next_cursor}
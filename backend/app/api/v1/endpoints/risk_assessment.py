@@ -1,32 +1,128 @@
-from typing import Any, Dict, List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import asyncio
+from typing import Any, Dict, List, Literal, Optional
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.api import deps
-from app.services.risk_assessment import RiskAssessmentService
+from app.core.config import settings
+from app.core.request_metrics import timed_inference
+from app.db.pagination import keyset_page, split_page
+from app.db.projection import project_rows, schema_columns
+from app.db.session import async_read_engine, engine
+from app.db.upsert import dialect_insert
+from app.services import runtime
+from app.services.export import EXPORT_FORMATS, ExportFormatUnavailable, column_kind, make_encoder, stream_export
+from app.services.inference_pool import PoolShutdownError
+from app.services.inference_queue import QueueFullError
+from app.services.rescoring import rescore_latest_assessments
 from app.schemas.risk_assessment import (
     RiskAssessmentCreate,
     RiskAssessmentUpdate,
     RiskAssessmentInDB,
-    RiskAssessmentResponse
+    RiskAssessmentResponse,
+    RiskAssessmentPage,
+    RiskAssessmentBatchRequest,
+    RiskAssessmentBatchResponse,
+    ModelVersionActivate,
+    ModelVersionInfo
 )
-from app.models.risk_assessment import RiskAssessment
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
 from app.models.user import User
 
 router = APIRouter()
-risk_service = RiskAssessmentService()
+
+# Columns the export endpoint can project, in default output order
+EXPORT_COLUMNS = {
+    column.name: column for column in RiskAssessment.__table__.columns
+}
+# Columns behind RiskAssessmentInDB, for list pages encoded without per-row validation
+LIST_COLUMNS = schema_columns(RiskAssessment, RiskAssessmentInDB)
+
+async def _get_owned_assessment(
+    db: AsyncSession, risk_assessment_id: int, current_user: User
+) -> RiskAssessment:
+    result = await db.execute(
+        select(RiskAssessment).filter(
+            RiskAssessment.id == risk_assessment_id,
+            RiskAssessment.user_id == current_user.id
+        )
+    )
+    return result.scalars().first()
+
+async def _advance_latest(db: AsyncSession, risk_assessment: RiskAssessment) -> None:
+    """Point the owner's latest-assessment row at ``risk_assessment`` unless a newer one won"""
+    table = LatestRiskAssessment.__table__
+    stmt = dialect_insert(db.get_bind().dialect.name, table).values(
+        user_id=risk_assessment.user_id,
+        risk_assessment_id=risk_assessment.id,
+        created_at=risk_assessment.created_at
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={
+            'risk_assessment_id': stmt.excluded.risk_assessment_id,
+            'created_at': stmt.excluded.created_at
+        },
+        where=tuple_(table.c.created_at, table.c.risk_assessment_id)
+        < tuple_(stmt.excluded.created_at, stmt.excluded.risk_assessment_id)
+    )
+    await db.execute(stmt)
+
+async def _rewind_latest(db: AsyncSession, risk_assessment: RiskAssessment) -> None:
+    """Move the owner's pointer off ``risk_assessment`` before it is deleted"""
+    result = await db.execute(
+        select(LatestRiskAssessment).filter(
+            LatestRiskAssessment.user_id == risk_assessment.user_id
+        ).with_for_update()
+    )
+    latest = result.scalars().first()
+    if latest is None or latest.risk_assessment_id != risk_assessment.id:
+        return
+
+    # Newest remaining row, read straight off the (user_id, created_at, id) index
+    result = await db.execute(
+        select(RiskAssessment.id, RiskAssessment.created_at).filter(
+            RiskAssessment.user_id == risk_assessment.user_id,
+            RiskAssessment.id != risk_assessment.id
+        ).order_by(RiskAssessment.created_at.desc(), RiskAssessment.id.desc()).limit(1)
+    )
+    successor = result.first()
+    if successor is None:
+        await db.delete(latest)
+    else:
+        latest.risk_assessment_id, latest.created_at = successor
+    await db.flush()
 
 @router.post("/", response_model=RiskAssessmentResponse)
-def create_risk_assessment(
+async def create_risk_assessment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     risk_assessment_in: RiskAssessmentCreate,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
     Create new risk assessment for the current user.
     """
-    # Perform risk assessment
-    risk_scores = risk_service.assess_risk(risk_assessment_in.health_data)
+    # Perform risk assessment, batched with concurrent requests unless cached
+    risk_service = await runtime.get_risk_service_async()
+    try:
+        risk_service.check_record(risk_assessment_in.health_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    risk_scores = risk_service.get_cached(risk_assessment_in.health_data)
+    if risk_scores is None:
+        try:
+            with timed_inference():
+                risk_scores = await runtime.get_risk_batcher().submit(risk_assessment_in.health_data)
+        except (ValueError, TypeError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except (QueueFullError, PoolShutdownError):
+            raise HTTPException(status_code=503, detail="Risk scoring is overloaded, retry shortly")
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504, detail="Risk scoring timed out")
+        risk_service.put_cached(risk_assessment_in.health_data, risk_scores)
     
     # Create risk assessment record
     risk_assessment = RiskAssessment(
@@ -38,45 +134,194 @@ def create_risk_assessment(
         metabolic_risk=risk_scores['metabolic_risk'],
         lifestyle_risk=risk_scores['lifestyle_risk'],
         recommendations=risk_scores['recommendations'],
-        health_data=risk_assessment_in.health_data
+        health_data=risk_assessment_in.health_data,
+        model_version=risk_scores['model_version']
     )
     
+    # Column defaults are generated client-side, so no refresh round trip is needed
     db.add(risk_assessment)
-    db.commit()
-    db.refresh(risk_assessment)
+    await db.flush()
+    await _advance_latest(db, risk_assessment)
+    await db.commit()
     
     return risk_assessment
 
-@router.get("/", response_model=List[RiskAssessmentInDB])
-def read_risk_assessments(
-    db: Session = Depends(deps.get_db),
-    skip: int = 0,
-    limit: int = 100,
-    current_user: User = Depends(deps.get_current_user)
+@router.post("/batch", response_model=RiskAssessmentBatchResponse)
+def assess_risk_batch(
+    *,
+    batch_in: RiskAssessmentBatchRequest,
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
-    Retrieve risk assessments for the current user.
+    Score a columnar batch of applicants without persisting the results.
     """
-    risk_assessments = db.query(RiskAssessment).filter(
-        RiskAssessment.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
-    
-    return risk_assessments
+    try:
+        with timed_inference():
+            results = runtime.get_risk_service().assess_batch(batch_in.health_data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        field: values if field == 'recommendations' else values.tolist()
+        for field, values in results.items()
+    }
+
+@router.get("/inference/stats")
+def read_inference_stats(
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Batch-size and queue-wait metrics of the inference scheduler.
+    """
+    return dict(
+        runtime.get_risk_batcher().stats(),
+        risk_score_cache=runtime.get_risk_service().score_cache.stats()
+    )
+
+@router.get("/inference/health")
+def read_inference_health(
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Ping the scoring worker processes, restarting the pool if it is broken.
+    """
+    inference_pool = runtime.get_inference_pool()
+    if inference_pool is None:
+        return {'workers': 0, 'healthy': True}
+    return inference_pool.health_check()
+
+@router.get("/model", response_model=ModelVersionInfo)
+def read_model_version(
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Model version serving requests in this process and the versions available.
+    """
+    risk_service = runtime.get_risk_service()
+    risk_service.refresh_if_changed()
+    return {
+        'current_version': risk_service.model_version,
+        'available_versions': risk_service.registry.versions()
+    }
+
+@router.post("/model/activate", response_model=ModelVersionInfo)
+def activate_model_version(
+    *,
+    version_in: ModelVersionActivate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Hot-swap the active model version without a restart.
+
+    In-flight requests finish on the version they started with; other worker
+    processes pick the new version up within MODEL_REGISTRY_POLL_S seconds.
+    With ``rescore``, stored latest assessments are re-scored after the
+    response is sent (see app.services.rescoring).
+    """
+    risk_service = runtime.get_risk_service()
+    try:
+        risk_service.activate_version(version_in.version)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if version_in.rescore:
+        background_tasks.add_task(rescore_latest_assessments, engine, risk_service)
+    return {
+        'current_version': risk_service.model_version,
+        'available_versions': risk_service.registry.versions()
+    }
+
+@router.get("/", response_model=RiskAssessmentPage, response_class=ORJSONResponse)
+async def read_risk_assessments(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=500),
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Retrieve risk assessments for the current user, newest first.
+    """
+    query = select(*LIST_COLUMNS.values()).filter(RiskAssessment.user_id == current_user.id)
+    try:
+        query = keyset_page(query, RiskAssessment, cursor, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await db.execute(query)
+
+    rows, next_cursor = split_page(result.all(), limit)
+    return ORJSONResponse({'items': project_rows(LIST_COLUMNS, rows), 'next_cursor': next_cursor})
+
+@router.get("/export")
+async def export_risk_assessments(
+    format: Literal['ndjson', 'csv', 'parquet'] = 'ndjson',
+    columns: Optional[List[str]] = Query(None),
+    user_id: Optional[int] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+    current_user: User = Depends(deps.get_current_active_superuser)
+) -> Any:
+    """
+    Stream every matching risk assessment as NDJSON, CSV or Parquet.
+
+    Rows are read through a server-side cursor and encoded one chunk at a
+    time, so the response starts immediately and memory use stays flat.
+    """
+    columns = list(dict.fromkeys(columns or EXPORT_COLUMNS))
+    unknown = sorted(set(columns) - EXPORT_COLUMNS.keys())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown columns: {', '.join(unknown)}")
+
+    query = select(*(EXPORT_COLUMNS[name] for name in columns))
+    if user_id is not None:
+        query = query.where(RiskAssessment.user_id == user_id)
+    if created_after is not None:
+        query = query.where(RiskAssessment.created_at >= created_after)
+    if created_before is not None:
+        query = query.where(RiskAssessment.created_at < created_before)
+    query = query.order_by(RiskAssessment.id)
+
+    try:
+        encoder = make_encoder(format, columns, {name: column_kind(EXPORT_COLUMNS[name]) for name in columns})
+    except ExportFormatUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    return StreamingResponse(
+        stream_export(async_read_engine, query, encoder, settings.EXPORT_CHUNK_SIZE),
+        media_type=EXPORT_FORMATS[format],
+        headers={'Content-Disposition': f'attachment; filename="risk_assessments.{format}"'}
+    )
+
+@router.get("/latest", response_model=RiskAssessmentInDB)
+async def read_latest_risk_assessment(
+    db: AsyncSession = Depends(deps.get_async_read_db),
+    current_user: User = Depends(deps.get_current_user_async)
+) -> Any:
+    """
+    Get the current user's most recent risk assessment.
+    """
+    result = await db.execute(
+        select(RiskAssessment).join(
+            LatestRiskAssessment, LatestRiskAssessment.risk_assessment_id == RiskAssessment.id
+        ).filter(LatestRiskAssessment.user_id == current_user.id)
+    )
+    risk_assessment = result.scalars().first()
+
+    if not risk_assessment:
+        raise HTTPException(status_code=404, detail="No risk assessment yet")
+
+    return risk_assessment
 
 @router.get("/{risk_assessment_id}", response_model=RiskAssessmentInDB)
-def read_risk_assessment(
+async def read_risk_assessment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_read_db),
     risk_assessment_id: int,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
     Get specific risk assessment by ID.
     """
-    risk_assessment = db.query(RiskAssessment).filter(
-        RiskAssessment.id == risk_assessment_id,
-        RiskAssessment.user_id == current_user.id
-    ).first()
+    risk_assessment = await _get_owned_assessment(db, risk_assessment_id, current_user)
     
     if not risk_assessment:
         raise HTTPException(status_code=404, detail="Risk assessment not found")
@@ -84,20 +329,17 @@ def read_risk_assessment(
     return risk_assessment
 
 @router.put("/{risk_assessment_id}", response_model=RiskAssessmentInDB)
-def update_risk_assessment(
+async def update_risk_assessment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     risk_assessment_id: int,
     risk_assessment_in: RiskAssessmentUpdate,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
     Update a risk assessment.
     """
-    risk_assessment = db.query(RiskAssessment).filter(
-        RiskAssessment.id == risk_assessment_id,
-        RiskAssessment.user_id == current_user.id
-    ).first()
+    risk_assessment = await _get_owned_assessment(db, risk_assessment_id, current_user)
     
     if not risk_assessment:
         raise HTTPException(status_code=404, detail="Risk assessment not found")
@@ -106,31 +348,29 @@ def update_risk_assessment(
     for field, value in risk_assessment_in.dict(exclude_unset=True).items():
         setattr(risk_assessment, field, value)
     
+    # Column defaults are generated client-side, so no refresh round trip is needed
     db.add(risk_assessment)
-    db.commit()
-    db.refresh(risk_assessment)
+    await db.commit()
     
     return risk_assessment
 
 @router.delete("/{risk_assessment_id}")
-def delete_risk_assessment(
+async def delete_risk_assessment(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     risk_assessment_id: int,
-    current_user: User = Depends(deps.get_current_user)
+    current_user: User = Depends(deps.get_current_user_async)
 ) -> Any:
     """
     Delete a risk assessment.
     """
-    risk_assessment = db.query(RiskAssessment).filter(
-        RiskAssessment.id == risk_assessment_id,
-        RiskAssessment.user_id == current_user.id
-    ).first()
+    risk_assessment = await _get_owned_assessment(db, risk_assessment_id, current_user)
     
     if not risk_assessment:
         raise HTTPException(status_code=404, detail="Risk assessment not found")
     
-    db.delete(risk_assessment)
-    db.commit()
+    await _rewind_latest(db, risk_assessment)
+    await db.delete(risk_assessment)
+    await db.commit()
     
     return {"status": "success"} 
\ No newline at end of file
@@ -0,0 +1,66 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+from app.core.metrics import registry
+
+CACHE_HITS = registry.counter('cache_hits_total', 'Cache lookups that found a live entry', ['cache'])
+CACHE_MISSES = registry.counter('cache_misses_total', 'Cache lookups that found nothing usable', ['cache'])
+CACHE_EVICTIONS = registry.counter('cache_evictions_total', 'Entries dropped for size or age', ['cache'])
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds"""
+
+    def __init__(self, name: str, maxsize: int, ttl: float):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = CACHE_HITS.labels(cache=name)
+        self._misses = CACHE_MISSES.labels(cache=name)
+        self._evictions = CACHE_EVICTIONS.labels(cache=name)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= now:
+                del self._entries[key]
+                self._evictions.inc()
+                entry = None
+            if entry is None:
+                self._misses.inc()
+                return None
+            self._entries.move_to_end(key)
+        self._hits.inc()
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._evictions.inc()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        hits, misses = self._hits.value, self._misses.value
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': hits,
+            'misses': misses,
+            'evictions': self._evictions.value,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0
+        }
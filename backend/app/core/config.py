@@ -1,5 +1,6 @@
-from typing import List, Union
-from pydantic import AnyHttpUrl, BaseSettings, validator
+from typing import List, Optional, Union
+from pydantic import AnyHttpUrl, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 import os
 from pathlib import Path
 
@@ -10,7 +11,8 @@ class Settings(BaseSettings):
     # CORS Configuration
     BACKEND_CORS_ORIGINS: List[AnyHttpUrl] = []
 
-    @validator("BACKEND_CORS_ORIGINS", pre=True)
+    @field_validator("BACKEND_CORS_ORIGINS", mode="before")
+    @classmethod
     def assemble_cors_origins(cls, v: Union[str, List[str]]) -> Union[List[str], str]:
         if isinstance(v, str) and not v.startswith("["):
             return [i.strip() for i in v.split(",")]
@@ -24,6 +26,19 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = os.getenv("POSTGRES_PASSWORD", "postgres")
     POSTGRES_DB: str = os.getenv("POSTGRES_DB", "healthcare_analytics")
     SQLALCHEMY_DATABASE_URI: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
+    SQLALCHEMY_READ_REPLICA_URI: Optional[str] = os.getenv("SQLALCHEMY_READ_REPLICA_URI")  # read-only GETs go here when set
+
+    # Connection Pools (per process). The async engine serves API requests; the
+    # sync engine only serves bulk imports, re-scoring, training and CLI jobs.
+    # Connections one process may hold to the primary: DB_POOL_SIZE +
+    # DB_MAX_OVERFLOW + DB_SYNC_POOL_SIZE + DB_SYNC_MAX_OVERFLOW (20 by default).
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_SYNC_POOL_SIZE: int = 2
+    DB_SYNC_MAX_OVERFLOW: int = 3
+    DB_POOL_TIMEOUT_S: float = 30.0
+    DB_POOL_RECYCLE_S: int = 1800
+    DB_STATEMENT_CACHE_SIZE: int = 500  # compiled SQL cache, and asyncpg prepared statements
 
     # JWT Configuration
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -32,7 +47,63 @@ class Settings(BaseSettings):
 
     # Model Configuration
     MODEL_PATH: str = str(Path(__file__).parent.parent.parent / "models")
+    MODEL_REGISTRY_PATH: str = str(Path(__file__).parent.parent.parent / "models" / "registry")
+    MODEL_REGISTRY_POLL_S: float = 5.0
+    WARM_UP_ON_STARTUP: bool = True  # load the model in the background right after startup
+
+    # Feature Store
+    FEATURE_STORE_PATH: str = str(Path(__file__).parent.parent.parent / "models" / "features")
+    FEATURE_STORE_CHUNK_SIZE: int = 10000  # records encoded per refresh step
+    FEATURE_STORE_INITIAL_CAPACITY: int = 65536  # rows preallocated per column, doubled on demand
+    FEATURE_STORE_REFRESH_OVERLAP_S: float = 900.0  # re-read window for rows committed late by long transactions
+    FEATURE_STORE_REFRESH_S: float = 300.0  # background refresh interval in API processes; 0 disables it
+
+    # Training
+    TRAINING_CACHE_PATH: str = str(Path(__file__).parent.parent.parent / "models" / "training-cache")
+    TRAINING_LABEL_THRESHOLD: float = 0.5  # latest overall_risk_score at or above this is high-risk
+    TRAINING_MIN_ROWS: int = 1000
+    TRAINING_CHUNK_ROWS: int = 262144  # feature-store rows copied per step
+    TRAINING_CV_FOLDS: int = 3
+    TRAINING_SEARCH_ROWS: int = 200000  # subsample used for hyperparameter search
+    TRAINING_SEARCH_CANDIDATES: int = 27
+    TRAINING_MAX_ESTIMATORS: int = 300
+
+    # Inference Batching
+    INFERENCE_BATCH_MAX_SIZE: int = 64
+    INFERENCE_BATCH_WINDOW_MS: float = 5.0
+    INFERENCE_QUEUE_MAX_SIZE: int = 1024
+    INFERENCE_REQUEST_TIMEOUT_S: float = 2.0
+    INFERENCE_WORKERS: int = 2  # scoring processes; 0 scores inside the API process
+
+    # Bulk Import
+    IMPORT_CHUNK_SIZE: int = 5000  # rows per validated, committed chunk
+
+    # Export
+    EXPORT_CHUNK_SIZE: int = 5000  # rows fetched per server-side cursor round trip
+
+    # Re-scoring
+    RESCORE_BATCH_SIZE: int = 2000  # members scored and upserted per transaction
+    RESCORE_SLOWDOWN_FACTOR: float = 3.0  # back off when a batch write is this much slower than the fastest
+    RESCORE_MAX_POOL_SATURATION: float = 0.75  # back off while the API pool is this busy (in-process runs)
+    RESCORE_MAX_PAUSE_S: float = 5.0
+
+    # Risk Score Cache
+    RISK_CACHE_MAX_ENTRIES: int = 10000
+    RISK_CACHE_TTL_SECONDS: float = 3600
     
+    # Quoting
+    QUOTE_RATE_TABLE_PATH: Optional[str] = None  # JSON rate table; the built-in table when unset
+    QUOTE_RISK_BUCKET_WIDTH: float = 0.05  # scores are priced at the midpoint of their bucket
+    QUOTE_CACHE_MAX_ENTRIES: int = 10000  # (risk bucket, product) grids
+    QUOTE_CACHE_TTL_SECONDS: float = 3600
+
+    # Product Index
+    PRODUCT_INDEX_MAX_AGE: int = 120  # ages above this match as this age
+    PRODUCT_INDEX_REFRESH_S: float = 5.0  # how stale another process's product changes may be
+
+    # Metrics
+    METRICS_ENABLED: bool = True  # per-route request metrics middleware; /metrics is always served
+
     # API Configuration
     API_PREFIX: str = "/api"
     DEBUG: bool = False
@@ -58,9 +129,7 @@ class Settings(BaseSettings):
             return self.SQLALCHEMY_DATABASE_URI
         return f"postgresql://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_SERVER}/{self.POSTGRES_DB}"
 
-    class Config:
-        case_sensitive = True
-        env_file = ".env"
+    model_config = SettingsConfigDict(case_sensitive=True, env_file=".env")
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
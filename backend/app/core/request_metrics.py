@@ -0,0 +1,123 @@
+"""Per-route request metrics.
+
+``RequestMetricsMiddleware`` times every HTTP request and labels it with the
+matched route template (``/api/v1/risk-assessment/{risk_assessment_id}``, not
+the raw path), so series stay bounded. While a request runs, a
+``RequestStats`` object is bound to a context variable; the database engine
+events, the pool checkout timer and the inference batcher add to it, and the
+middleware turns the totals into per-route histograms when the request ends.
+
+Context variables follow the request into ``run_in_threadpool`` and into
+SQLAlchemy's async greenlets, so sync endpoints and AsyncSession queries are
+attributed to the right request.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Optional
+from starlette.routing import Match
+from app.core.metrics import SIZE_BUCKETS, registry
+
+UNMATCHED_ROUTE = 'unmatched'
+
+REQUESTS = registry.counter('http_requests_total', 'HTTP requests handled', ['method', 'route', 'status'])
+REQUEST_LATENCY = registry.histogram(
+    'http_request_duration_seconds', 'Time from request start to the end of the response body', ['method', 'route']
+)
+IN_FLIGHT = registry.gauge('http_requests_in_flight', 'Requests currently being handled', ['method', 'route'])
+REQUEST_DB_QUERIES = registry.histogram(
+    'http_request_db_queries', 'SQL statements executed per request', ['route'], buckets=(0,) + SIZE_BUCKETS
+)
+REQUEST_DB_TIME = registry.histogram(
+    'http_request_db_seconds', 'Time per request spent executing SQL', ['route']
+)
+REQUEST_POOL_WAIT = registry.histogram(
+    'http_request_db_pool_wait_seconds', 'Time per request spent waiting for pooled connections', ['route']
+)
+REQUEST_INFERENCE_TIME = registry.histogram(
+    'http_request_inference_seconds', 'Time per request spent waiting for model scoring', ['route']
+)
+
+
+@dataclass
+class RequestStats:
+    db_queries: int = 0
+    db_seconds: float = 0.0
+    pool_wait_seconds: float = 0.0
+    inference_calls: int = 0
+    inference_seconds: float = 0.0
+
+
+_current_stats: ContextVar[Optional[RequestStats]] = ContextVar('request_stats', default=None)
+
+
+def current_stats() -> Optional[RequestStats]:
+    """Stats of the request being handled, or None outside a request"""
+    return _current_stats.get()
+
+
+@contextmanager
+def timed_inference() -> Iterator[None]:
+    """Charge the enclosed model call to the current request"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.inference_calls += 1
+            stats.inference_seconds += time.perf_counter() - started
+
+
+def resolve_route(app: Any, scope: dict) -> str:
+    """Path template of the route ``scope`` will be dispatched to"""
+    partial = None
+    for route in getattr(getattr(app, 'router', None), 'routes', ()):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return route.path_format
+        if match is Match.PARTIAL and partial is None:
+            partial = route.path_format  # path matched, method did not: the app answers 405
+    return partial or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """Pure ASGI middleware, so it adds no extra task or body buffering per request"""
+
+    def __init__(self, app: Callable):
+        self.app = app
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        route = resolve_route(scope.get('app'), scope)
+        in_flight = IN_FLIGHT.labels(method=method, route=route)
+        stats = RequestStats()
+        token = _current_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_LATENCY.labels(method=method, route=route).observe(time.perf_counter() - started)
+            in_flight.dec()
+            _current_stats.reset(token)
+            REQUESTS.labels(method=method, route=route, status=status).inc()
+            REQUEST_DB_QUERIES.labels(route=route).observe(stats.db_queries)
+            if stats.db_queries:
+                REQUEST_DB_TIME.labels(route=route).observe(stats.db_seconds)
+                REQUEST_POOL_WAIT.labels(route=route).observe(stats.pool_wait_seconds)
+            if stats.inference_calls:
+                REQUEST_INFERENCE_TIME.labels(route=route).observe(stats.inference_seconds)
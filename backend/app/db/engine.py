@@ -0,0 +1,149 @@
+import time
+from typing import Any, Dict, Tuple
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.metrics import registry
+from app.core.request_metrics import current_stats
+
+POOL_CHECKOUT_WAIT = registry.histogram(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection', ['pool']
+)
+POOL_IN_USE = registry.gauge('db_pool_connections_in_use', 'Connections currently checked out', ['pool'])
+POOL_SATURATION = registry.gauge(
+    'db_pool_saturation', 'Checked-out connections over pool_size + max_overflow', ['pool']
+)
+POOL_TIMEOUTS = registry.counter('db_pool_timeouts_total', 'Checkouts that gave up waiting', ['pool'])
+QUERIES = registry.counter('db_queries_total', 'SQL statements executed', ['pool'])
+QUERY_TIME = registry.histogram('db_query_seconds', 'Time to execute one SQL statement', ['pool'])
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+class _TimedCheckoutMixin:
+    """Records how long each checkout waited for a free connection"""
+
+    def _do_get(self) -> Any:
+        pool_name = self.logging_name or 'default'
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.labels(pool=pool_name).inc()
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            POOL_CHECKOUT_WAIT.labels(pool=pool_name).observe(waited)
+            stats = current_stats()
+            if stats is not None:
+                stats.pool_wait_seconds += waited
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def get_async_database_url(url: str) -> str:
+    """Swap the sync DBAPI driver for its asyncio counterpart (asyncpg / aiosqlite)"""
+    parsed = make_url(url)
+    return parsed.set(drivername=ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def _pool_budget(is_async: bool) -> Tuple[int, int]:
+    """(pool_size, max_overflow): async engines serve requests, sync engines only batch jobs"""
+    if is_async:
+        return settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW
+    return settings.DB_SYNC_POOL_SIZE, settings.DB_SYNC_MAX_OVERFLOW
+
+
+def _engine_options(url: str, name: str, is_async: bool) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        'pool_pre_ping': True,
+        'pool_logging_name': name,
+        'query_cache_size': settings.DB_STATEMENT_CACHE_SIZE,
+    }
+    backend = make_url(url).get_backend_name()
+    if backend == 'sqlite':
+        # SQLite picks its own pool class; sizing options don't apply
+        return options
+    pool_size, max_overflow = _pool_budget(is_async)
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_recycle=settings.DB_POOL_RECYCLE_S,
+        pool_timeout=settings.DB_POOL_TIMEOUT_S,
+    )
+    if is_async and backend == 'postgresql':
+        options['connect_args'] = {'prepared_statement_cache_size': settings.DB_STATEMENT_CACHE_SIZE}
+    return options
+
+
+def _track_pool_usage(engine: Engine, name: str, is_async: bool) -> None:
+    capacity = sum(_pool_budget(is_async))
+    in_use = POOL_IN_USE.labels(pool=name)
+    saturation = POOL_SATURATION.labels(pool=name)
+
+    def update(*args: Any) -> None:
+        checked_out = engine.pool.checkedout() if hasattr(engine.pool, 'checkedout') else 0
+        in_use.set(checked_out)
+        saturation.set(checked_out / capacity if capacity else 0.0)
+
+    event.listen(engine, 'checkout', update)
+    event.listen(engine, 'checkin', update)
+
+
+def _track_queries(engine: Engine, name: str) -> None:
+    """Count and time every statement, globally and for the current request"""
+    queries = QUERIES.labels(pool=name)
+    query_time = QUERY_TIME.labels(pool=name)
+
+    def before_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                              executemany: bool) -> None:
+        context._query_started = time.perf_counter()
+
+    def after_cursor_execute(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any,
+                             executemany: bool) -> None:
+        elapsed = time.perf_counter() - context._query_started
+        queries.inc()
+        query_time.observe(elapsed)
+        stats = current_stats()
+        if stats is not None:
+            stats.db_queries += 1
+            stats.db_seconds += elapsed
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', after_cursor_execute)
+
+
+def create_db_engine(url: str, name: str = 'primary') -> Engine:
+    """Sync engine configured from Settings, with pool and query metrics labelled ``name``"""
+    engine = create_engine(url, **_engine_options(url, name, is_async=False))
+    _track_pool_usage(engine, name, is_async=False)
+    _track_queries(engine, name)
+    return engine
+
+
+def create_async_db_engine(url: str, name: str = 'primary') -> AsyncEngine:
+    """Async engine configured from Settings, with pool and query metrics labelled ``name``"""
+    async_url = get_async_database_url(url)
+    engine = create_async_engine(async_url, **_engine_options(async_url, name, is_async=True))
+    _track_pool_usage(engine.sync_engine, name, is_async=True)
+    _track_queries(engine.sync_engine, name)
+    return engine
+
+
+def pool_saturation(name: str = 'async_primary') -> float:
+    """Latest saturation reading for a pool, 0.0 when it has not been used"""
+    return POOL_SATURATION.labels(pool=name).value
@@ -0,0 +1,25 @@
+"""Response rows straight from projected columns.
+
+List endpoints select just the columns their response schema exposes and hand
+the rows to ``ORJSONResponse``. The values come from the database, which
+already enforces the schema's types, so building a Pydantic object per row
+(and re-validating nested JSON) would only repeat work; the endpoint keeps its
+``response_model`` for the OpenAPI contract.
+"""
+from typing import Any, Dict, List, Sequence, Type
+from pydantic import BaseModel
+
+
+def schema_columns(model: Any, schema: Type[BaseModel]) -> Dict[str, Any]:
+    """Column behind each field of ``schema``, in field order; fields must be named after columns"""
+    table = model.__table__
+    missing = sorted(set(schema.model_fields) - set(table.c.keys()))
+    if missing:
+        raise ValueError(f"{schema.__name__} fields without a {table.name} column: {', '.join(missing)}")
+    return {name: table.c[name] for name in schema.model_fields}
+
+
+def project_rows(columns: Dict[str, Any], rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Rows selected from ``columns.values()`` as dicts keyed by field name"""
+    names = list(columns)
+    return [dict(zip(names, row)) for row in rows]
@@ -0,0 +1,44 @@
+"""Statement counting for tests and benchmarks.
+
+    with assert_query_count(5):
+        client.get("/api/v1/profile/me", headers=auth)
+
+Listens on the engines' ``before_cursor_execute`` event, so every statement
+is seen whichever session, thread or event loop issued it.
+"""
+from contextlib import contextmanager
+from typing import Any, Iterator, List
+from sqlalchemy import event
+
+
+def _default_engines() -> List[Any]:
+    from app.db.session import async_engine, async_read_engine, engine
+    return list({id(e): e for e in (engine, async_engine, async_read_engine)}.values())
+
+
+@contextmanager
+def count_queries(*engines: Any) -> Iterator[List[str]]:
+    """Collect the SQL of every statement run on ``engines`` (default: the app's engines)"""
+    targets = [getattr(e, 'sync_engine', e) for e in engines or _default_engines()]
+    statements: List[str] = []
+
+    def record(conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool) -> None:
+        statements.append(statement)
+
+    for target in targets:
+        event.listen(target, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        for target in targets:
+            event.remove(target, 'before_cursor_execute', record)
+
+
+@contextmanager
+def assert_query_count(expected: int, *engines: Any) -> Iterator[List[str]]:
+    """Fail with the offending statements unless exactly ``expected`` ran inside the block"""
+    with count_queries(*engines) as statements:
+        yield statements
+    if len(statements) != expected:
+        listing = "\n".join(f"  {i + 1}. {statement}" for i, statement in enumerate(statements))
+        raise AssertionError(f"Expected {expected} queries, {len(statements)} ran:\n{listing}")
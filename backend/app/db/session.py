@@ -1,14 +1,26 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.engine import create_async_db_engine, create_db_engine, get_async_database_url  # noqa: F401
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+# The only engines in the process: every session factory and dependency binds to these.
+# The sync engine gets the small DB_SYNC_* budget, since requests go through the async one.
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI, name="primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_db_engine(settings.SQLALCHEMY_DATABASE_URI, name="async_primary")
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+if settings.SQLALCHEMY_READ_REPLICA_URI:
+    async_read_engine = create_async_db_engine(settings.SQLALCHEMY_READ_REPLICA_URI, name="async_replica")
+else:
+    async_read_engine = async_engine
+AsyncReadSessionLocal = async_sessionmaker(async_read_engine, autoflush=False, expire_on_commit=False)
+
 # Dependency
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
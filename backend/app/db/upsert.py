@@ -0,0 +1,12 @@
+from typing import Any
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+
+def dialect_insert(dialect_name: str, table: Any) -> Insert:
+    """INSERT construct with ``on_conflict_do_*`` for the dialects we deploy on"""
+    if dialect_name == 'postgresql':
+        return postgresql.insert(table)
+    if dialect_name == 'sqlite':
+        return sqlite.insert(table)
+    raise NotImplementedError(f"Upsert is not supported on {dialect_name}")
@@ -1,7 +1,13 @@
+import asyncio
+from typing import Any, Dict
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.core.config import settings
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, registry
+from app.core.request_metrics import RequestMetricsMiddleware
 from app.api.v1.api import api_router
+from app.services import runtime
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -18,4 +24,35 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
-app.include_router(api_router, prefix=settings.API_V1_STR) 
\ No newline at end of file
+if settings.METRICS_ENABLED:
+    app.add_middleware(RequestMetricsMiddleware)
+
+app.include_router(api_router, prefix=settings.API_V1_STR) 
+
+@app.get("/health")
+async def health_check() -> Dict[str, Any]:
+    """Liveness: the process is up, whether or not the model is loaded yet"""
+    return {"status": "healthy"}
+
+@app.get("/ready")
+async def readiness_check() -> JSONResponse:
+    """Readiness: 503 until the model is loaded and scoring workers are warm"""
+    if not runtime.is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    return JSONResponse(content={"status": "ready"})
+
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus scrape endpoint for this process's metrics"""
+    return Response(registry.render_prometheus(), headers={"Content-Type": PROMETHEUS_CONTENT_TYPE})
+
+@app.on_event("startup")
+async def startup_warm_up() -> None:
+    if settings.WARM_UP_ON_STARTUP:
+        # Don't block startup: /health answers while the model loads
+        asyncio.get_running_loop().run_in_executor(None, runtime.warm_up)
+    runtime.start_feature_refresh()
+
+@app.on_event("shutdown")
+async def shutdown_inference() -> None:
+    await runtime.shutdown()
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, String
+from sqlalchemy import Column, Integer, Float, Date, DateTime, ForeignKey, String, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base_class import Base
 
 class HealthRecord(Base):
     __tablename__ = "health_records"
+    __table_args__ = (
+        # Date-range reads of one member's history (metrics endpoint)
+        Index("ix_health_records_user_id_date", "user_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -45,6 +49,4 @@ class HealthRecord(Base):
     # Medical History
     chronic_conditions = Column(String)  # JSON string of conditions
     medications = Column(String)  # JSON string of medications
-    allergies = Column(String)  # JSON string of allergies
-    
-    risk_assessments = relationship("RiskAssessment", back_populates="health_record") 
\ No newline at end of file
+    allergies = Column(String)  # JSON string of allergies 
\ No newline at end of file
@@ -24,7 +24,11 @@ class InsurancePolicy(Base):
     policy_type = Column(Enum(PolicyType), nullable=False)
     status = Column(Enum(PolicyStatus), nullable=False, default=PolicyStatus.PENDING)
     coverage_amount = Column(Float, nullable=False)
+    deductible = Column(Float)
     premium = Column(Float, nullable=False)
+    # Pricing inputs, recorded when the premium is quoted server-side (app.services.quoting)
+    risk_assessment_id = Column(Integer, ForeignKey("risk_assessments.id"))
+    risk_adjustment_factor = Column(Float)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,35 @@
+from sqlalchemy import Boolean, Column, DateTime, Enum, Float, Index, Integer, JSON, String
+from sqlalchemy.sql import func
+from datetime import datetime
+from app.db.base_class import Base
+from app.models.insurance_policy import PolicyType
+
+class InsuranceProduct(Base):
+    """A policy an insurer offers, with who is eligible and which risk profile it is designed for"""
+    __tablename__ = "insurance_products"
+    __table_args__ = (
+        # Other processes poll for products changed since their last read (app.services.product_index)
+        Index("ix_insurance_products_updated_at", "updated_at"),
+    )
+    # Read the server-assigned updated_at back on every flush, so the index watermark can use it
+    __mapper_args__ = {'eager_defaults': True}
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    provider = Column(String)
+    policy_type = Column(Enum(PolicyType), nullable=False)
+    coverage_amount = Column(Float, nullable=False)
+    base_premium = Column(Float, nullable=False)  # annual, before risk adjustment
+
+    # Eligibility
+    min_age = Column(Integer, nullable=False, default=0)
+    max_age = Column(Integer, nullable=False, default=120)
+    max_overall_risk_score = Column(Float, nullable=False, default=1.0)
+
+    # Risk dimension -> score of the members the product is designed for; missing dimensions count as 0.5
+    target_profile = Column(JSON, nullable=False, default=dict)
+    # Retired products are deactivated rather than deleted, so every process's index sees the change
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Database clock, not each process's: pollers compare it with a watermark taken from other writers
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
@@ -0,0 +1,13 @@
+from sqlalchemy import Boolean, Column, DateTime, Integer, JSON, String
+from datetime import datetime
+from app.db.base_class import Base
+
+class JobCheckpoint(Base):
+    """Resume point of a long-running batch job, committed together with the work it covers"""
+    __tablename__ = "job_checkpoints"
+
+    job_id = Column(String, primary_key=True)
+    position = Column(Integer, nullable=False, default=0)  # input rows fully processed
+    state = Column(JSON, nullable=False, default=dict)  # job-specific counters / cursor
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -1,10 +1,49 @@
-from sqlalchemy import Column, Integer, Float, String, JSON, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+import math
+from typing import Any, Dict, Optional
+from sqlalchemy import Column, Integer, Float, String, JSON, ForeignKey, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, validates
 from datetime import datetime
 from app.db.base_class import Base
 
+# health_data keys copied into typed, indexed columns for cohort filtering
+PROMOTED_FIELDS = {
+    'age': int,
+    'bmi': float,
+    'smoking_status': str,
+    'exercise_frequency': str,
+}
+
+def promoted_columns(health_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Typed column values for ``health_data``; NULL where a key is missing or of the wrong type"""
+    values = {}
+    for name, kind in PROMOTED_FIELDS.items():
+        value = (health_data or {}).get(name)
+        if kind is str:
+            values[name] = value if isinstance(value, str) else None
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            values[name] = kind(round(value) if kind is int else value)
+        else:
+            values[name] = None
+    return values
+
 class RiskAssessment(Base):
     __tablename__ = "risk_assessments"
+    __table_args__ = (
+        # Serves the per-user history in keyset order (see app.db.pagination)
+        Index("ix_risk_assessments_user_id_created_at_id", "user_id", "created_at", "id"),
+        # Cohort filters (see app.api.v1.endpoints.cohort)
+        Index("ix_risk_assessments_smoking_status_age", "smoking_status", "age"),
+        Index("ix_risk_assessments_age", "age"),
+        Index("ix_risk_assessments_overall_risk_score", "overall_risk_score"),
+        Index("ix_risk_assessments_cardiovascular_risk", "cardiovascular_risk"),
+        Index("ix_risk_assessments_diabetes_risk", "diabetes_risk"),
+        # Containment (@>) lookups on the remaining health_data keys
+        Index(
+            "ix_risk_assessments_health_data", "health_data",
+            postgresql_using="gin", postgresql_ops={"health_data": "jsonb_path_ops"}
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -15,9 +54,37 @@ class RiskAssessment(Base):
     metabolic_risk = Column(Float, nullable=False)
     lifestyle_risk = Column(Float, nullable=False)
     recommendations = Column(JSON, nullable=False)
-    health_data = Column(JSON, nullable=False)
+    health_data = Column(JSON().with_variant(JSONB(), "postgresql"), nullable=False)
+    # Promoted from health_data on assignment, so cohort queries never parse JSON
+    age = Column(Integer)
+    bmi = Column(Float)
+    smoking_status = Column(String)
+    exercise_frequency = Column(String)
+    # Model version that produced the scores; NULL for rows scored before versions were recorded
+    model_version = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
     # Relationships
-    user = relationship("User", back_populates="risk_assessments") 
\ No newline at end of file
+    user = relationship("User", back_populates="risk_assessments")
+
+    @validates("health_data")
+    def _promote_health_data(self, key: str, health_data: Dict[str, Any]) -> Dict[str, Any]:
+        for name, value in promoted_columns(health_data).items():
+            setattr(self, name, value)
+        return health_data
+
+class LatestRiskAssessment(Base):
+    """Per-user pointer to the newest assessment, kept in step with the history on write"""
+    __tablename__ = "latest_risk_assessments"
+    __table_args__ = (
+        # Cohort queries filter assessments first, then keep only the latest ones
+        Index("ix_latest_risk_assessments_risk_assessment_id", "risk_assessment_id", unique=True),
+    )
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    risk_assessment_id = Column(Integer, ForeignKey("risk_assessments.id"), nullable=False)
+    # Copy of the target's created_at so a concurrent insert can be ordered without a join
+    created_at = Column(DateTime, nullable=False)
+
+    risk_assessment = relationship("RiskAssessment")
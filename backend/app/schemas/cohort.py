@@ -0,0 +1,51 @@
+from typing import Dict, List, Literal, Optional, Union
+from pydantic import BaseModel, ConfigDict, Field
+
+class Range(BaseModel):
+    """Bounds on a numeric column; any combination may be given"""
+    gt: Optional[float] = None
+    ge: Optional[float] = None
+    lt: Optional[float] = None
+    le: Optional[float] = None
+
+class CohortQuery(BaseModel):
+    """Members matching every given filter, e.g. current smokers over 50 with cardiovascular_risk > 0.7"""
+    model_config = ConfigDict(protected_namespaces=())
+
+    age: Optional[Range] = None
+    bmi: Optional[Range] = None
+    overall_risk_score: Optional[Range] = None
+    cardiovascular_risk: Optional[Range] = None
+    diabetes_risk: Optional[Range] = None
+    respiratory_risk: Optional[Range] = None
+    metabolic_risk: Optional[Range] = None
+    lifestyle_risk: Optional[Range] = None
+    smoking_status: Optional[List[str]] = Field(None, description="Any of these values")
+    exercise_frequency: Optional[List[str]] = Field(None, description="Any of these values")
+    model_version: Optional[List[str]] = Field(None, description="Any of these values")
+    health_data: Optional[Dict[str, Union[str, bool, int, float]]] = Field(
+        None, description="Exact matches on other health_data keys, e.g. {\"alcohol_consumption\": \"heavy\"}"
+    )
+    latest_only: bool = Field(True, description="Consider only each member's latest assessment")
+    group_by: Optional[Literal['smoking_status', 'exercise_frequency', 'age_band', 'model_version']] = None
+
+class CohortGroup(BaseModel):
+    key: Optional[Union[int, str]] = Field(
+        None, description="Group value; age bands are named by their lower bound (50 = ages 50-59)"
+    )
+    members: int
+    avg_age: Optional[float] = None
+    avg_bmi: Optional[float] = None
+    avg_overall_risk_score: Optional[float] = None
+    avg_cardiovascular_risk: Optional[float] = None
+    avg_diabetes_risk: Optional[float] = None
+    avg_respiratory_risk: Optional[float] = None
+    avg_metabolic_risk: Optional[float] = None
+    avg_lifestyle_risk: Optional[float] = None
+    max_overall_risk_score: Optional[float] = None
+
+class CohortSummary(BaseModel):
+    members: int
+    groups: List[CohortGroup] = Field(
+        description="One row per group, a single row without group_by; empty when nobody matches"
+    )
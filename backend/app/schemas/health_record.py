@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, confloat, conint
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import date
 from .base import BaseSchema
 
@@ -43,4 +43,30 @@ class HealthRecordUpdate(HealthRecordBase):
     pass
 
 class HealthRecord(HealthRecordBase, BaseSchema):
-    user_id: int 
\ No newline at end of file
+    user_id: int 
+class HealthMetricPoint(BaseModel):
+    """One (possibly downsampled) reading; only the requested metrics are set"""
+    date: date
+    height: Optional[float] = None
+    weight: Optional[float] = None
+    bmi: Optional[float] = None
+    blood_pressure_systolic: Optional[float] = None
+    blood_pressure_diastolic: Optional[float] = None
+    heart_rate: Optional[float] = None
+    temperature: Optional[float] = None
+    cholesterol_total: Optional[float] = None
+    cholesterol_hdl: Optional[float] = None
+    cholesterol_ldl: Optional[float] = None
+    triglycerides: Optional[float] = None
+    blood_sugar: Optional[float] = None
+
+class HealthRecordImportReport(BaseModel):
+    job_id: str
+    resumed_from: int
+    rows_read: int
+    imported: int
+    rejected: int
+    chunks: int
+    already_completed: bool
+    errors: List[Dict[str, Any]] = Field(default_factory=list, description="First rejected rows, capped")
+    errors_truncated: bool = False
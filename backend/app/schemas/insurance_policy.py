@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, confloat
+from pydantic import BaseModel, ConfigDict, Field, confloat
 from typing import Optional, List, Dict, Any
 from datetime import date
 from .base import BaseSchema
@@ -11,8 +11,39 @@ class PolicyBase(BaseModel):
     start_date: date
     end_date: date
 
-class PolicyCreate(PolicyBase):
-    pass
+class PolicyCreate(BaseModel):
+    """The premium is not supplied: it is quoted from the member's latest risk assessment"""
+    policy_type: PolicyType
+    coverage_amount: float = Field(..., description="One of the rate table's coverage tiers")
+    deductible: float = 0
+    start_date: date
+    end_date: date
+
+class PolicyResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    user_id: int
+    policy_type: PolicyType
+    status: PolicyStatus
+    coverage_amount: float
+    deductible: Optional[float] = None
+    premium: float
+    risk_assessment_id: Optional[int] = None
+    risk_adjustment_factor: Optional[float] = None
+    start_date: date
+    end_date: date
+
+class PolicyQuote(BaseModel):
+    policy_type: PolicyType
+    coverage_amount: float
+    deductible: float
+    premium: float = Field(..., description="Annual premium")
+    risk_adjustment_factor: float
+
+class PolicyQuotePage(BaseModel):
+    risk_assessment_id: int
+    quotes: List[PolicyQuote]
 
 class InsurancePolicy(PolicyBase):
     id: int
@@ -29,7 +60,7 @@ class InsurancePolicyBase(BaseModel):
     # Policy Details
     policy_type: PolicyType
     policy_number: str
-    status: PolicyStatus = PolicyStatus.DRAFT
+    status: PolicyStatus = PolicyStatus.PENDING
     
     # Coverage Details
     coverage_amount: confloat(ge=0)
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, confloat, conint
+from ..models.insurance_policy import PolicyType
+
+RiskScore = confloat(ge=0, le=1)
+
+class ProductCreate(BaseModel):
+    name: str
+    provider: Optional[str] = None
+    policy_type: PolicyType
+    coverage_amount: confloat(gt=0)
+    base_premium: confloat(ge=0) = Field(..., description="Annual premium before risk adjustment")
+    min_age: conint(ge=0) = 0
+    max_age: conint(ge=0) = 120
+    max_overall_risk_score: RiskScore = Field(1.0, description="Members scoring above this are not eligible")
+    target_profile: Dict[str, RiskScore] = Field(
+        default_factory=dict,
+        description="Risk scores of the members the product is designed for; missing dimensions count as 0.5"
+    )
+
+class ProductUpdate(BaseModel):
+    name: Optional[str] = None
+    provider: Optional[str] = None
+    coverage_amount: Optional[confloat(gt=0)] = None
+    base_premium: Optional[confloat(ge=0)] = None
+    min_age: Optional[conint(ge=0)] = None
+    max_age: Optional[conint(ge=0)] = None
+    max_overall_risk_score: Optional[RiskScore] = None
+    target_profile: Optional[Dict[str, RiskScore]] = None
+    is_active: Optional[bool] = None
+
+class ProductResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    name: str
+    provider: Optional[str] = None
+    policy_type: PolicyType
+    coverage_amount: float
+    base_premium: float
+    min_age: int
+    max_age: int
+    max_overall_risk_score: float
+    target_profile: Dict[str, float]
+    is_active: bool
+    updated_at: datetime
+
+class ProductRecommendation(BaseModel):
+    id: int
+    name: str
+    provider: Optional[str] = None
+    policy_type: PolicyType
+    coverage_amount: float
+    base_premium: float
+    match_score: float = Field(..., description="1 for a product targeting exactly the member's risk profile")
+
+class ProductRecommendationPage(BaseModel):
+    risk_assessment_id: int
+    recommendations: List[ProductRecommendation]
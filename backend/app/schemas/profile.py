@@ -0,0 +1,68 @@
+from datetime import date, datetime
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from ..models.insurance_policy import PolicyStatus, PolicyType
+from ..models.user import UserRole
+
+class ProfileUser(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    email: str
+    full_name: Optional[str] = None
+    date_of_birth: date
+    gender: str
+    role: UserRole
+    is_active: Optional[bool] = None
+    created_at: datetime
+
+class ProfileHealthRecord(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    date: date
+    age: Optional[int] = None
+    bmi: Optional[float] = None
+    blood_pressure_systolic: Optional[int] = Field(None, validation_alias='systolic_bp')
+    blood_pressure_diastolic: Optional[int] = Field(None, validation_alias='diastolic_bp')
+    heart_rate: Optional[int] = None
+    cholesterol: Optional[float] = None
+    blood_sugar: Optional[float] = None
+    smoking_status: Optional[str] = None
+    exercise_frequency: Optional[str] = None
+
+class ProfileRiskAssessment(BaseModel):
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
+
+    id: int
+    overall_risk_score: float
+    cardiovascular_risk: float
+    diabetes_risk: float
+    respiratory_risk: float
+    metabolic_risk: float
+    lifestyle_risk: float
+    recommendations: List[str]
+    model_version: Optional[str] = None
+    created_at: datetime
+
+class ProfilePolicy(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    policy_type: PolicyType
+    status: PolicyStatus
+    coverage_amount: float
+    premium: float
+    start_date: date
+    end_date: date
+
+class UserProfile(BaseModel):
+    """A member with their most recent records, assessments and policies, newest first"""
+    user: ProfileUser
+    health_records: List[ProfileHealthRecord]
+    risk_assessments: List[ProfileRiskAssessment]
+    insurance_policies: List[ProfilePolicy]
+
+class UserProfilePage(BaseModel):
+    items: List[UserProfile]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to fetch the next page; null on the last page")
@@ -1,15 +1,15 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
 class RiskAssessmentBase(BaseModel):
-    health_data: Dict[str, any] = Field(..., description="Health data used for risk assessment")
+    health_data: Dict[str, Any] = Field(..., description="Health data used for risk assessment")
 
 class RiskAssessmentCreate(RiskAssessmentBase):
     pass
 
 class RiskAssessmentUpdate(BaseModel):
-    health_data: Optional[Dict[str, any]] = None
+    health_data: Optional[Dict[str, Any]] = None
     recommendations: Optional[List[str]] = None
 
 class RiskAssessmentInDBBase(RiskAssessmentBase):
@@ -22,14 +22,42 @@ class RiskAssessmentInDBBase(RiskAssessmentBase):
     metabolic_risk: float
     lifestyle_risk: float
     recommendations: List[str]
+    model_version: Optional[str] = None
     created_at: datetime
     updated_at: datetime
 
     class Config:
         from_attributes = True
+        protected_namespaces = ()  # allow the model_version field
 
 class RiskAssessmentInDB(RiskAssessmentInDBBase):
     pass
 
 class RiskAssessmentResponse(RiskAssessmentInDBBase):
-    pass 
\ No newline at end of file
+    pass 
+
+class RiskAssessmentPage(BaseModel):
+    items: List[RiskAssessmentInDB]
+    next_cursor: Optional[str] = Field(None, description="Pass as ?cursor= to fetch the next page; null on the last page")
+
+class RiskAssessmentBatchRequest(BaseModel):
+    health_data: Dict[str, List[Any]] = Field(
+        ..., description="Columnar health data: one equal-length list per health_data field"
+    )
+
+class RiskAssessmentBatchResponse(BaseModel):
+    overall_risk_score: List[float]
+    cardiovascular_risk: List[float]
+    diabetes_risk: List[float]
+    respiratory_risk: List[float]
+    metabolic_risk: List[float]
+    lifestyle_risk: List[float]
+    recommendations: List[List[str]]
+
+class ModelVersionActivate(BaseModel):
+    version: str
+    rescore: bool = Field(False, description="Re-score every member's latest assessment in the background")
+
+class ModelVersionInfo(BaseModel):
+    current_version: str
+    available_versions: List[str]
@@ -0,0 +1,441 @@
+"""Streaming bulk import of health records from CSV or NDJSON.
+
+The input is read ``IMPORT_CHUNK_SIZE`` rows at a time, so memory stays flat
+whatever the file size. Each chunk is validated column-wise against the
+constraints declared on ``HealthRecordCreate`` and against the ``users`` it
+references, its valid rows are written with the driver's bulk path (COPY on
+PostgreSQL, executemany elsewhere), and a checkpoint is committed in the same
+transaction. If the database still rejects the chunk, it is rewritten row by
+row and the offending rows join the error report. Re-running the same job id
+resumes after the last committed chunk.
+
+    python -m app.services.bulk_import records.csv --job-id acme-2026 --errors acme-errors.ndjson
+"""
+import argparse
+import csv
+import hashlib
+import io
+import itertools
+import json
+import operator
+import os
+import sys
+import typing
+from dataclasses import dataclass, field
+from datetime import date
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Connection, Engine
+from app.core.config import settings
+from app.models.health_record import HealthRecord
+from app.models.user import User
+from app.schemas.health_record import HealthRecordCreate
+from app.services.job_checkpoints import load_checkpoint, save_checkpoint
+
+FORMATS = ('csv', 'ndjson')
+# Schema field -> HealthRecord column, where the names differ
+COLUMN_RENAMES = {
+    'blood_pressure_systolic': 'systolic_bp',
+    'blood_pressure_diastolic': 'diastolic_bp',
+}
+# NDJSON lines that are not valid JSON objects carry their parse error here
+PARSE_ERROR = '__parse_error__'
+MAX_ERROR_VALUE_LENGTH = 80
+# Schema bound -> (message symbol, test that flags a violation)
+BOUND_CHECKS = {
+    'ge': ('>=', operator.lt),
+    'gt': ('>', operator.le),
+    'le': ('<=', operator.gt),
+    'lt': ('<', operator.ge),
+}
+
+
+@dataclass(frozen=True)
+class FieldRule:
+    """Type and bounds of one importable field, read off the pydantic schema"""
+    name: str
+    kind: type
+    required: bool
+    bounds: Dict[str, float]
+
+    @property
+    def column(self) -> str:
+        return COLUMN_RENAMES.get(self.name, self.name)
+
+
+@dataclass
+class ChunkReport:
+    chunk: int
+    first_row: int
+    rows: int
+    imported: int
+    rejected: int
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+
+
+@dataclass
+class ImportResult:
+    job_id: str
+    resumed_from: int = 0
+    rows_read: int = 0
+    imported: int = 0
+    rejected: int = 0
+    chunks: int = 0
+    already_completed: bool = False
+
+
+def _unwrap_annotation(annotation: Any) -> Tuple[type, Dict[str, float]]:
+    """Base type and ge/gt/le/lt bounds of ``Optional[Annotated[...]]`` style annotations"""
+    bounds: Dict[str, float] = {}
+    while True:
+        origin = typing.get_origin(annotation)
+        if origin is typing.Annotated:
+            annotation, *metadata = typing.get_args(annotation)
+            for item in metadata:
+                for bound in ('ge', 'gt', 'le', 'lt'):
+                    value = getattr(item, bound, None)
+                    if value is not None:
+                        bounds[bound] = value
+        elif origin is typing.Union:
+            annotation = next(arg for arg in typing.get_args(annotation) if arg is not type(None))
+        elif origin in (list, List):
+            return list, bounds
+        else:
+            return annotation, bounds
+
+
+def schema_rules() -> List[FieldRule]:
+    """Validation rules for every HealthRecordCreate field that maps to a column"""
+    rules = []
+    for name, schema_field in HealthRecordCreate.model_fields.items():
+        kind, bounds = _unwrap_annotation(schema_field.annotation)
+        rule = FieldRule(name=name, kind=kind, required=schema_field.is_required(), bounds=bounds)
+        if hasattr(HealthRecord, rule.column):
+            rules.append(rule)
+    return rules
+
+
+def _as_json_list(value: Any) -> Optional[str]:
+    """Lists are stored as JSON strings; CSV cells may hold JSON or ';'-separated items"""
+    if isinstance(value, str):
+        value = value.strip()
+        if value.startswith('['):
+            value = json.loads(value)
+        else:
+            value = [item.strip() for item in value.split(';') if item.strip()]
+    if not isinstance(value, list):
+        raise ValueError("not a list")
+    return json.dumps([str(item) for item in value])
+
+
+def _error_value(value: Any) -> Optional[str]:
+    if value is None or value is pd.NA or (isinstance(value, float) and value != value):
+        return None
+    return str(value)[:MAX_ERROR_VALUE_LENGTH]
+
+
+def validate_chunk(
+    frame: pd.DataFrame, rules: List[FieldRule], first_row: int
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Split a raw chunk into clean, column-named rows and per-row errors.
+
+    Every check is a whole-column operation; rows are only visited to format
+    error messages. ``first_row`` is the 1-based record number of the chunk's
+    first row, used in the error report.
+    """
+    n = len(frame)
+    empty = pd.Series([None] * n, index=frame.index, dtype=object)
+    failures: List[Tuple[str, pd.Series, str]] = []
+    clean: Dict[str, pd.Series] = {}
+
+    if PARSE_ERROR in frame:
+        failures.append(('<line>', frame[PARSE_ERROR].notna(), 'invalid JSON'))
+
+    for rule in rules:
+        raw = frame[rule.name] if rule.name in frame else empty
+        missing = raw.isna() | raw.astype('string').str.strip().eq('').fillna(True)
+        present = raw.where(~missing)
+        if rule.required:
+            failures.append((rule.name, missing, 'field required'))
+
+        if rule.kind in (int, float):
+            values = pd.to_numeric(present, errors='coerce')
+            invalid = ~missing & values.isna()
+            failures.append((rule.name, invalid, 'not a number'))
+            if rule.kind is int:
+                failures.append((rule.name, values.notna() & (values % 1 != 0), 'not an integer'))
+            for bound, value in rule.bounds.items():
+                symbol, violates = BOUND_CHECKS[bound]
+                failures.append((rule.name, violates(values, value), f"must be {symbol} {value}"))
+            clean[rule.column] = values
+        elif rule.kind is date:
+            values = pd.to_datetime(present, errors='coerce', format='ISO8601')
+            failures.append((rule.name, ~missing & values.isna(), 'not an ISO date'))
+            clean[rule.column] = values.dt.date
+        elif rule.kind is list:
+            converted = pd.Series(None, index=frame.index, dtype=object)
+            invalid = pd.Series(False, index=frame.index)
+            # Free-form lists can't be parsed column-wise; only the (rare) filled cells are visited
+            for index, value in raw[~missing].items():
+                try:
+                    converted[index] = _as_json_list(value)
+                except (ValueError, TypeError):
+                    invalid[index] = True
+            failures.append((rule.name, invalid, 'not a list'))
+            clean[rule.column] = converted
+        else:
+            clean[rule.column] = present.astype(object).map(lambda value: None if pd.isna(value) else str(value))
+
+    rejected = pd.Series(False, index=frame.index)
+    unparsed = frame[PARSE_ERROR].notna() if PARSE_ERROR in frame else rejected
+    errors = []
+    for field_name, mask, message in failures:
+        mask = mask.fillna(False).astype(bool)
+        if field_name != '<line>':
+            # Lines that failed to parse are reported once, not once per missing field
+            mask &= ~unparsed
+        if not mask.any():
+            continue
+        rejected |= mask
+        raw = frame[field_name] if field_name in frame else frame.get(PARSE_ERROR, empty)
+        for position in mask.to_numpy().nonzero()[0]:
+            errors.append({
+                'row': first_row + int(position),
+                'field': field_name,
+                'error': message,
+                'value': _error_value(raw.iloc[position]),
+            })
+    errors.sort(key=lambda error: error['row'])
+
+    rows = pd.DataFrame(clean, index=frame.index)[~rejected.to_numpy()]
+    for rule in rules:
+        if rule.kind is int:
+            rows[rule.column] = rows[rule.column].astype('Int64')
+    return rows.astype(object).where(rows.notna(), None), errors
+
+
+def check_users(
+    conn: Connection, frame: pd.DataFrame, rows: pd.DataFrame, first_row: int
+) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Drop rows whose user_id has no ``users`` row, with one query per chunk"""
+    if rows.empty:
+        return rows, []
+    user_ids = {int(user_id) for user_id in rows['user_id'].unique()}
+    known = set(conn.execute(select(User.id).where(User.id.in_(user_ids))).scalars())
+    unknown = ~rows['user_id'].map(lambda user_id: int(user_id) in known).astype(bool)
+    if not unknown.any():
+        return rows, []
+    errors = [
+        {'row': first_row + int(position), 'field': 'user_id', 'error': 'unknown user', 'value': _error_value(user_id)}
+        for position, user_id in zip(frame.index.get_indexer(rows.index[unknown]), rows['user_id'][unknown])
+    ]
+    return rows[~unknown.to_numpy()], errors
+
+
+def read_chunks(source: IO, fmt: str, chunk_size: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """Raw chunks of ``chunk_size`` records, starting after the first ``skip_rows``"""
+    if fmt == 'csv':
+        yield from pd.read_csv(
+            source,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=chunk_size,
+            skiprows=range(1, skip_rows + 1)
+        )
+        return
+    if fmt != 'ndjson':
+        raise ValueError(f"Unsupported format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+    lines = itertools.islice((line for line in source if line.strip()), skip_rows, None)
+    while True:
+        batch = list(itertools.islice(lines, chunk_size))
+        if not batch:
+            return
+        records = []
+        for line in batch:
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("not an object")
+            except ValueError as e:
+                record = {PARSE_ERROR: str(e)}
+            records.append(record)
+        yield pd.DataFrame.from_records(records)
+
+
+def _copy_rows(conn: Connection, columns: List[str], rows: pd.DataFrame) -> None:
+    """Stream rows through COPY ... FROM STDIN on the transaction's own connection"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for record in rows.itertuples(index=False, name=None):
+        writer.writerow(['' if value is None else value for value in record])
+    buffer.seek(0)
+    table = HealthRecord.__tablename__
+    with conn.connection.driver_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def write_rows(conn: Connection, rows: pd.DataFrame) -> None:
+    if rows.empty:
+        return
+    columns = list(rows.columns)
+    if conn.dialect.name == 'postgresql' and conn.dialect.driver == 'psycopg2':
+        _copy_rows(conn, columns, rows)
+    else:
+        conn.execute(
+            insert(HealthRecord.__table__),
+            [dict(zip(columns, record)) for record in rows.itertuples(index=False, name=None)]
+        )
+
+
+def write_rows_one_by_one(
+    conn: Connection, frame: pd.DataFrame, rows: pd.DataFrame, first_row: int
+) -> List[Dict[str, Any]]:
+    """Insert each row in its own savepoint; returns an error for every row the database rejected"""
+    columns = list(rows.columns)
+    positions = frame.index.get_indexer(rows.index)
+    errors = []
+    for position, record in zip(positions, rows.itertuples(index=False, name=None)):
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(HealthRecord.__table__), dict(zip(columns, record)))
+        except IntegrityError as e:
+            errors.append({
+                'row': first_row + int(position),
+                'field': '<row>',
+                'error': 'rejected by the database',
+                'value': _error_value(e.orig),
+            })
+    return errors
+
+
+def import_health_records(
+    engine: Engine,
+    source: IO,
+    fmt: str,
+    job_id: str,
+    chunk_size: Optional[int] = None,
+    on_chunk: Optional[Callable[[ChunkReport], None]] = None
+) -> ImportResult:
+    """Import ``source`` chunk by chunk, resuming ``job_id`` from its last checkpoint"""
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    with engine.connect() as conn:
+        checkpoint = load_checkpoint(conn, job_id)
+    position = checkpoint['position'] if checkpoint else 0
+    result = ImportResult(job_id=job_id, resumed_from=position)
+    if checkpoint:
+        result.imported = checkpoint['state'].get('imported', 0)
+        result.rejected = checkpoint['state'].get('rejected', 0)
+        result.chunks = checkpoint['state'].get('chunks', 0)
+        if checkpoint['completed']:
+            result.rows_read = position
+            result.already_completed = True
+            return result
+
+    rules = schema_rules()
+    for frame in read_chunks(source, fmt, chunk_size, skip_rows=position):
+        rows, errors = validate_chunk(frame, rules, first_row=position + 1)
+        report = ChunkReport(chunk=result.chunks, first_row=position + 1, rows=len(frame), imported=0, rejected=0)
+
+        def commit(conn: Connection) -> None:
+            report.imported = len(frame) - len({error['row'] for error in report.errors})
+            report.rejected = len(frame) - report.imported
+            save_checkpoint(conn, job_id, position + len(frame), {
+                'imported': result.imported + report.imported,
+                'rejected': result.rejected + report.rejected,
+                'chunks': result.chunks + 1,
+            })
+
+        try:
+            with engine.begin() as conn:
+                rows, unknown_users = check_users(conn, frame, rows, first_row=position + 1)
+                report.errors = sorted(errors + unknown_users, key=lambda error: error['row'])
+                write_rows(conn, rows)
+                commit(conn)
+        except (IntegrityError, engine.dialect.dbapi.IntegrityError):
+            # Something the checks above don't cover (e.g. a concurrent delete): find the rows.
+            # COPY runs on the driver's cursor, so its errors arrive unwrapped.
+            with engine.begin() as conn:
+                rejected = write_rows_one_by_one(conn, frame, rows, first_row=position + 1)
+                report.errors = sorted(report.errors + rejected, key=lambda error: error['row'])
+                commit(conn)
+        position += len(frame)
+        result.imported += report.imported
+        result.rejected += report.rejected
+        result.chunks += 1
+        if on_chunk is not None:
+            on_chunk(report)
+
+    with engine.begin() as conn:
+        save_checkpoint(conn, job_id, position, {
+            'imported': result.imported, 'rejected': result.rejected, 'chunks': result.chunks
+        }, completed=True)
+    result.rows_read = position
+    return result
+
+
+def default_job_id(name: str, size: int, mtime: Optional[float] = None, digest: Optional[str] = None) -> str:
+    """Stable id for one input file, so re-running the same file resumes it.
+
+    Pass the content ``digest`` when there is no trustworthy mtime (uploads):
+    name and size alone would let a different file resume a finished job.
+    """
+    stamp = f":{int(mtime)}" if mtime is not None else ""
+    content = f":{digest[:32]}" if digest else ""
+    return f"health-import:{os.path.basename(name)}:{size}{stamp}{content}"
+
+
+def content_digest(source: IO[bytes], block_size: int = 1 << 20) -> str:
+    """SHA-256 hex digest of a seekable binary file, which is rewound afterwards"""
+    digest = hashlib.sha256()
+    source.seek(0)
+    for block in iter(lambda: source.read(block_size), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()
+
+
+def guess_format(name: str) -> str:
+    return 'ndjson' if name.lower().endswith(('.ndjson', '.jsonl', '.json')) else 'csv'
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="default: from the file extension")
+    parser.add_argument("--job-id", default=None, help="checkpoint key; default: derived from the file")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--errors", default=None, help="write rejected rows to this NDJSON file")
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    stat = os.stat(args.path)
+    job_id = args.job_id or default_job_id(args.path, stat.st_size, stat.st_mtime)
+    errors_file = open(args.errors, "a") if args.errors else None
+
+    def report(chunk: ChunkReport) -> None:
+        print(f"chunk {chunk.chunk}: rows {chunk.first_row}-{chunk.first_row + chunk.rows - 1}, "
+              f"imported {chunk.imported}, rejected {chunk.rejected}", file=sys.stderr)
+        if errors_file is not None:
+            for error in chunk.errors:
+                errors_file.write(json.dumps({'chunk': chunk.chunk, **error}) + "\n")
+            errors_file.flush()
+
+    try:
+        with open(args.path, newline="") as source:
+            result = import_health_records(
+                engine, source, args.format or guess_format(args.path), job_id, args.chunk_size, report
+            )
+    finally:
+        if errors_file is not None:
+            errors_file.close()
+
+    print(json.dumps(result.__dict__))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
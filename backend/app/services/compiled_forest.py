@@ -0,0 +1,162 @@
+import json
+import os
+from typing import Any, Dict, Optional
+import numpy as np
+
+
+class CompiledForest:
+    """Flat, array-based evaluator for a fitted RandomForestClassifier.
+
+    Every estimator's nodes are concatenated into contiguous arrays so that a
+    row (or a small batch) is routed through all trees at once, one tree level
+    per NumPy step. Leaf class distributions are computed up front exactly
+    the way ``DecisionTreeClassifier.predict_proba`` does it, and the per-tree
+    probabilities are accumulated in estimator order, so ``predict_proba``
+    returns the same bits as sklearn's sequential implementation.
+    """
+
+    ARRAY_NAMES = ('roots', 'feature', 'threshold', 'children_left', 'children_right', 'value', 'classes')
+
+    def __init__(
+        self,
+        roots: np.ndarray,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        children_left: np.ndarray,
+        children_right: np.ndarray,
+        value: np.ndarray,
+        classes: np.ndarray,
+        max_depth: int,
+        n_features: int
+    ):
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.classes_ = classes
+        self.max_depth = max_depth
+        self.n_features_in_ = n_features
+
+    @classmethod
+    def from_sklearn(cls, model: Any) -> "CompiledForest":
+        """Flatten a fitted single-output RandomForestClassifier"""
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators:
+            raise ValueError("Model must be a fitted forest")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Only single-output forests can be compiled")
+
+        n_classes = len(model.classes_)
+        roots, features, thresholds, lefts, rights, values = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+        for estimator in estimators:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            # Leaves point at themselves so every row can take exactly
+            # max_depth steps without masking.
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+
+            proba = tree.value[:, 0, :n_classes]
+            if not np.isclose(proba[0].sum(), 1.0):
+                # scikit-learn < 1.4 stores class counts and normalizes in predict_proba;
+                # later versions store the fractions and return them as they are
+                normalizer = proba.sum(axis=1)[:, np.newaxis]
+                normalizer[normalizer == 0.0] = 1.0
+                proba = proba / normalizer
+            values.append(proba)
+
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            roots=np.asarray(roots, dtype=np.int32),
+            feature=np.concatenate(features).astype(np.int32),
+            threshold=np.concatenate(thresholds).astype(np.float64),
+            children_left=np.concatenate(lefts).astype(np.int32),
+            children_right=np.concatenate(rights).astype(np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            classes=np.asarray(model.classes_),
+            max_depth=int(max_depth),
+            n_features=int(model.n_features_in_)
+        )
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Return the leaf index reached in every tree, shape (n_rows, n_trees)"""
+        # sklearn evaluates forests on float32 input against float64 thresholds
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X has {X.shape[1]} features, but the model expects {self.n_features_in_}"
+            )
+        if np.isnan(X).any():
+            raise ValueError("Input contains NaN")
+
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.roots.shape[0]))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.children_left[nodes], self.children_right[nodes])
+        return nodes
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        """Class probabilities averaged over trees, matching sklearn bit for bit"""
+        leaf_proba = self.value[self.apply(X)]  # (n_rows, n_trees, n_classes)
+        # cumsum accumulates strictly in tree order, like sklearn's ``out += proba``
+        proba = np.cumsum(leaf_proba, axis=1)[:, -1, :]
+        proba /= self.roots.shape[0]
+        return proba
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Predicted class labels"""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1), axis=0)
+
+    @property
+    def nbytes(self) -> int:
+        """In-memory footprint of the flattened arrays"""
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Named arrays making up the compiled forest"""
+        return {name: getattr(self, 'classes_' if name == 'classes' else name) for name in self.ARRAY_NAMES}
+
+    def save(self, directory: str) -> None:
+        """Write each array as an uncompressed .npy so it can be memory-mapped"""
+        os.makedirs(directory, exist_ok=True)
+        for name, array in self.arrays().items():
+            np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(array))
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump({'max_depth': self.max_depth, 'n_features': self.n_features_in_}, f)
+
+    @classmethod
+    def load(cls, directory: str, mmap_mode: Optional[str] = 'r') -> "CompiledForest":
+        """Load a saved forest; with mmap_mode the arrays are shared page cache, not copies"""
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+            for name in cls.ARRAY_NAMES if name != 'classes'
+        }
+        # Class labels may be strings (object dtype), which cannot be memory-mapped
+        arrays['classes'] = np.load(os.path.join(directory, "classes.npy"), allow_pickle=True)
+        return cls(max_depth=meta['max_depth'], n_features=meta['n_features'], **arrays)
+
+
+def matches_sklearn(compiled: CompiledForest, model: Any, n_probe: int = 64) -> bool:
+    """Check a compiled forest against sklearn on rows sitting on and just past split thresholds"""
+    rng = np.random.default_rng(0)
+    probe = rng.normal(size=(n_probe, compiled.n_features_in_))
+    split_rows = rng.choice(compiled.threshold.shape[0], size=n_probe)
+    probe[np.arange(n_probe), compiled.feature[split_rows]] = compiled.threshold[split_rows]
+    probe = np.vstack([probe, np.nextafter(probe, np.inf)])
+    return np.array_equal(compiled.predict_proba(probe), model.predict_proba(probe))
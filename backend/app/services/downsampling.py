@@ -0,0 +1,87 @@
+"""Index-selecting downsamplers for plotted time series.
+
+Both return sorted indices into the original arrays rather than synthetic
+points, so a selected row keeps its real date and every other column of the
+reading it came from.
+"""
+from typing import Iterable, Sequence
+import numpy as np
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: keeps the points that most shape the line"""
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.linspace(0, n - 1, max(n_out, 0)).astype(np.int64)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # First and last points are always kept; the rest is split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        # The third vertex is the mean of the next bucket (or the last point)
+        next_stop = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        next_start = stop if bucket + 2 < len(edges) else n - 1
+        mean_x = x[next_start:next_stop].mean()
+        mean_y = y[next_start:next_stop].mean()
+
+        area = np.abs(
+            (x[previous] - mean_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (mean_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def minmax(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Keep the lowest and highest reading of each of n_out / 2 equal-count buckets"""
+    n = len(y)
+    if n_out >= n:
+        return np.arange(n)
+    y = np.asarray(y, dtype=np.float64)
+    selected = [0, n - 1]
+    for bucket in np.array_split(np.arange(n), max(n_out // 2, 1)):
+        if len(bucket):
+            values = y[bucket]
+            selected.extend((bucket[np.argmin(values)], bucket[np.argmax(values)]))
+    return np.unique(np.asarray(selected, dtype=np.int64))
+
+
+DOWNSAMPLERS = {
+    'lttb': lttb,
+    'minmax': minmax,
+}
+
+
+def downsample_rows(
+    x: np.ndarray, series: Iterable[np.ndarray], n_out: int, method: str = 'lttb'
+) -> np.ndarray:
+    """Row indices that keep every series' shape within at most ``n_out`` rows.
+
+    Each series gets an equal share of the budget and is downsampled over its
+    non-missing (non-NaN) readings only; the selections are then merged, and
+    thinned evenly (keeping the first and last row) if the union is too long.
+    """
+    series: Sequence[np.ndarray] = list(series)
+    if len(x) <= n_out:
+        return np.arange(len(x))
+    downsampler = DOWNSAMPLERS[method]
+    share = max(n_out // max(len(series), 1), 3)
+
+    selected = [np.asarray([0, len(x) - 1], dtype=np.int64)]
+    for values in series:
+        present = np.flatnonzero(~np.isnan(values))
+        if len(present):
+            selected.append(present[downsampler(x[present], values[present], share)])
+    selected = np.unique(np.concatenate(selected))
+    if len(selected) > n_out:
+        selected = selected[np.linspace(0, len(selected) - 1, n_out).round().astype(np.int64)]
+    return selected
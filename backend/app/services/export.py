@@ -0,0 +1,171 @@
+"""Chunked encoders for streaming table exports.
+
+Rows come from a server-side cursor in partitions of ``EXPORT_CHUNK_SIZE``;
+each partition is encoded and handed to the response before the next one is
+fetched, so only one chunk is ever held in memory.
+"""
+import csv
+import io
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+import orjson
+from sqlalchemy import Select, types as sqltypes
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+
+class ExportFormatUnavailable(RuntimeError):
+    """Raised when an export format needs an optional dependency that isn't installed"""
+
+
+def _json_text(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+
+class NDJSONEncoder:
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+
+    def header(self) -> bytes:
+        return b""
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        # orjson writes datetimes as ISO 8601 and returns bytes, so rows need no further conversion
+        columns, dumps = self.columns, orjson.dumps
+        return b"".join(dumps(dict(zip(columns, row)), option=orjson.OPT_APPEND_NEWLINE) for row in rows)
+
+    def footer(self) -> bytes:
+        return b""
+
+
+class CSVEncoder(NDJSONEncoder):
+    """Nested (JSON) values are written as JSON text in their cell"""
+
+    def _write(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([
+                _json_text(value) if isinstance(value, (dict, list))
+                else value.isoformat() if isinstance(value, (datetime, date))
+                else value
+                for value in row
+            ])
+        return buffer.getvalue().encode()
+
+    def header(self) -> bytes:
+        return self._write([self.columns])
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        return self._write(rows)
+
+
+class _DrainableSink(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Any) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._chunks = b"".join(self._chunks), []
+        return data
+
+
+class ParquetEncoder:
+    """One Parquet row group per chunk; needs the optional ``pyarrow`` package"""
+
+    def __init__(self, columns: Sequence[str], types: Dict[str, str]):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ExportFormatUnavailable("Parquet export requires pyarrow to be installed") from e
+        self._pa = pa
+        self.columns = list(columns)
+        arrow_types = {
+            'int': pa.int64(),
+            'float': pa.float64(),
+            'datetime': pa.timestamp('us'),
+            'json': pa.string(),
+            'str': pa.string(),
+        }
+        self.schema = pa.schema([(name, arrow_types[types[name]]) for name in self.columns])
+        self._json_columns = {i for i, name in enumerate(self.columns) if types[name] == 'json'}
+        self._sink = _DrainableSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema)
+
+    def header(self) -> bytes:
+        return self._sink.drain()
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> bytes:
+        columns = [
+            [_json_text(row[i]) if i in self._json_columns and row[i] is not None else row[i] for row in rows]
+            for i in range(len(self.columns))
+        ]
+        self._writer.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(values, type=self.schema.field(i).type) for i, values in enumerate(columns)],
+            schema=self.schema
+        ))
+        return self._sink.drain()
+
+    def footer(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+def column_kind(column: Any) -> str:
+    """Coarse type of a projected column, used to pick typed Parquet columns"""
+    column_type = column.type
+    if isinstance(column_type, sqltypes.JSON):
+        return 'json'
+    if isinstance(column_type, sqltypes.Integer):
+        return 'int'
+    if isinstance(column_type, sqltypes.Float):
+        return 'float'
+    if isinstance(column_type, sqltypes.DateTime):
+        return 'datetime'
+    return 'str'
+
+
+def make_encoder(fmt: str, columns: Sequence[str], types: Dict[str, str]) -> Any:
+    if fmt == 'ndjson':
+        return NDJSONEncoder(columns)
+    if fmt == 'csv':
+        return CSVEncoder(columns)
+    if fmt == 'parquet':
+        return ParquetEncoder(columns, types)
+    raise ValueError(f"Unsupported export format {fmt!r}")
+
+
+async def stream_export(
+    engine: AsyncEngine, query: Select, encoder: Any, chunk_size: int
+) -> AsyncIterator[bytes]:
+    """Encode ``query`` chunk by chunk from a server-side cursor on its own connection"""
+    header = encoder.header()
+    if header:
+        yield header
+    async with engine.connect() as conn:
+        result = await conn.stream(query.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield encoder.encode(rows)
+    footer = encoder.footer()
+    if footer:
+        yield footer
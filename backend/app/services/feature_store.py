@@ -0,0 +1,418 @@
+"""Columnar, memory-mapped store of encoded model features.
+
+One ``.npy`` file per column under the active generation directory::
+
+    <root>/CURRENT                    name of the active generation
+    <root>/<generation>/
+        manifest.json                 row count, capacity, category codes, watermark
+        record_id.npy user_id.npy date.npy
+        <feature>.npy                 float32; categoricals hold their integer code
+
+Columns are preallocated with spare capacity and grown geometrically, so
+appending is amortized O(1). ``refresh`` pulls the ``HealthRecord`` rows
+changed since the stored watermark (``coalesce(updated_at, created_at)``),
+re-reading a ``FEATURE_STORE_REFRESH_OVERLAP_S`` window before it: the
+timestamp is taken when a transaction starts, so a long transaction (an
+import chunk) can commit rows stamped before a watermark that has already
+moved past them. Re-read rows whose values did not change are skipped.
+
+New records are appended past ``n_rows``, where no reader looks, and the
+manifest is written last, so readers never see rows past the last completed
+refresh. Records that did change are never overwritten in a live
+generation, which could show a reader a half-written row: the refresh
+copies the generation, applies the changes there and swaps ``CURRENT``.
+``rebuild`` writes a fresh generation the same way, which is also how
+deleted records are dropped.
+
+Writers take an exclusive ``flock`` on ``<root>/LOCK``, so only one process
+refreshes at a time. API processes refresh every FEATURE_STORE_REFRESH_S in
+the background (see ``app.services.runtime``), skipping a round while another
+process holds the lock; the command below refreshes on demand.
+
+    python -m app.services.feature_store refresh
+"""
+import argparse
+import fcntl
+import json
+import os
+import shutil
+import sys
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.models.health_record import HealthRecord
+
+# FEATURE_COLUMNS name -> HealthRecord attribute, where the names differ
+FEATURE_SOURCES = {
+    'blood_pressure_systolic': 'systolic_bp',
+    'blood_pressure_diastolic': 'diastolic_bp',
+}
+# Known levels in code order; unseen values are appended to the manifest's list
+CATEGORY_LEVELS = {
+    'smoking_status': ['never', 'former', 'current'],
+    'exercise_frequency': ['none', 'occasional', 'regular', 'very_active'],
+    'alcohol_consumption': ['none', 'moderate', 'heavy'],
+}
+KEY_COLUMNS = {
+    'record_id': np.int64,
+    'user_id': np.int64,
+    'date': np.int32,  # days since 1970-01-01
+}
+FEATURE_DTYPE = np.float32  # what sklearn trees compute in anyway
+MISSING_CODE = -1
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class FeatureFrame:
+    """Read-only view of the first ``n_rows`` rows of every column"""
+
+    def __init__(
+        self,
+        columns: Dict[str, np.ndarray],
+        categories: Dict[str, List[str]],
+        features: List[str],
+        fingerprint: str = ''
+    ):
+        self.columns = columns
+        self.categories = categories
+        self.features = features
+        self.fingerprint = fingerprint  # changes whenever the visible data does
+
+    def __len__(self) -> int:
+        return len(self.columns['record_id'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def matrix(self, rows: Any = slice(None), features: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Contiguous (n_rows, n_features) float32 copy of the selected rows"""
+        features = list(features or self.features)
+        out = np.empty((len(self.columns['record_id'][rows]), len(features)), dtype=FEATURE_DTYPE)
+        for i, name in enumerate(features):
+            out[:, i] = self.columns[name][rows]
+        return out
+
+    def iter_chunks(self, chunk_rows: int) -> Iterator[Tuple[slice, np.ndarray]]:
+        """(row slice, feature matrix) pairs, never materializing more than ``chunk_rows`` rows"""
+        for start in range(0, len(self), chunk_rows):
+            rows = slice(start, min(start + chunk_rows, len(self)))
+            yield rows, self.matrix(rows)
+
+    def health_data_batch(self, rows: Any = slice(None)) -> Dict[str, np.ndarray]:
+        """Columns under their health_data names, ready for ``RiskAssessmentService.assess_batch``"""
+        return {
+            FEATURE_SOURCES.get(name, name): self.decode(name, rows) if name in self.categories else self.columns[name][rows]
+            for name in self.features
+        }
+
+    def decode(self, name: str, rows: Any = slice(None)) -> np.ndarray:
+        """Category labels for a coded column (None where missing), as an object array"""
+        labels = np.array(self.categories[name] + [None], dtype=object)
+        codes = self.columns[name][rows].astype(np.int64)
+        return labels[np.where(codes < 0, len(labels) - 1, codes)]
+
+
+class FeatureStore:
+    """Single-writer, many-reader feature store rooted at ``FEATURE_STORE_PATH``"""
+
+    def __init__(self, root: Optional[str] = None, features: Optional[Sequence[str]] = None):
+        self.root = root or settings.FEATURE_STORE_PATH
+        self.features = list(features or settings.FEATURE_COLUMNS)
+        self.current_file = os.path.join(self.root, "CURRENT")
+        self._write_lock = threading.Lock()
+
+    @contextmanager
+    def _writer(self, wait: bool = True) -> Iterator[bool]:
+        """Hold the single-writer lock across threads and processes; False if ``wait`` is off and it is taken"""
+        os.makedirs(self.root, exist_ok=True)
+        if not self._write_lock.acquire(blocking=wait):
+            yield False
+            return
+        try:
+            with open(os.path.join(self.root, "LOCK"), "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            self._write_lock.release()
+
+    def _generation(self) -> Optional[str]:
+        try:
+            with open(self.current_file) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _path(self, generation: str, name: str) -> str:
+        return os.path.join(self.root, generation, name)
+
+    def _dtypes(self) -> Dict[str, Any]:
+        return dict(KEY_COLUMNS, **{name: FEATURE_DTYPE for name in self.features})
+
+    def _read_manifest(self, generation: str) -> Dict[str, Any]:
+        with open(self._path(generation, "manifest.json")) as f:
+            return json.load(f)
+
+    def _write_manifest(self, generation: str, manifest: Dict[str, Any]) -> None:
+        tmp_file = self._path(generation, f"manifest.json.{uuid.uuid4().hex}.tmp")
+        with open(tmp_file, "w") as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self._path(generation, "manifest.json"))
+
+    def _point_current(self, generation: str) -> None:
+        tmp_file = f"{self.current_file}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(generation)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.current_file)
+
+    def _new_generation_name(self) -> str:
+        return datetime.utcnow().strftime("%Y%m%d%H%M%S") + "-" + uuid.uuid4().hex[:8]
+
+    def _create_generation(self, capacity: int) -> Tuple[str, Dict[str, Any]]:
+        generation = self._new_generation_name()
+        os.makedirs(os.path.join(self.root, generation))
+        for name, dtype in self._dtypes().items():
+            np.lib.format.open_memmap(self._path(generation, f"{name}.npy"), mode='w+', dtype=dtype, shape=(capacity,))
+        manifest = {
+            'features': self.features,
+            'categories': {name: list(levels) for name, levels in CATEGORY_LEVELS.items() if name in self.features},
+            'n_rows': 0,
+            'capacity': capacity,
+            'watermark': None,
+        }
+        self._write_manifest(generation, manifest)
+        return generation, manifest
+
+    def load(self) -> Optional[FeatureFrame]:
+        """Memory-mapped view of the active generation, or None if nothing was built yet"""
+        generation = self._generation()
+        if generation is None:
+            return None
+        manifest = self._read_manifest(generation)
+        n_rows = manifest['n_rows']
+        columns = {
+            name: np.load(self._path(generation, f"{name}.npy"), mmap_mode='r')[:n_rows]
+            for name in list(KEY_COLUMNS) + manifest['features']
+        }
+        fingerprint = json.dumps([generation, n_rows, manifest['watermark']], sort_keys=True)
+        return FeatureFrame(columns, manifest['categories'], manifest['features'], fingerprint)
+
+    def _grow(self, generation: str, manifest: Dict[str, Any], needed: int) -> None:
+        """Reallocate every column with at least ``needed`` rows (doubling)"""
+        capacity = max(manifest['capacity'] * 2, needed)
+        n_rows = manifest['n_rows']
+        for name, dtype in self._dtypes().items():
+            path = self._path(generation, f"{name}.npy")
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp.npy"
+            grown = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=dtype, shape=(capacity,))
+            grown[:n_rows] = np.load(path, mmap_mode='r')[:n_rows]
+            grown.flush()
+            del grown
+            # Readers holding the old file keep their mapping of the old inode
+            os.replace(tmp_path, path)
+        manifest['capacity'] = capacity
+
+    def _encode(self, rows: Sequence[Any], categories: Dict[str, List[str]]) -> Dict[str, np.ndarray]:
+        """Turn fetched rows (id, user_id, date, changed_at, *features) into typed columns"""
+        n = len(rows)
+        encoded = {
+            'record_id': np.fromiter((row[0] for row in rows), dtype=np.int64, count=n),
+            'user_id': np.fromiter((row[1] for row in rows), dtype=np.int64, count=n),
+            'date': np.fromiter((row[2].toordinal() - EPOCH_ORDINAL for row in rows), dtype=np.int32, count=n),
+        }
+        for offset, name in enumerate(self.features, start=4):
+            values = [row[offset] for row in rows]
+            if name in categories:
+                levels = categories[name]
+                index = {level: code for code, level in enumerate(levels)}
+                for value in set(values) - index.keys() - {None}:
+                    index[value] = len(levels)
+                    levels.append(value)
+                codes = np.fromiter(
+                    (MISSING_CODE if value is None else index[value] for value in values), dtype=np.int64, count=n
+                )
+                encoded[name] = codes.astype(FEATURE_DTYPE)
+            else:
+                encoded[name] = np.array(values, dtype=np.float64).astype(FEATURE_DTYPE)  # None -> NaN
+        return encoded
+
+    def _locate(
+        self, encoded: Dict[str, np.ndarray], id_index: Tuple[np.ndarray, np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(found mask, stored row of each found record) for a chunk of encoded records"""
+        order, sorted_ids = id_index
+        position = np.searchsorted(sorted_ids, encoded['record_id'])
+        found = position < len(sorted_ids)
+        found[found] = sorted_ids[position[found]] == encoded['record_id'][found]
+        return found, order[position[found]]
+
+    def _differs(
+        self, generation: str, encoded: Dict[str, np.ndarray], found: np.ndarray, existing_rows: np.ndarray
+    ) -> np.ndarray:
+        """For each found record, whether any stored value differs (NaN equals NaN)"""
+        differs = np.zeros(len(existing_rows), dtype=bool)
+        for name, values in encoded.items():
+            stored = np.load(self._path(generation, f"{name}.npy"), mmap_mode='r')[existing_rows]
+            fresh = values[found]
+            same = stored == fresh
+            if fresh.dtype.kind == 'f':
+                same |= np.isnan(stored) & np.isnan(fresh)
+            differs |= ~same
+        return differs
+
+    def _apply(
+        self,
+        generation: str,
+        manifest: Dict[str, Any],
+        encoded: Dict[str, np.ndarray],
+        found: np.ndarray,
+        existing_rows: np.ndarray,
+        differs: np.ndarray
+    ) -> Dict[str, int]:
+        """Overwrite changed rows of records already stored and append the rest"""
+        n_rows = manifest['n_rows']
+        updated_rows = existing_rows[differs]
+        updated = np.flatnonzero(found)[differs]
+        n_new = int((~found).sum())
+
+        if n_rows + n_new > manifest['capacity']:
+            self._grow(generation, manifest, n_rows + n_new)
+        new_rows = np.arange(n_rows, n_rows + n_new)
+        for name, values in encoded.items():
+            column = np.load(self._path(generation, f"{name}.npy"), mmap_mode='r+')
+            column[updated_rows] = values[updated]
+            column[new_rows] = values[~found]
+            column.flush()
+        manifest['n_rows'] = n_rows + n_new
+        return {'updated': len(updated_rows), 'appended': n_new}
+
+    def _fork(self, generation: str, manifest: Dict[str, Any]) -> str:
+        """Copy a generation's columns and manifest into a new, not yet visible generation"""
+        forked = self._new_generation_name()
+        os.makedirs(os.path.join(self.root, forked))
+        for name in self._dtypes():
+            shutil.copyfile(self._path(generation, f"{name}.npy"), self._path(forked, f"{name}.npy"))
+        self._write_manifest(forked, manifest)
+        return forked
+
+    def _swap(self, generation: str) -> None:
+        """Point readers at ``generation``; keep the one it replaces for readers still opening it"""
+        previous = self._generation()
+        self._point_current(generation)
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name not in (generation, previous) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _changed_records(self, watermark: Optional[Dict[str, Any]]) -> Any:
+        changed_at = func.coalesce(HealthRecord.updated_at, HealthRecord.created_at)
+        query = select(
+            HealthRecord.id, HealthRecord.user_id, HealthRecord.date, changed_at,
+            *(getattr(HealthRecord, FEATURE_SOURCES.get(name, name)) for name in self.features)
+        )
+        if watermark is not None:
+            overlap = timedelta(seconds=settings.FEATURE_STORE_REFRESH_OVERLAP_S)
+            query = query.where(changed_at >= datetime.fromisoformat(watermark['changed_at']) - overlap)
+        return query.order_by(changed_at, HealthRecord.id)
+
+    def _refresh_generation(
+        self, engine: Engine, generation: str, manifest: Dict[str, Any], chunk_size: int, live: bool
+    ) -> Tuple[str, Dict[str, int]]:
+        """Apply changed records to ``generation``, forking it first if it is ``live`` and rows change.
+
+        Returns the generation that now holds the data, and the counts.
+        """
+        totals = {'updated': 0, 'appended': 0}
+        # A scan ordered by (changed_at, id) yields each record once, so rows
+        # appended during this refresh never need to be looked up again.
+        record_ids = np.load(self._path(generation, "record_id.npy"), mmap_mode='r')[:manifest['n_rows']]
+        order = np.argsort(record_ids, kind='stable')
+        id_index = (order, np.asarray(record_ids[order]))
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=chunk_size).execute(
+                self._changed_records(manifest['watermark'])
+            )
+            for rows in result.partitions():
+                encoded = self._encode(rows, manifest['categories'])
+                found, existing_rows = self._locate(encoded, id_index)
+                differs = self._differs(generation, encoded, found, existing_rows)
+                if live and differs.any():
+                    generation, live = self._fork(generation, manifest), False
+                counts = self._apply(generation, manifest, encoded, found, existing_rows, differs)
+                totals['updated'] += counts['updated']
+                totals['appended'] += counts['appended']
+                last = rows[-1]
+                manifest['watermark'] = {'changed_at': last[3].isoformat(), 'id': last[0]}
+                # Commit point for this chunk
+                self._write_manifest(generation, manifest)
+        totals['rows'] = manifest['n_rows']
+        return generation, totals
+
+    def refresh(self, engine: Engine, chunk_size: Optional[int] = None, wait: bool = True) -> Optional[Dict[str, int]]:
+        """Bring the store up to date with records changed since the last refresh.
+
+        With ``wait`` off, returns None at once when another writer is busy.
+        """
+        chunk_size = chunk_size or settings.FEATURE_STORE_CHUNK_SIZE
+        with self._writer(wait) as acquired:
+            if not acquired:
+                return None
+            generation = self._generation()
+            if generation is None:
+                generation, manifest = self._create_generation(settings.FEATURE_STORE_INITIAL_CAPACITY)
+                self._point_current(generation)
+            else:
+                manifest = self._read_manifest(generation)
+                if manifest['features'] != self.features:
+                    raise ValueError("FEATURE_COLUMNS changed since the store was built; run rebuild")
+            refreshed, totals = self._refresh_generation(engine, generation, manifest, chunk_size, live=True)
+            if refreshed != generation:
+                self._swap(refreshed)
+            return totals
+
+    def rebuild(self, engine: Engine, chunk_size: Optional[int] = None) -> Dict[str, int]:
+        """Build a fresh generation from scratch and switch readers to it atomically"""
+        chunk_size = chunk_size or settings.FEATURE_STORE_CHUNK_SIZE
+        with self._writer():
+            generation, manifest = self._create_generation(settings.FEATURE_STORE_INITIAL_CAPACITY)
+            try:
+                generation, totals = self._refresh_generation(engine, generation, manifest, chunk_size, live=False)
+            except BaseException:
+                shutil.rmtree(os.path.join(self.root, generation), ignore_errors=True)
+                raise
+            self._swap(generation)
+            return totals
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", choices=("refresh", "rebuild"))
+    parser.add_argument("--chunk-size", type=int, default=settings.FEATURE_STORE_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    store = FeatureStore()
+    totals = getattr(store, args.command)(engine, args.chunk_size)
+    print(json.dumps(totals))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
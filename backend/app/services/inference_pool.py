@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+from app.core.metrics import registry
+
+POOL_RESTARTS = registry.counter('inference_pool_restarts_total', 'Times the scoring process pool was rebuilt')
+POOL_WORKERS = registry.gauge('inference_pool_workers', 'Configured scoring worker processes')
+
+# Per-process service instance and the pool's barrier, set once by the pool initializer
+_worker_service = None
+_worker_barrier = None
+
+
+def _init_worker(started: Any, timeout_s: float) -> None:
+    """Load the model, then wait until every worker of the pool has loaded it too.
+
+    A worker blocked on the barrier never takes a task, so the executor keeps
+    spawning processes for queued tasks until all of them exist.
+    """
+    global _worker_service, _worker_barrier
+    from app.services.risk_assessment import RiskAssessmentService
+    _worker_service = RiskAssessmentService()
+    _worker_barrier = started
+    started.wait(timeout_s)
+
+
+def _assess_records(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_service.assess_records(records)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _ping_at_barrier(timeout_s: float) -> int:
+    """Answer only once every worker is here, so each worker answers exactly one ping"""
+    _worker_barrier.wait(timeout_s)
+    return os.getpid()
+
+
+class PoolShutdownError(Exception):
+    """Raised when work is submitted to a draining or stopped pool"""
+
+
+class InferencePool:
+    """Pool of worker processes that each load the risk model once.
+
+    Scoring runs outside the API process so CPU-bound work is not serialized
+    by the GIL. All ``size`` workers are spawned together and meet at a
+    barrier once their model is loaded, so the first result means every
+    worker is ready. A crashed worker breaks a ``ProcessPoolExecutor`` for
+    good, so the pool is rebuilt and the failed call retried once.
+    """
+
+    def __init__(self, size: int, health_timeout_s: float = 5.0, start_timeout_s: float = 300.0):
+        self.size = size
+        self.health_timeout_s = health_timeout_s
+        self.start_timeout_s = start_timeout_s
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started: List[Future] = []
+        self._barrier: Optional[Any] = None
+        self._lock = threading.Lock()
+        self._health_lock = threading.Lock()
+        self._draining = False
+        POOL_WORKERS.set(size)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._draining:
+                raise PoolShutdownError("Inference pool is shut down")
+            if self._executor is None:
+                self._executor = self._new_executor()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        # spawn rather than fork: the API process runs threads and an event loop
+        context = multiprocessing.get_context('spawn')
+        # Reused by health checks; a multiprocessing barrier is cyclic like threading's
+        self._barrier = context.Barrier(self.size)
+        executor = ProcessPoolExecutor(
+            max_workers=self.size,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._barrier, self.start_timeout_s)
+        )
+        # One task per worker: each spawns a process, which then waits at the barrier
+        self._started = [executor.submit(_ping) for _ in range(self.size)]
+        return executor
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        with self._lock:
+            if self._executor is not broken or self._draining:
+                return
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._executor = self._new_executor()
+            POOL_RESTARTS.inc()
+
+    def _submit(self, fn: Any, *args: Any) -> Any:
+        self.start()
+        executor = self._executor
+        if executor is None:
+            raise PoolShutdownError("Inference pool is shut down")
+        try:
+            return executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._restart(executor)
+            return self._executor.submit(fn, *args)
+
+    def assess_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score a batch in a worker process (blocking), retrying once after a crash"""
+        for attempt in range(2):
+            future = self._submit(_assess_records, records)
+            executor = self._executor
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                if attempt:
+                    raise
+                self._restart(executor)
+
+    def warm_up(self) -> None:
+        """Spawn the workers and block until each has loaded the model"""
+        self.start()
+        for future in self._started:
+            future.result()
+
+    def health_check(self) -> Dict[str, Any]:
+        """Check that every worker answers within the timeout; rebuild the pool only if it is broken.
+
+        Each ping waits at the pool's barrier, so one idle worker cannot answer
+        for the others: a worker that is hung, or still busy after
+        ``health_timeout_s``, leaves the others' pings timing out and the pool
+        is reported unhealthy.
+        """
+        with self._health_lock:
+            executor = self._executor
+            barrier = self._barrier
+            pids, broken = set(), False
+            try:
+                futures = [self._submit(_ping_at_barrier, self.health_timeout_s) for _ in range(self.size)]
+                executor, barrier = self._executor, self._barrier
+                done, _ = wait(futures, timeout=self.health_timeout_s + 1.0)
+                for future in done:
+                    try:
+                        pids.add(future.result())
+                    except BrokenProcessPool:
+                        broken = True
+                    except threading.BrokenBarrierError:
+                        pass
+            except BrokenProcessPool:
+                broken = True
+            if broken and executor is not None:
+                self._restart(executor)
+            elif len(pids) < self.size and barrier is not None:
+                # Ready the barrier for the next check (and for a late straggler)
+                barrier.reset()
+        unresponsive = self.size - len(pids)
+        return {
+            'workers': self.size,
+            'responding_pids': sorted(pids),
+            'unresponsive': unresponsive,
+            'healthy': not broken and unresponsive == 0
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for queued batches to finish"""
+        with self._lock:
+            self._draining = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -0,0 +1,192 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from app.core.metrics import SIZE_BUCKETS, registry
+
+BATCH_SIZE = registry.histogram(
+    'inference_batch_size', 'Requests scored per batched model call', buckets=SIZE_BUCKETS
+)
+QUEUE_WAIT = registry.histogram(
+    'inference_queue_wait_seconds', 'Time a request waited before its batch started'
+)
+BATCH_LATENCY = registry.histogram(
+    'inference_batch_seconds', 'Wall time of one batched model call'
+)
+QUEUE_DEPTH = registry.gauge('inference_queue_depth', 'Requests waiting to be batched')
+REJECTED = registry.counter('inference_rejected_total', 'Requests rejected because the queue was full')
+TIMEOUTS = registry.counter('inference_timeouts_total', 'Requests that timed out before being scored')
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue is at capacity"""
+
+
+@dataclass
+class _PendingRequest:
+    item: Any
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.perf_counter)
+
+
+class MicroBatcher:
+    """Collects concurrent scoring requests into batched model calls.
+
+    Requests are queued until either ``max_batch_size`` of them are waiting or
+    ``max_wait_ms`` has passed since the first one arrived, then
+    ``predict_batch`` is called once with the list of items and must return a
+    list of results in the same order. Each caller awaits its own future.
+
+    When a batch raises one of ``item_errors`` (a bad input rather than a
+    broken scorer), its items are re-scored one by one so the exception only
+    reaches the caller whose item caused it.
+    """
+
+    def __init__(
+        self,
+        predict_batch: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        max_queue_size: int = 1024,
+        timeout_s: float = 2.0,
+        max_concurrency: int = 1,
+        executor: Optional[Any] = None,
+        item_errors: Tuple[Type[Exception], ...] = (ValueError, TypeError)
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_queue_size = max_queue_size
+        self.timeout_s = timeout_s
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.item_errors = item_errors
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._inflight: set = set()
+
+    async def start(self) -> None:
+        """Start the collector on the running loop, replacing one bound to another loop or one that died"""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and self._loop is loop and not self._worker.done():
+            return
+        # The queue, semaphore and tasks belong to the loop that created them
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._inflight = set()
+        self._loop = loop
+        self._worker = loop.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop collecting, finish running batches and fail anything still queued or half-collected"""
+        if self._worker is None or self._loop is not asyncio.get_running_loop():
+            self._worker = None
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        while not self._queue.empty():
+            pending = self._queue.get_nowait()
+            if not pending.future.done():
+                pending.future.set_exception(QueueFullError("Inference queue is shutting down"))
+        QUEUE_DEPTH.set(0)
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one item and wait for its result"""
+        await self.start()
+        pending = _PendingRequest(item, asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(pending)
+        except asyncio.QueueFull:
+            REJECTED.inc()
+            raise QueueFullError("Inference queue is full")
+        QUEUE_DEPTH.set(self._queue.qsize())
+
+        try:
+            return await asyncio.wait_for(pending.future, self.timeout_s)
+        except asyncio.TimeoutError:
+            TIMEOUTS.inc()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        return registry.snapshot(prefix='inference_')
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch: List[_PendingRequest] = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait
+                while len(batch) < self.max_batch_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+                QUEUE_DEPTH.set(self._queue.qsize())
+
+                # Callers that already timed out are not worth scoring
+                batch = [pending for pending in batch if not pending.future.done()]
+                if not batch:
+                    continue
+
+                await self._slots.acquire()
+            except asyncio.CancelledError:
+                # Taken off the queue but never dispatched: nobody else will resolve these
+                for pending in batch:
+                    if not pending.future.done():
+                        pending.future.set_exception(QueueFullError("Inference queue is shutting down"))
+                raise
+            task = loop.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[_PendingRequest]) -> None:
+        started = time.perf_counter()
+        for pending in batch:
+            QUEUE_WAIT.observe(started - pending.enqueued_at)
+        BATCH_SIZE.observe(len(batch))
+
+        try:
+            try:
+                outcomes = await self._predict(batch)
+            except Exception as exc:
+                outcomes = [exc] * len(batch)
+            for pending, outcome in zip(batch, outcomes):
+                if pending.future.done():
+                    continue
+                if isinstance(outcome, BaseException):
+                    pending.future.set_exception(outcome)
+                else:
+                    pending.future.set_result(outcome)
+        finally:
+            BATCH_LATENCY.observe(time.perf_counter() - started)
+            self._slots.release()
+
+    async def _predict(self, batch: List[_PendingRequest]) -> List[Any]:
+        """Results (or per-item exceptions) for a batch, in order"""
+        loop = asyncio.get_running_loop()
+        items = [pending.item for pending in batch]
+        try:
+            outcomes = await loop.run_in_executor(self.executor, self.predict_batch, items)
+        except self.item_errors:
+            if len(batch) == 1:
+                raise
+            # One bad item must not fail its batch-mates: score each on its own
+            outcomes = await asyncio.gather(
+                *(loop.run_in_executor(self.executor, self.predict_batch, [item]) for item in items),
+                return_exceptions=True
+            )
+            outcomes = [outcome if isinstance(outcome, BaseException) else outcome[0] for outcome in outcomes]
+        return outcomes
+
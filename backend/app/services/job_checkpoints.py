@@ -0,0 +1,40 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.engine import Connection
+from app.db.upsert import dialect_insert
+from app.models.job_checkpoint import JobCheckpoint
+
+checkpoints = JobCheckpoint.__table__
+
+
+def load_checkpoint(conn: Connection, job_id: str) -> Optional[Dict[str, Any]]:
+    """Last committed checkpoint of a job, or None if it never ran"""
+    row = conn.execute(select(checkpoints).where(checkpoints.c.job_id == job_id)).mappings().first()
+    return dict(row) if row else None
+
+
+def save_checkpoint(
+    conn: Connection,
+    job_id: str,
+    position: int,
+    state: Optional[Dict[str, Any]] = None,
+    completed: bool = False
+) -> None:
+    """Upsert a checkpoint on ``conn``; call inside the transaction that did the work"""
+    values = {
+        'job_id': job_id,
+        'position': position,
+        'state': state or {},
+        'completed': completed,
+        'updated_at': datetime.utcnow(),
+    }
+    stmt = dialect_insert(conn.dialect.name, checkpoints).values(**values)
+    conn.execute(stmt.on_conflict_do_update(
+        index_elements=[checkpoints.c.job_id],
+        set_={name: stmt.excluded[name] for name in values if name != 'job_id'}
+    ))
+
+
+def reset_checkpoint(conn: Connection, job_id: str) -> None:
+    conn.execute(checkpoints.delete().where(checkpoints.c.job_id == job_id))
@@ -0,0 +1,170 @@
+import itertools
+import json
+import os
+import shutil
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import joblib
+from app.services.compiled_forest import CompiledForest, matches_sklearn
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Everything scoring needs from one model version, swapped as a unit"""
+    version: str
+    model: Any
+    scaler: Any
+    # Training-time encoding: feature order, category codes, imputation medians
+    preprocessing: Optional[Dict[str, Any]] = None
+
+
+class ModelRegistry:
+    """Directory of immutable, versioned model artifacts.
+
+    Layout::
+
+        <root>/CURRENT                    name of the active version
+        <root>/versions/<version>/
+            manifest.json
+            model.joblib                  fitted sklearn estimator
+            scaler.joblib
+            preprocessing.json            feature order, category codes, imputation medians
+            compiled/*.npy                CompiledForest arrays, memory-mapped on load
+
+    Versions are written to a temporary directory and renamed into place, and
+    ``CURRENT`` is replaced atomically, so readers never see a partial version.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.versions_dir = os.path.join(root, "versions")
+        self.current_file = os.path.join(root, "CURRENT")
+
+    def version_dir(self, version: str) -> str:
+        return os.path.join(self.versions_dir, version)
+
+    def versions(self) -> List[str]:
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if not name.startswith('.') and os.path.isfile(os.path.join(self.versions_dir, name, "manifest.json"))
+        )
+
+    def current_version(self) -> Optional[str]:
+        try:
+            with open(self.current_file) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current_stamp(self) -> Optional[int]:
+        """Cheap change marker for the active-version pointer"""
+        try:
+            return os.stat(self.current_file).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def manifest(self, version: str) -> Dict[str, Any]:
+        with open(os.path.join(self.version_dir(version), "manifest.json")) as f:
+            return json.load(f)
+
+    def publish(
+        self,
+        model: Any,
+        scaler: Any,
+        version: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        activate: bool = False,
+        preprocessing: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Write a new immutable version and optionally make it current.
+
+        Without an explicit ``version`` the name is the UTC second, suffixed
+        with ``-01``, ``-02``, ... when that name is already taken, so
+        concurrent publishes never collide and names still sort by age.
+        """
+        stamp = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+        candidates = [version] if version else itertools.chain(
+            [stamp], (f"{stamp}-{sequence:02d}" for sequence in itertools.count(1))
+        )
+
+        staging = os.path.join(self.versions_dir, f".staging-{uuid.uuid4().hex}")
+        os.makedirs(staging)
+        try:
+            # Uncompressed so numpy arrays inside the pickle can be memory-mapped
+            joblib.dump(model, os.path.join(staging, "model.joblib"))
+            joblib.dump(scaler, os.path.join(staging, "scaler.joblib"))
+            if preprocessing is not None:
+                with open(os.path.join(staging, "preprocessing.json"), "w") as f:
+                    json.dump(preprocessing, f, indent=2)
+            compiled = None
+            if getattr(model, 'estimators_', None):
+                compiled = CompiledForest.from_sklearn(model)
+                if matches_sklearn(compiled, model):
+                    compiled.save(os.path.join(staging, "compiled"))
+                else:
+                    compiled = None
+            for version in candidates:
+                manifest = {
+                    'version': version,
+                    'created_at': datetime.utcnow().isoformat(),
+                    'compiled': bool(compiled),
+                    'metadata': metadata or {}
+                }
+                with open(os.path.join(staging, "manifest.json"), "w") as f:
+                    json.dump(manifest, f, indent=2)
+                # The rename is the atomic claim on the name: it fails if the
+                # target exists, since a published version is never empty
+                if self._claim(staging, self.version_dir(version)):
+                    break
+            else:
+                raise ValueError(f"Model version {version} already exists")
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if activate:
+            self.activate(version)
+        return version
+
+    @staticmethod
+    def _claim(staging: str, target: str) -> bool:
+        """Rename ``staging`` to ``target``; False when another version already holds the name"""
+        if os.path.exists(target):
+            return False
+        try:
+            os.rename(staging, target)
+        except OSError:
+            if os.path.exists(target):
+                return False
+            raise
+        return True
+
+    def activate(self, version: str) -> None:
+        """Atomically point CURRENT at an existing version"""
+        if version not in self.versions():
+            raise ValueError(f"Unknown model version {version}")
+        tmp_file = f"{self.current_file}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_file, "w") as f:
+            f.write(version)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.current_file)
+
+    def load(self, version: str) -> ModelBundle:
+        """Load a version, memory-mapping its arrays so processes share pages"""
+        directory = self.version_dir(version)
+        compiled_dir = os.path.join(directory, "compiled")
+        if os.path.isdir(compiled_dir):
+            model = CompiledForest.load(compiled_dir, mmap_mode='r')
+        else:
+            model = joblib.load(os.path.join(directory, "model.joblib"), mmap_mode='r')
+        scaler = joblib.load(os.path.join(directory, "scaler.joblib"))
+        preprocessing = None
+        if os.path.isfile(os.path.join(directory, "preprocessing.json")):
+            with open(os.path.join(directory, "preprocessing.json")) as f:
+                preprocessing = json.load(f)
+        return ModelBundle(version=version, model=model, scaler=scaler, preprocessing=preprocessing)
@@ -0,0 +1,226 @@
+"""In-memory index for matching members to insurance products.
+
+Products are partitioned by policy type. Each partition is compiled into
+arrays: a target-profile matrix (products x RISK_DIMENSIONS), each product's
+maximum overall risk score, and an age stabbing table with one row per age
+from 0 to PRODUCT_INDEX_MAX_AGE marking the products whose [min_age, max_age]
+interval contains it. A search reads its age row, masks out products the
+member's overall score exceeds, and ranks the survivors by squared distance
+to the member's risk vector with ``np.partition``, equal distances going to
+the lower product id; no product is read from the database.
+
+Writes go through ``upsert``/``remove``, which only mark the affected
+partition dirty; it is recompiled on its next search. Changes made by other
+processes are picked up by ``refresh``, which reads products updated since
+the last refresh at most every PRODUCT_INDEX_REFRESH_S seconds. The first
+refresh loads the whole catalog in its own session, and every request that
+arrives meanwhile waits for that same load instead of searching an empty index.
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import settings
+from app.models.insurance_policy import PolicyType
+from app.models.insurance_product import InsuranceProduct
+from app.services.risk_assessment import RISK_DIMENSIONS
+
+DEFAULT_TARGET_SCORE = 0.5
+# Re-read this much before the watermark: a transaction can commit after a later one
+# whose updated_at was already seen
+REFRESH_OVERLAP = timedelta(seconds=60)
+
+
+@dataclass(frozen=True)
+class ProductEntry:
+    id: int
+    name: str
+    provider: Optional[str]
+    policy_type: PolicyType
+    coverage_amount: float
+    base_premium: float
+    min_age: int
+    max_age: int
+    max_overall_risk_score: float
+    target: Tuple[float, ...]  # per RISK_DIMENSIONS
+
+    @classmethod
+    def from_product(cls, product: InsuranceProduct) -> "ProductEntry":
+        profile = product.target_profile or {}
+        return cls(
+            id=product.id,
+            name=product.name,
+            provider=product.provider,
+            policy_type=PolicyType(product.policy_type),
+            coverage_amount=product.coverage_amount,
+            base_premium=product.base_premium,
+            min_age=product.min_age,
+            max_age=product.max_age,
+            max_overall_risk_score=product.max_overall_risk_score,
+            target=tuple(float(profile.get(dimension, DEFAULT_TARGET_SCORE)) for dimension in RISK_DIMENSIONS)
+        )
+
+
+@dataclass(frozen=True)
+class _Partition:
+    entries: Tuple[ProductEntry, ...]
+    targets: np.ndarray  # (products, RISK_DIMENSIONS)
+    max_risk: np.ndarray  # (products,)
+    by_age: np.ndarray  # (max_age + 1, products), True where the product accepts that age
+
+
+class ProductIndex:
+    def __init__(self, max_age: int, refresh_s: float):
+        self.dimensions = RISK_DIMENSIONS
+        self.max_age = max_age
+        self.refresh_s = refresh_s
+        self._lock = threading.Lock()
+        self._entries: Dict[PolicyType, Dict[int, ProductEntry]] = {}
+        self._partitions: Dict[PolicyType, Optional[_Partition]] = {}  # None = dirty
+        self._watermark: Optional[datetime] = None
+        self._refreshed_at: Optional[float] = None
+        self._first_load: Optional["asyncio.Future[None]"] = None
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def _compile(self, entries: Iterable[ProductEntry]) -> _Partition:
+        entries = tuple(sorted(entries, key=lambda entry: entry.id))
+        n = len(entries)
+        min_age = np.array([entry.min_age for entry in entries], dtype=np.intp)
+        max_age = np.array([entry.max_age for entry in entries], dtype=np.intp)
+        ages = np.arange(self.max_age + 1)[:, None]
+        partition = _Partition(
+            entries=entries,
+            targets=np.array([entry.target for entry in entries], dtype=float).reshape(n, len(self.dimensions)),
+            max_risk=np.array([entry.max_overall_risk_score for entry in entries], dtype=float),
+            by_age=(ages >= min_age) & (ages <= max_age)
+        )
+        for array in (partition.targets, partition.max_risk, partition.by_age):
+            array.setflags(write=False)
+        return partition
+
+    def _partition(self, policy_type: PolicyType) -> Optional[_Partition]:
+        partition = self._partitions.get(policy_type)
+        if partition is None and policy_type in self._partitions:
+            with self._lock:
+                partition = self._partitions.get(policy_type)
+                if partition is None and policy_type in self._partitions:
+                    partition = self._partitions[policy_type] = self._compile(self._entries[policy_type].values())
+        return partition
+
+    def _discard(self, product_id: int) -> None:
+        for policy_type, entries in self._entries.items():
+            if entries.pop(product_id, None) is not None:
+                self._partitions[policy_type] = None
+
+    def upsert(self, entry: ProductEntry) -> None:
+        with self._lock:
+            entries = self._entries.setdefault(entry.policy_type, {})
+            if entries.get(entry.id) == entry:
+                return
+            self._discard(entry.id)
+            entries[entry.id] = entry
+            self._partitions[entry.policy_type] = None
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            self._discard(product_id)
+
+    def apply(self, products: Iterable[InsuranceProduct]) -> None:
+        """Index active products and drop inactive ones"""
+        for product in products:
+            if product.is_active:
+                self.upsert(ProductEntry.from_product(product))
+            else:
+                self.remove(product.id)
+            if self._watermark is None or product.updated_at > self._watermark:
+                self._watermark = product.updated_at
+
+    async def refresh(self, db: AsyncSession, force: bool = False) -> None:
+        """Apply products changed since the last refresh; the whole catalog on the first call"""
+        if self._refreshed_at is None:
+            await self._load_catalog()
+            return
+        now = time.monotonic()
+        if not force and now - self._refreshed_at < self.refresh_s:
+            return
+        # Claimed up front so concurrent requests do not all poll, and released if the poll fails
+        previous, self._refreshed_at = self._refreshed_at, now
+        try:
+            query = select(InsuranceProduct)
+            if self._watermark is not None:
+                query = query.filter(InsuranceProduct.updated_at >= self._watermark - REFRESH_OVERLAP)
+            result = await db.execute(query)
+            self.apply(result.scalars().all())
+        except BaseException:
+            if self._refreshed_at == now:
+                self._refreshed_at = previous
+            raise
+
+    async def _load_catalog(self) -> None:
+        """Run the first load once; concurrent callers wait for the same load, and a failed one is retried"""
+        load = self._first_load
+        if load is None or load.get_loop() is not asyncio.get_running_loop():
+            load = self._first_load = asyncio.ensure_future(self._read_catalog())
+        try:
+            # Shielded: one caller giving up must not cancel the load the others wait for
+            await asyncio.shield(load)
+        except BaseException:
+            if load.done() and self._first_load is load:
+                self._first_load = None
+            raise
+
+    async def _read_catalog(self) -> None:
+        # Its own session: the load outlives whichever request started it
+        from app.db.session import AsyncReadSessionLocal
+
+        started = time.monotonic()
+        async with AsyncReadSessionLocal() as db:
+            result = await db.execute(select(InsuranceProduct).filter(InsuranceProduct.is_active.is_(True)))
+            self.apply(result.scalars().all())
+        self._refreshed_at = started
+
+    def search(
+        self,
+        age: int,
+        risk_scores: Mapping[str, float],
+        overall_risk_score: float,
+        policy_types: Optional[Sequence[PolicyType]] = None,
+        k: int = 5
+    ) -> List[Tuple[ProductEntry, float]]:
+        """The ``k`` eligible products closest to the member's risk profile, with a match score in [0, 1]"""
+        age = min(max(int(age), 0), self.max_age)
+        vector = np.array([float(risk_scores[dimension]) for dimension in self.dimensions])
+        entries, distances = [], []
+        for policy_type in (tuple(self._partitions) if policy_types is None else policy_types):
+            partition = self._partition(policy_type)
+            if partition is None or not partition.entries:
+                continue
+            positions = np.flatnonzero(partition.by_age[age] & (partition.max_risk >= overall_risk_score))
+            if positions.size:
+                delta = partition.targets[positions] - vector
+                distances.append(np.einsum('ij,ij->i', delta, delta))
+                entries.extend(partition.entries[i] for i in positions.tolist())
+        if not entries or k <= 0:
+            return []
+
+        distances = np.concatenate(distances)
+        ids = np.array([entry.id for entry in entries])
+        if k < len(distances):
+            # Everything as close as the k-th match, so a tie at k is settled by product id below
+            top = np.flatnonzero(distances <= np.partition(distances, k - 1)[k - 1])
+        else:
+            top = np.arange(len(distances))
+        top = top[np.lexsort((ids[top], distances[top]))][:k]
+        scores = 1.0 - np.sqrt(distances[top] / len(self.dimensions))
+        return [(entries[i], round(float(score), 4)) for i, score in zip(top.tolist(), scores.tolist())]
+
+
+def build_product_index() -> ProductIndex:
+    return ProductIndex(settings.PRODUCT_INDEX_MAX_AGE, settings.PRODUCT_INDEX_REFRESH_S)
@@ -0,0 +1,227 @@
+"""Premium quoting from risk scores.
+
+A rate table (built in, or JSON at QUOTE_RATE_TABLE_PATH) is loaded once into
+arrays. It has one row per product and one column per coverage tier and per
+deductible. A risk vector becomes a per-product risk adjustment factor,
+``1 + loadings @ risk``. The whole product x tier x deductible premium grid
+is then one broadcast product:
+
+    premium = coverage * base_rate * tier_factor * risk_factor * deductible_factor + policy_fee
+
+Scores are priced at the midpoint of their QUOTE_RISK_BUCKET_WIDTH bucket, so
+quotes depend only on (risk bucket, product). Each product's grid is cached
+under that key, and a request for several products prices all the cache
+misses in a single pass.
+"""
+import json
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+import numpy as np
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.insurance_policy import PolicyType
+from app.services.risk_assessment import RISK_DIMENSIONS
+
+DEFAULT_RATE_TABLE = {
+    'coverage_tiers': [50000, 100000, 250000, 500000, 1000000],
+    'tier_factors': [1.0, 0.96, 0.92, 0.88, 0.85],  # volume discount per tier
+    'deductibles': [0, 500, 1000, 2500, 5000],
+    'products': {
+        # base_rate: annual premium per unit of coverage at zero risk;
+        # deductible_factors: null where the product does not offer that deductible
+        'health': {
+            'base_rate': 0.008,
+            'policy_fee': 25.0,
+            'risk_loadings': {'cardiovascular_risk': 0.5, 'diabetes_risk': 0.5, 'respiratory_risk': 0.3,
+                              'metabolic_risk': 0.3, 'lifestyle_risk': 0.4},
+            'deductible_factors': [1.0, 0.93, 0.87, 0.78, 0.7],
+        },
+        'life': {
+            'base_rate': 0.004,
+            'policy_fee': 15.0,
+            'risk_loadings': {'cardiovascular_risk': 0.8, 'diabetes_risk': 0.4, 'respiratory_risk': 0.4,
+                              'metabolic_risk': 0.2, 'lifestyle_risk': 0.6},
+            'deductible_factors': [1.0, None, None, None, None],
+        },
+        'critical_illness': {
+            'base_rate': 0.006,
+            'policy_fee': 15.0,
+            'risk_loadings': {'cardiovascular_risk': 0.9, 'diabetes_risk': 0.6, 'respiratory_risk': 0.5,
+                              'metabolic_risk': 0.3, 'lifestyle_risk': 0.4},
+            'deductible_factors': [1.0, None, None, None, None],
+        },
+        'disability': {
+            'base_rate': 0.01,
+            'policy_fee': 20.0,
+            'risk_loadings': {'cardiovascular_risk': 0.3, 'diabetes_risk': 0.3, 'respiratory_risk': 0.3,
+                              'metabolic_risk': 0.2, 'lifestyle_risk': 0.5},
+            'deductible_factors': [1.0, 0.95, 0.9, 0.85, 0.8],
+        },
+    },
+}
+
+
+@dataclass(frozen=True)
+class RateTable:
+    products: Tuple[PolicyType, ...]
+    coverage_tiers: np.ndarray  # (tiers,)
+    tier_factors: np.ndarray  # (tiers,)
+    deductibles: np.ndarray  # (deductibles,)
+    base_rates: np.ndarray  # (products,)
+    policy_fees: np.ndarray  # (products,)
+    loadings: np.ndarray  # (products, RISK_DIMENSIONS)
+    deductible_factors: np.ndarray  # (products, deductibles), NaN where not offered
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "RateTable":
+        """Validate and pack a rate table; raises ValueError on inconsistent shapes or names"""
+        coverage_tiers = np.asarray(data['coverage_tiers'], dtype=float)
+        tier_factors = np.asarray(data['tier_factors'], dtype=float)
+        deductibles = np.asarray(data['deductibles'], dtype=float)
+        if tier_factors.shape != coverage_tiers.shape:
+            raise ValueError("tier_factors must have one entry per coverage tier")
+
+        products, base_rates, policy_fees, loadings, deductible_factors = [], [], [], [], []
+        for name, product in data['products'].items():
+            unknown = sorted(set(product.get('risk_loadings', {})) - set(RISK_DIMENSIONS))
+            if unknown:
+                raise ValueError(f"{name}: unknown risk dimensions {', '.join(unknown)}")
+            factors = [math.nan if factor is None else factor for factor in product['deductible_factors']]
+            if len(factors) != len(deductibles):
+                raise ValueError(f"{name}: deductible_factors must have one entry per deductible")
+            products.append(PolicyType(name))
+            base_rates.append(product['base_rate'])
+            policy_fees.append(product.get('policy_fee', 0.0))
+            loadings.append([product.get('risk_loadings', {}).get(dimension, 0.0) for dimension in RISK_DIMENSIONS])
+            deductible_factors.append(factors)
+
+        arrays = dict(
+            coverage_tiers=coverage_tiers,
+            tier_factors=tier_factors,
+            deductibles=deductibles,
+            base_rates=np.asarray(base_rates, dtype=float),
+            policy_fees=np.asarray(policy_fees, dtype=float),
+            loadings=np.asarray(loadings, dtype=float).reshape(len(products), len(RISK_DIMENSIONS)),
+            deductible_factors=np.asarray(deductible_factors, dtype=float).reshape(len(products), len(deductibles)),
+        )
+        for array in arrays.values():
+            array.setflags(write=False)
+        return cls(products=tuple(products), **arrays)
+
+    @classmethod
+    def load(cls, path: Optional[str] = None) -> "RateTable":
+        if path is None:
+            return cls.from_dict(DEFAULT_RATE_TABLE)
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+@dataclass(frozen=True)
+class ProductQuote:
+    """One product's premiums for a risk bucket, (tiers, deductibles), NaN where not offered"""
+    policy_type: PolicyType
+    risk_adjustment_factor: float
+    premiums: np.ndarray
+
+
+class QuoteEngine:
+    def __init__(self, table: RateTable, bucket_width: float, cache: TTLCache):
+        if not 0 < bucket_width <= 1:
+            raise ValueError("bucket_width must be in (0, 1]")
+        self.table = table
+        self.dimensions = RISK_DIMENSIONS
+        self.bucket_width = bucket_width
+        self.cache = cache
+        self._n_buckets = math.ceil(1 / bucket_width)
+        self._product_index = {product: i for i, product in enumerate(table.products)}
+
+    def risk_bucket(self, risk_scores: Mapping[str, float]) -> Tuple[int, ...]:
+        """Bucket index per risk dimension; scores are clipped to [0, 1]"""
+        scores = np.clip([float(risk_scores[dimension]) for dimension in RISK_DIMENSIONS], 0.0, 1.0)
+        return tuple(np.minimum(scores // self.bucket_width, self._n_buckets - 1).astype(int).tolist())
+
+    def bucket_midpoints(self, buckets: np.ndarray) -> np.ndarray:
+        return np.minimum((np.asarray(buckets, dtype=float) + 0.5) * self.bucket_width, 1.0)
+
+    def price(self, risk: np.ndarray, products: Optional[Sequence[int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Premium grid for each risk vector: (rows, products, tiers, deductibles), plus risk factors.
+
+        ``risk`` is (rows, RISK_DIMENSIONS); ``products`` selects rate table rows (default: all).
+        """
+        table = self.table
+        rows = slice(None) if products is None else np.asarray(products, dtype=np.intp)
+        risk_factors = 1.0 + np.atleast_2d(risk) @ table.loadings[rows].T  # (rows, products)
+        premiums = (
+            table.coverage_tiers[None, None, :, None]
+            * table.tier_factors[None, None, :, None]
+            * table.base_rates[rows][None, :, None, None]
+            * risk_factors[:, :, None, None]
+            * table.deductible_factors[rows][None, :, None, :]
+            + table.policy_fees[rows][None, :, None, None]
+        )
+        return np.round(premiums, 2), risk_factors
+
+    def quote(
+        self, risk_scores: Mapping[str, float], products: Optional[Sequence[PolicyType]] = None
+    ) -> List[ProductQuote]:
+        """Quotes for ``products`` (default: every product in the rate table), cached per risk bucket"""
+        products = list(self.table.products if products is None else products)
+        unknown = [product.value for product in products if product not in self._product_index]
+        if unknown:
+            raise ValueError(f"No rates for {', '.join(unknown)}")
+        bucket = self.risk_bucket(risk_scores)
+        quotes = {product: self.cache.get((bucket, product)) for product in products}
+
+        missing = [product for product, quote in quotes.items() if quote is None]
+        if missing:
+            premiums, risk_factors = self.price(
+                self.bucket_midpoints(bucket), [self._product_index[product] for product in missing]
+            )
+            for i, product in enumerate(missing):
+                grid = premiums[0, i]
+                grid.setflags(write=False)
+                quotes[product] = ProductQuote(product, round(float(risk_factors[0, i]), 4), grid)
+                self.cache.put((bucket, product), quotes[product])
+        return [quotes[product] for product in products]
+
+    def options(
+        self,
+        quotes: Sequence[ProductQuote],
+        coverage_amount: Optional[float] = None,
+        deductible: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """Flatten quotes into offered (product, tier, deductible) options, optionally filtered"""
+        table = self.table
+        offered = np.ones((len(table.coverage_tiers), len(table.deductibles)), dtype=bool)
+        if coverage_amount is not None:
+            offered &= (table.coverage_tiers == coverage_amount)[:, None]
+        if deductible is not None:
+            offered &= (table.deductibles == deductible)[None, :]
+
+        options = []
+        for quote in quotes:
+            tiers, deductibles = np.nonzero(offered & ~np.isnan(quote.premiums))
+            options.extend(
+                {
+                    'policy_type': quote.policy_type,
+                    'coverage_amount': coverage,
+                    'deductible': deductible_amount,
+                    'premium': premium,
+                    'risk_adjustment_factor': quote.risk_adjustment_factor,
+                }
+                for coverage, deductible_amount, premium in zip(
+                    table.coverage_tiers[tiers].tolist(),
+                    table.deductibles[deductibles].tolist(),
+                    quote.premiums[tiers, deductibles].tolist()
+                )
+            )
+        return options
+
+
+def build_quote_engine() -> QuoteEngine:
+    return QuoteEngine(
+        RateTable.load(settings.QUOTE_RATE_TABLE_PATH),
+        settings.QUOTE_RISK_BUCKET_WIDTH,
+        TTLCache('quote', settings.QUOTE_CACHE_MAX_ENTRIES, settings.QUOTE_CACHE_TTL_SECONDS)
+    )
@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+from typing import Dict, List, Mapping, Sequence, Tuple
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RecommendationRule:
+    """Recommend ``recommendations`` when ``dimension`` scores above ``threshold``.
+
+    Rules with a higher ``priority`` are listed first; ties keep declaration
+    order. A recommendation shared by several triggered rules appears once, at
+    its first position.
+    """
+    dimension: str
+    threshold: float
+    recommendations: Tuple[str, ...]
+    priority: int = 0
+
+
+DEFAULT_RULES = (
+    RecommendationRule('cardiovascular_risk', 0.7, (
+        "Schedule a cardiac check-up",
+        "Monitor blood pressure daily",
+        "Reduce salt intake",
+        "Start a regular exercise program",
+    ), priority=40),
+    RecommendationRule('diabetes_risk', 0.7, (
+        "Monitor blood sugar levels",
+        "Consult a nutritionist",
+        "Reduce sugar intake",
+        "Exercise regularly",
+    ), priority=30),
+    RecommendationRule('metabolic_risk', 0.7, (
+        "Maintain a balanced diet",
+        "Stay hydrated",
+        "Get regular sleep",
+        "Manage stress levels",
+    ), priority=20),
+    RecommendationRule('lifestyle_risk', 0.7, (
+        "Quit smoking",
+        "Limit alcohol consumption",
+        "Practice stress management",
+        "Get regular health check-ups",
+    ), priority=10),
+)
+
+
+class RecommendationEngine:
+    """Recommendation rules compiled for scalar and vectorized evaluation.
+
+    Rules are sorted by priority and compiled into a column index and a
+    threshold per rule. A batch of scores (rows x dimensions) is gathered into
+    a rows x rules matrix and compared with the thresholds in one step; each
+    row's triggered rules are packed into a bitmask, and every distinct mask is
+    resolved to its ordered, de-duplicated recommendation list once and
+    memoized. Output depends only on the mask, so it is deterministic.
+    """
+
+    MAX_RULES = 62  # masks are int64
+
+    def __init__(self, rules: Sequence[RecommendationRule], dimensions: Sequence[str]):
+        if len(rules) > self.MAX_RULES:
+            raise ValueError(f"At most {self.MAX_RULES} recommendation rules are supported, got {len(rules)}")
+        unknown = sorted({rule.dimension for rule in rules} - set(dimensions))
+        if unknown:
+            raise ValueError(f"Recommendation rules reference unknown risk dimensions: {', '.join(unknown)}")
+        order = sorted(range(len(rules)), key=lambda i: (-rules[i].priority, i))
+        self.rules = tuple(rules[i] for i in order)
+        self.dimensions = tuple(dimensions)
+        self._columns = np.array([self.dimensions.index(rule.dimension) for rule in self.rules], dtype=np.intp)
+        self._thresholds = np.array([rule.threshold for rule in self.rules], dtype=float)
+        self._bits = np.left_shift(np.int64(1), np.arange(len(self.rules), dtype=np.int64))
+        self._resolved: Dict[int, Tuple[str, ...]] = {}
+
+    def _resolve(self, mask: int) -> Tuple[str, ...]:
+        resolved = self._resolved.get(mask)
+        if resolved is None:
+            triggered = (rule.recommendations for bit, rule in enumerate(self.rules) if mask >> bit & 1)
+            resolved = self._resolved[mask] = tuple(dict.fromkeys(
+                recommendation for recommendations in triggered for recommendation in recommendations
+            ))
+        return resolved
+
+    def mask(self, risk_scores: Mapping[str, float]) -> int:
+        """Bitmask of the rules ``risk_scores`` triggers (bit i = i-th rule by priority)"""
+        mask = 0
+        for bit, rule in enumerate(self.rules):
+            if risk_scores[rule.dimension] > rule.threshold:
+                mask |= 1 << bit
+        return mask
+
+    def masks(self, scores: Mapping[str, np.ndarray], n_rows: int) -> np.ndarray:
+        """Vectorized ``mask`` over per-dimension score arrays"""
+        if not self.rules:
+            return np.zeros(n_rows, dtype=np.int64)
+        matrix = np.column_stack([np.broadcast_to(np.asarray(scores[name], dtype=float), n_rows)
+                                  for name in self.dimensions])
+        triggered = matrix[:, self._columns] > self._thresholds
+        return triggered.astype(np.int64) @ self._bits
+
+    def evaluate(self, risk_scores: Mapping[str, float]) -> List[str]:
+        """Ordered recommendations for one assessment"""
+        return list(self._resolve(self.mask(risk_scores)))
+
+    def evaluate_batch(self, scores: Mapping[str, np.ndarray], n_rows: int) -> List[List[str]]:
+        """Ordered recommendations for every row of a batch, in one vectorized pass"""
+        masks = self.masks(scores, n_rows).tolist()
+        resolved = {mask: self._resolve(mask) for mask in set(masks)}
+        return [list(resolved[mask]) for mask in masks]
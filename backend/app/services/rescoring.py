@@ -0,0 +1,310 @@
+"""Checkpointed re-scoring of members' latest assessments after a model change.
+
+Members are walked in ``user_id`` order, ``RESCORE_BATCH_SIZE`` at a time.
+Each batch's latest assessments (via ``latest_risk_assessments``) that were not
+scored by the target model version are scored in one ``assess_batch`` call and
+written back with one executemany ``UPDATE`` by id, in the same transaction as
+the job checkpoint; an assessment deleted meanwhile is simply not updated. If
+the batch cannot be scored, its rows are scored one by one and the ones that
+still fail are skipped and recorded in the checkpoint state.
+
+The job id is derived from the model version, so re-running after a crash
+resumes after the last committed batch, and a new version starts over.
+
+Between batches the job yields to live traffic: it pauses when a batch write
+takes ``RESCORE_SLOWDOWN_FACTOR`` times longer than the fastest one seen, or,
+when running inside the API process, while the API's connection pool is more
+than ``RESCORE_MAX_POOL_SATURATION`` in use.
+
+    python -m app.services.rescoring
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, func, or_, select, update
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.db.engine import pool_saturation
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.services.job_checkpoints import load_checkpoint, save_checkpoint
+
+logger = logging.getLogger(__name__)
+
+SCORE_COLUMNS = (
+    'overall_risk_score',
+    'cardiovascular_risk',
+    'diabetes_risk',
+    'respiratory_risk',
+    'metabolic_risk',
+    'lifestyle_risk',
+)
+# Ids of skipped assessments kept in the checkpoint state, most recent last
+REJECTED_IDS_KEPT = 100
+
+
+@dataclass
+class RescoreProgress:
+    """Reported after every committed batch"""
+    batch: int
+    rescored: int
+    total: int
+    last_user_id: int
+    rows_per_s: float
+    eta_s: Optional[float]
+    paused_s: float
+
+
+@dataclass
+class RescoreResult:
+    job_id: str
+    model_version: str
+    resumed_from: int = 0
+    rescored: int = 0
+    rejected: int = 0
+    total: int = 0
+    batches: int = 0
+    elapsed_s: float = 0.0
+    paused_s: float = 0.0
+    already_completed: bool = False
+
+
+class Throttle:
+    """Pause between batches while the database looks busy"""
+
+    def __init__(
+        self,
+        slowdown_factor: Optional[float] = None,
+        max_saturation: Optional[float] = None,
+        max_pause_s: Optional[float] = None,
+        pool: str = 'async_primary'
+    ):
+        self.slowdown_factor = slowdown_factor if slowdown_factor is not None else settings.RESCORE_SLOWDOWN_FACTOR
+        self.max_saturation = max_saturation if max_saturation is not None else settings.RESCORE_MAX_POOL_SATURATION
+        self.max_pause_s = max_pause_s if max_pause_s is not None else settings.RESCORE_MAX_PAUSE_S
+        self.pool = pool
+        self.baseline_s: Optional[float] = None
+
+    def pause_after(self, write_s: float) -> float:
+        """Seconds to sleep after a batch whose write took ``write_s``"""
+        # The baseline drifts up slowly so one unusually fast batch can't throttle the job forever
+        if self.baseline_s is None:
+            self.baseline_s = write_s
+        else:
+            self.baseline_s = min(self.baseline_s * 1.01, write_s)
+        pause = 0.0
+        if write_s > self.slowdown_factor * self.baseline_s:
+            # Contended: leave the database alone for as long as the write took
+            pause = write_s
+        if pool_saturation(self.pool) >= self.max_saturation:
+            pause = self.max_pause_s
+        return min(pause, self.max_pause_s)
+
+
+def default_job_id(model_version: str) -> str:
+    return f"rescore:{model_version}"
+
+
+def _stale(model_version: str) -> Any:
+    return or_(RiskAssessment.model_version.is_(None), RiskAssessment.model_version != model_version)
+
+
+def _count_stale(engine: Engine, model_version: str, after_user_id: int) -> int:
+    query = select(func.count()).select_from(LatestRiskAssessment).join(
+        RiskAssessment, RiskAssessment.id == LatestRiskAssessment.risk_assessment_id
+    ).where(LatestRiskAssessment.user_id > after_user_id, _stale(model_version))
+    with engine.connect() as conn:
+        return conn.execute(query).scalar_one()
+
+
+def _fetch_batch(conn: Any, model_version: str, after_user_id: int, batch_size: int) -> Sequence[Any]:
+    """Next members' stale latest assessments, by primary key of the pointer table"""
+    return conn.execute(
+        select(
+            LatestRiskAssessment.user_id,
+            RiskAssessment.id,
+            RiskAssessment.health_data,
+            RiskAssessment.created_at
+        ).join(
+            RiskAssessment, RiskAssessment.id == LatestRiskAssessment.risk_assessment_id
+        ).where(
+            LatestRiskAssessment.user_id > after_user_id, _stale(model_version)
+        ).order_by(LatestRiskAssessment.user_id).limit(batch_size)
+    ).all()
+
+
+def _score_one_by_one(risk_service: Any, records: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+    """Per-row scores for a batch assess_batch rejected; None for each row that fails alone"""
+    results = []
+    for record in records:
+        try:
+            scores = risk_service.assess_batch(risk_service.records_to_batch([record]))
+        except (ValueError, TypeError):
+            results.append(None)
+            continue
+        results.append(dict(
+            {name: scores[name].tolist()[0] for name in SCORE_COLUMNS},
+            recommendations=scores['recommendations'][0]
+        ))
+    return results
+
+
+def score_rows(
+    risk_service: Any, rows: Sequence[Any], model_version: str
+) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """Update parameters for ``(user_id, id, health_data, created_at)`` tuples, and the ids that could not be scored.
+
+    The rows are scored as one batch; when the batch is rejected, row by row,
+    so one malformed record only skips itself.
+    """
+    records = [row.health_data or {} for row in rows]
+    try:
+        scores = risk_service.assess_batch(risk_service.records_to_batch(records))
+    except (ValueError, TypeError):
+        results = _score_one_by_one(risk_service, records)
+    else:
+        columns = {name: scores[name].tolist() for name in SCORE_COLUMNS}
+        results = [
+            dict({name: columns[name][i] for name in SCORE_COLUMNS}, recommendations=scores['recommendations'][i])
+            for i in range(len(rows))
+        ]
+    now = datetime.utcnow()
+    values = [
+        dict(result, row_id=row.id, model_version=model_version, updated_at=now)
+        for row, result in zip(rows, results) if result is not None
+    ]
+    rejected = [row.id for row, result in zip(rows, results) if result is None]
+    return values, rejected
+
+
+def write_scores(conn: Any, values: List[Dict[str, Any]]) -> None:
+    """One executemany UPDATE by primary key; only the scores and version change"""
+    if not values:
+        return
+    table = RiskAssessment.__table__
+    conn.execute(update(table).where(table.c.id == bindparam('row_id')), values)
+
+
+def rescore_latest_assessments(
+    engine: Engine,
+    risk_service: Optional[Any] = None,
+    job_id: Optional[str] = None,
+    batch_size: Optional[int] = None,
+    throttle: Optional[Throttle] = None,
+    on_batch: Optional[Callable[[RescoreProgress], None]] = None
+) -> RescoreResult:
+    """Re-score every member's latest assessment with the active model, resuming ``job_id``"""
+    if risk_service is None:
+        from app.services.runtime import get_risk_service
+        risk_service = get_risk_service()
+    risk_service.refresh_if_changed()
+    model_version = risk_service.model_version
+    job_id = job_id or default_job_id(model_version)
+    batch_size = batch_size or settings.RESCORE_BATCH_SIZE
+    throttle = throttle or Throttle()
+
+    with engine.connect() as conn:
+        checkpoint = load_checkpoint(conn, job_id)
+    position = checkpoint['position'] if checkpoint else 0
+    rejected_ids: List[int] = []
+    result = RescoreResult(job_id=job_id, model_version=model_version, resumed_from=position)
+    if checkpoint:
+        result.rescored = checkpoint['state'].get('rescored', 0)
+        result.rejected = checkpoint['state'].get('rejected', 0)
+        result.batches = checkpoint['state'].get('batches', 0)
+        rejected_ids = checkpoint['state'].get('rejected_ids', [])
+        if checkpoint['completed']:
+            result.total = result.rescored + result.rejected
+            result.already_completed = True
+            return result
+
+    remaining = _count_stale(engine, model_version, position)
+    result.total = result.rescored + result.rejected + remaining
+    started = time.perf_counter()
+    rescored_here = 0
+    while True:
+        with engine.begin() as conn:
+            rows = _fetch_batch(conn, model_version, position, batch_size)
+            if not rows:
+                break
+            values, rejected = score_rows(risk_service, rows, model_version)
+            write_started = time.perf_counter()
+            write_scores(conn, values)
+            position = rows[-1].user_id
+            save_checkpoint(conn, job_id, position, {
+                'rescored': result.rescored + len(values),
+                'rejected': result.rejected + len(rejected),
+                'rejected_ids': (rejected_ids + rejected)[-REJECTED_IDS_KEPT:],
+                'batches': result.batches + 1,
+                'model_version': model_version,
+            })
+        write_s = time.perf_counter() - write_started
+        if rejected:
+            logger.warning(
+                "rescore %s: skipped %d assessments that could not be scored: %s", job_id, len(rejected), rejected
+            )
+            rejected_ids = (rejected_ids + rejected)[-REJECTED_IDS_KEPT:]
+        result.rescored += len(values)
+        result.rejected += len(rejected)
+        result.batches += 1
+        rescored_here += len(rows)
+
+        pause = throttle.pause_after(write_s)
+        if pause:
+            time.sleep(pause)
+            result.paused_s += pause
+
+        elapsed = time.perf_counter() - started
+        rate = rescored_here / elapsed if elapsed else 0.0
+        left = max(result.total - result.rescored - result.rejected, 0)
+        progress = RescoreProgress(
+            batch=result.batches,
+            rescored=result.rescored,
+            total=result.total,
+            last_user_id=position,
+            rows_per_s=round(rate, 1),
+            eta_s=round(left / rate, 1) if rate else None,
+            paused_s=round(result.paused_s, 3)
+        )
+        logger.info(
+            "rescore %s: %d/%d rows, %.0f rows/s, ETA %ss",
+            job_id, progress.rescored, progress.total, progress.rows_per_s, progress.eta_s
+        )
+        if on_batch is not None:
+            on_batch(progress)
+
+    with engine.begin() as conn:
+        save_checkpoint(conn, job_id, position, {
+            'rescored': result.rescored,
+            'rejected': result.rejected,
+            'rejected_ids': rejected_ids,
+            'batches': result.batches,
+            'model_version': model_version
+        }, completed=True)
+    result.elapsed_s = round(time.perf_counter() - started, 3)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--job-id", default=None, help="checkpoint key; default: derived from the model version")
+    parser.add_argument("--batch-size", type=int, default=settings.RESCORE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    from app.db.session import engine
+
+    def report(progress: RescoreProgress) -> None:
+        print(f"batch {progress.batch}: {progress.rescored}/{progress.total} rows, "
+              f"{progress.rows_per_s:.0f} rows/s, ETA {progress.eta_s}s", file=sys.stderr)
+
+    result = rescore_latest_assessments(engine, job_id=args.job_id, batch_size=args.batch_size, on_batch=report)
+    print(json.dumps(result.__dict__))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,32 +1,200 @@
 from datetime import date
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Mapping, Optional, Union
+import hashlib
+import json
+import logging
+import numbers
+import threading
+import time
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.preprocessing import StandardScaler
 import joblib
 import os
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.services.compiled_forest import CompiledForest, matches_sklearn
+from app.services.model_registry import ModelBundle, ModelRegistry
+from app.services.recommendations import DEFAULT_RULES, RecommendationEngine
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+
+logger = logging.getLogger(__name__)
+
+RISK_DIMENSIONS = (
+    'cardiovascular_risk',
+    'diabetes_risk',
+    'respiratory_risk',
+    'metabolic_risk',
+    'lifestyle_risk'
+)
+
+# Defaults applied when a health_data field is missing, mirroring assess_risk
+NUMERIC_DEFAULTS = {
+    'bmi': 25.0,
+    'systolic_bp': 120.0,
+    'diastolic_bp': 80.0,
+    'cholesterol': 200.0,
+    'blood_sugar': 100.0,
+    'age': 30.0
+}
+
+EXERCISE_LEVELS = {
+    'none': 1.0,
+    'occasional': 0.75,
+    'regular': 0.5,
+    'very_active': 0.25
+}
 
 class RiskAssessmentService:
     def __init__(self):
         self.model_path = os.path.join(settings.MODEL_PATH, "risk_assessment.joblib")
         self.scaler_path = os.path.join(settings.MODEL_PATH, "scaler.joblib")
-        self.model = self._load_model()
-        self.scaler = self._load_scaler()
+        self.registry = ModelRegistry(settings.MODEL_REGISTRY_PATH)
+        self.score_cache = TTLCache(
+            'risk_score', settings.RISK_CACHE_MAX_ENTRIES, settings.RISK_CACHE_TTL_SECONDS
+        )
+        self.recommendations = RecommendationEngine(DEFAULT_RULES, RISK_DIMENSIONS)
+        self._reload_lock = threading.Lock()
+        self._registry_stamp = None
+        self._checked_at = 0.0
+        self.reload()
+
+    @property
+    def model(self) -> Any:
+        return self.bundle.model
+
+    @property
+    def scaler(self) -> Any:
+        return self.bundle.scaler
+
+    @property
+    def model_version(self) -> str:
+        return self.bundle.version
+
+    def reload(self) -> None:
+        """(Re)load the active model version; cached scores from the old version are dropped.
+
+        The bundle is replaced with a single assignment, so calls already
+        holding the previous bundle finish on it while new calls see the new one.
+        """
+        with self._reload_lock:
+            stamp = self.registry.current_stamp()
+            version = self.registry.current_version()
+            if version:
+                bundle = self.registry.load(version)
+            else:
+                # No registry yet: fall back to the flat artifacts in MODEL_PATH
+                bundle = ModelBundle(
+                    version=self._artifact_version(),
+                    model=self._compile_model(self._load_model()),
+                    scaler=self._load_scaler()
+                )
+            self.bundle = bundle
+            self._registry_stamp = stamp
+            self.score_cache.clear()
+
+    def refresh_if_changed(self) -> None:
+        """Pick up a version activated by another process, checking at most every poll interval"""
+        now = time.monotonic()
+        if now - self._checked_at < settings.MODEL_REGISTRY_POLL_S:
+            return
+        self._checked_at = now
+        if self.registry.current_stamp() != self._registry_stamp:
+            self.reload()
+
+    def reload_due(self) -> bool:
+        """Whether the next refresh_if_changed would load a model (a stat, never a load)"""
+        return (
+            time.monotonic() - self._checked_at >= settings.MODEL_REGISTRY_POLL_S
+            and self.registry.current_stamp() != self._registry_stamp
+        )
+
+    def activate_version(self, version: str) -> None:
+        """Atomically switch the registry, and this process, to another model version"""
+        self.registry.activate(version)
+        self.reload()
 
-    def _load_model(self) -> RandomForestClassifier:
+    def _artifact_version(self) -> str:
+        """Fingerprint of the model and scaler files currently loaded"""
+        digest = hashlib.sha256()
+        for path in (self.model_path, self.scaler_path):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+            else:
+                digest.update(f"{path}:missing;".encode())
+        return digest.hexdigest()[:16]
+
+    def _load_model(self) -> "RandomForestClassifier":
+        """Load the flat model artifact; never trains, since this runs on the serving path.
+
+        Without an artifact the model is unfitted: rule-based scoring still
+        works, and ``python -m app.services.training --activate`` publishes one.
+        """
         if os.path.exists(self.model_path):
             return joblib.load(self.model_path)
-        return self._train_new_model()
+        from sklearn.ensemble import RandomForestClassifier
+        logger.warning(
+            "No model at %s and none published; run `python -m app.services.training --activate`", self.model_path
+        )
+        return RandomForestClassifier(n_estimators=100, random_state=42)
 
-    def _load_scaler(self) -> StandardScaler:
+    def _load_scaler(self) -> "StandardScaler":
         if os.path.exists(self.scaler_path):
             return joblib.load(self.scaler_path)
+        from sklearn.preprocessing import StandardScaler
         return StandardScaler()
 
-    def _train_new_model(self) -> RandomForestClassifier:
-        # TODO: Implement model training with real data
-        return RandomForestClassifier(n_estimators=100, random_state=42)
+    def _compile_model(self, model: "RandomForestClassifier") -> Union[CompiledForest, "RandomForestClassifier"]:
+        """Swap a fitted forest for its compiled form if it reproduces sklearn exactly"""
+        if not getattr(model, 'estimators_', None):
+            return model
+
+        compiled = CompiledForest.from_sklearn(model)
+        if not matches_sklearn(compiled, model):
+            logger.warning("Compiled forest disagrees with sklearn; using the sklearn model")
+            return model
+        return compiled
+
+    def encode_features(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """Feature matrix for health_data dicts, encoded as the model was trained.
+
+        Columns follow the bundle's training feature order; categories take
+        their training codes (unknown or missing: the missing code) and
+        absent numbers are NaN, which ``predict_proba`` imputes.
+        """
+        from app.services.feature_store import FEATURE_SOURCES, MISSING_CODE
+
+        bundle = self.bundle
+        preprocessing = bundle.preprocessing
+        if preprocessing is None:
+            raise ValueError(f"Model version {bundle.version} has no stored preprocessing")
+        features = np.full((len(records), len(preprocessing['features'])), np.nan)
+        for j, name in enumerate(preprocessing['features']):
+            values = [record.get(FEATURE_SOURCES.get(name, name)) for record in records]
+            if name in preprocessing['categories']:
+                codes = {level: code for code, level in enumerate(preprocessing['categories'][name])}
+                features[:, j] = [codes.get(value, MISSING_CODE) for value in values]
+            else:
+                features[:, j] = [np.nan if value is None else value for value in values]
+        return features
+
+    def predict_proba(self, features: np.ndarray) -> np.ndarray:
+        """Model class probabilities for one feature row or a small batch.
+
+        Rows are preprocessed as in training: NaNs take the stored
+        imputation medians, then the scaler is applied.
+        """
+        self.refresh_if_changed()
+        bundle = self.bundle
+        features = np.array(np.atleast_2d(features), dtype=float)
+        if bundle.preprocessing is not None:
+            missing = np.isnan(features)
+            features[missing] = np.take(bundle.preprocessing['medians'], np.nonzero(missing)[1])
+        if hasattr(bundle.scaler, 'mean_'):
+            features = bundle.scaler.transform(features)
+        return bundle.model.predict_proba(features)
 
     def calculate_bmi(self, height: float, weight: float) -> float:
         """Calculate BMI from height (cm) and weight (kg)"""
@@ -97,53 +265,60 @@ class RiskAssessmentService:
 
     def _normalize_exercise(self, frequency: str) -> float:
         """Convert exercise frequency to 0-1 range"""
-        exercise_map = {
-            'none': 1.0,
-            'occasional': 0.75,
-            'regular': 0.5,
-            'very_active': 0.25
-        }
-        return exercise_map.get(frequency, 0.5)
+        return EXERCISE_LEVELS.get(frequency, 0.5)
 
     def generate_recommendations(self, risk_scores: Dict[str, float]) -> List[str]:
-        """Generate personalized health recommendations"""
-        recommendations = []
-        
-        if risk_scores['cardiovascular_risk'] > 0.7:
-            recommendations.extend([
-                "Schedule a cardiac check-up",
-                "Monitor blood pressure daily",
-                "Reduce salt intake",
-                "Start a regular exercise program"
-            ])
-        
-        if risk_scores['diabetes_risk'] > 0.7:
-            recommendations.extend([
-                "Monitor blood sugar levels",
-                "Consult a nutritionist",
-                "Reduce sugar intake",
-                "Exercise regularly"
-            ])
-        
-        if risk_scores['metabolic_risk'] > 0.7:
-            recommendations.extend([
-                "Maintain a balanced diet",
-                "Stay hydrated",
-                "Get regular sleep",
-                "Manage stress levels"
-            ])
-        
-        if risk_scores['lifestyle_risk'] > 0.7:
-            recommendations.extend([
-                "Quit smoking",
-                "Limit alcohol consumption",
-                "Practice stress management",
-                "Get regular health check-ups"
-            ])
-        
-        return list(set(recommendations))  # Remove duplicates
+        """Generate personalized health recommendations, highest-priority rules first"""
+        return self.recommendations.evaluate(risk_scores)
+
+    def score_cache_key(self, health_data: Dict[str, Any], model_version: Optional[str] = None) -> Optional[str]:
+        """Hash of the fields the scorer reads (defaults applied) plus the model version.
+
+        ``model_version`` defaults to the version this process has loaded.
+        Returns None for inputs that cannot be canonicalized; those bypass the cache.
+        """
+        normalized = {}
+        for name, default in NUMERIC_DEFAULTS.items():
+            value = health_data.get(name, default)
+            if not isinstance(value, numbers.Real):
+                return None
+            normalized[name] = float(value)
+        for name, default in (('smoking_status', None), ('exercise_frequency', 'none')):
+            value = health_data.get(name, default)
+            if value is not None and not isinstance(value, str):
+                return None
+            normalized[name] = value
+        payload = json.dumps([model_version or self.model_version, normalized], sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get_cached(self, health_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Previously computed assessment for equivalent health_data, if still cached.
+
+        Never reloads the model, so it is safe on the event loop; callers refresh first.
+        """
+        key = self.score_cache_key(health_data)
+        cached = self.score_cache.get(key) if key is not None else None
+        if cached is None:
+            return None
+        return dict(cached, recommendations=list(cached['recommendations']))
+
+    def put_cached(self, health_data: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """Cache a result under the model version that scored it (``result['model_version']``)"""
+        key = self.score_cache_key(health_data, result['model_version'])
+        if key is not None:
+            self.score_cache.put(key, dict(result, recommendations=list(result['recommendations'])))
 
     def assess_risk(self, health_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform comprehensive health risk assessment, memoized per model version"""
+        self.refresh_if_changed()
+        cached = self.get_cached(health_data)
+        if cached is not None:
+            return cached
+        result = dict(self._assess_risk(health_data), model_version=self.model_version)
+        self.put_cached(health_data, result)
+        return result
+
+    def _assess_risk(self, health_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform comprehensive health risk assessment"""
         # Calculate individual risk scores
         cardiovascular_risk = self.calculate_cardiovascular_risk(health_data)
@@ -174,4 +349,115 @@ class RiskAssessmentService:
             'metabolic_risk': float(metabolic_risk),
             'lifestyle_risk': float(lifestyle_risk),
             'recommendations': recommendations
-        } 
\ No newline at end of file
+        } 
+
+    def assess_batch(self, batch: Mapping[str, Any]) -> Dict[str, Any]:
+        """Vectorized risk assessment over a columnar batch.
+
+        ``batch`` maps health_data field names to equal-length sequences
+        (a dict of lists/arrays or a pandas DataFrame). Missing columns fall
+        back to the same defaults as ``assess_risk``; cells are scored exactly
+        as ``assess_risk`` scores the same value, and numeric columns holding
+        values it would reject (``None``, strings) raise ValueError.
+        Returns a dict of float arrays plus a list of recommendations per row.
+        """
+        n_rows = self._batch_size(batch)
+
+        bmi = np.clip((self._numeric_column(batch, 'bmi', n_rows) - 18.5) / (30 - 18.5), 0, 1)
+        blood_pressure = np.clip((self._numeric_column(batch, 'systolic_bp', n_rows) - 90) / (140 - 90), 0, 1)
+        cholesterol = np.clip((self._numeric_column(batch, 'cholesterol', n_rows) - 150) / (250 - 150), 0, 1)
+        blood_sugar = np.clip((self._numeric_column(batch, 'blood_sugar', n_rows) - 70) / (126 - 70), 0, 1)
+        age = np.clip((self._numeric_column(batch, 'age', n_rows) - 30) / (60 - 30), 0, 1)
+        exercise = self._exercise_column(batch, n_rows)
+        smoking = (self._category_column(batch, 'smoking_status', n_rows) == 'current').astype(float)
+
+        scores = {
+            'cardiovascular_risk': bmi * 0.2 + blood_pressure * 0.3 + cholesterol * 0.2 + smoking * 0.2 + exercise * 0.1,
+            'diabetes_risk': bmi * 0.3 + blood_sugar * 0.3 + age * 0.2 + exercise * 0.2,
+            'respiratory_risk': np.full(n_rows, 0.5),  # Placeholder
+            'metabolic_risk': np.full(n_rows, 0.5),  # Placeholder
+            'lifestyle_risk': np.full(n_rows, 0.5)  # Placeholder
+        }
+
+        result = {
+            'overall_risk_score': np.column_stack([scores[name] for name in RISK_DIMENSIONS]).mean(axis=1)
+        }
+        result.update(scores)
+        result['recommendations'] = self._batch_recommendations(scores, n_rows)
+        return result
+
+    def assess_records(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Score a list of health_data dicts in one batch, returning assess_risk-shaped results.
+
+        Each result carries the ``model_version`` that scored it, so a caller in
+        another process can cache and store it under that version.
+        """
+        self.refresh_if_changed()
+        model_version = self.model_version
+        results = [self.get_cached(record) for record in records]
+        misses = [i for i, result in enumerate(results) if result is None]
+        if not misses:
+            return results
+
+        batch = self.assess_batch(self.records_to_batch([records[i] for i in misses]))
+        scores = {name: values.tolist() for name, values in batch.items() if name != 'recommendations'}
+        for row, i in enumerate(misses):
+            results[i] = dict(
+                {name: values[row] for name, values in scores.items()},
+                recommendations=batch['recommendations'][row],
+                model_version=model_version
+            )
+            self.put_cached(records[i], results[i])
+        return results
+
+    def records_to_batch(self, records: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """Columnar batch for assess_batch, filling fields a record lacks as assess_risk does"""
+        defaults = dict(NUMERIC_DEFAULTS, exercise_frequency='none')
+        fields = set(defaults).union(*records)
+        return {name: [record.get(name, defaults.get(name)) for record in records] for name in fields}
+
+    def check_record(self, health_data: Dict[str, Any]) -> None:
+        """Raise ValueError for health_data that assess_risk and assess_batch cannot score"""
+        for name, default in NUMERIC_DEFAULTS.items():
+            if not isinstance(health_data.get(name, default), numbers.Real):
+                raise ValueError(f"health_data[{name!r}] must be a number")
+
+    def _batch_size(self, batch: Mapping[str, Any]) -> int:
+        """Return the row count of a columnar batch, checking column lengths agree"""
+        lengths = {len(batch[column]) for column in batch.keys()}
+        if not lengths:
+            raise ValueError("Batch must contain at least one column")
+        if len(lengths) > 1:
+            raise ValueError("All batch columns must have the same length")
+        return lengths.pop()
+
+    def _numeric_column(self, batch: Mapping[str, Any], name: str, n_rows: int) -> np.ndarray:
+        """Read a numeric column as float64; a missing column takes the assess_risk default"""
+        if name not in batch:
+            return np.full(n_rows, NUMERIC_DEFAULTS[name])
+        values = np.asarray(batch[name])
+        if values.dtype.kind not in 'biuf':
+            raise ValueError(f"Column {name!r} must contain only numbers")
+        return values.astype(float)
+
+    def _category_column(self, batch: Mapping[str, Any], name: str, n_rows: int) -> np.ndarray:
+        """Read a categorical column as an object array (None where missing)"""
+        if name not in batch:
+            return np.full(n_rows, None, dtype=object)
+        values = np.empty(n_rows, dtype=object)
+        values[:] = list(batch[name])
+        return values
+
+    def _exercise_column(self, batch: Mapping[str, Any], n_rows: int) -> np.ndarray:
+        """Vectorized _normalize_exercise; a missing column counts as 'none'"""
+        if 'exercise_frequency' not in batch:
+            return np.full(n_rows, EXERCISE_LEVELS['none'])
+        frequency = self._category_column(batch, 'exercise_frequency', n_rows)
+        exercise = np.full(n_rows, 0.5)
+        for level, value in EXERCISE_LEVELS.items():
+            exercise[frequency == level] = value
+        return exercise
+
+    def _batch_recommendations(self, scores: Dict[str, np.ndarray], n_rows: int) -> List[List[str]]:
+        """Vectorized generate_recommendations over per-dimension score arrays"""
+        return self.recommendations.evaluate_batch(scores, n_rows)
@@ -0,0 +1,163 @@
+"""Lazily built scoring singletons for the API process.
+
+Importing this module is cheap: numpy, sklearn and the model artifacts are
+only loaded by ``get_risk_service`` (or ``warm_up``), so the app can bind its
+port and answer liveness probes before the model is ready.
+"""
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import anyio
+from app.core.config import settings
+from app.services.inference_pool import InferencePool
+from app.services.inference_queue import MicroBatcher
+
+if TYPE_CHECKING:
+    from app.services.product_index import ProductIndex
+    from app.services.quoting import QuoteEngine
+    from app.services.risk_assessment import RiskAssessmentService
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_ready = threading.Event()
+_risk_service: Optional["RiskAssessmentService"] = None
+_inference_pool: Optional[InferencePool] = None
+_risk_batcher: Optional[MicroBatcher] = None
+_quote_engine: Optional["QuoteEngine"] = None
+_product_index: Optional["ProductIndex"] = None
+_feature_refresher: Optional[threading.Thread] = None
+_stopping = threading.Event()
+
+
+def get_risk_service() -> "RiskAssessmentService":
+    global _risk_service
+    if _risk_service is None:
+        with _lock:
+            if _risk_service is None:
+                from app.services.risk_assessment import RiskAssessmentService
+                _risk_service = RiskAssessmentService()
+    return _risk_service
+
+
+async def get_risk_service_async() -> "RiskAssessmentService":
+    """Like get_risk_service, but builds the service, or reloads its model, off the event loop"""
+    risk_service = _risk_service
+    if risk_service is None:
+        return await anyio.to_thread.run_sync(get_risk_service)
+    if risk_service.reload_due():
+        await anyio.to_thread.run_sync(risk_service.refresh_if_changed)
+    return risk_service
+
+
+def get_quote_engine() -> "QuoteEngine":
+    """Rate table loaded once per process, with its (risk bucket, product) quote cache"""
+    global _quote_engine
+    if _quote_engine is None:
+        with _lock:
+            if _quote_engine is None:
+                from app.services.quoting import build_quote_engine
+                _quote_engine = build_quote_engine()
+    return _quote_engine
+
+
+def get_product_index() -> "ProductIndex":
+    """Product catalog index; empty until its first ``refresh``"""
+    global _product_index
+    if _product_index is None:
+        with _lock:
+            if _product_index is None:
+                from app.services.product_index import build_product_index
+                _product_index = build_product_index()
+    return _product_index
+
+
+def get_inference_pool() -> Optional[InferencePool]:
+    """Scoring process pool, or None when INFERENCE_WORKERS is 0"""
+    global _inference_pool
+    if _inference_pool is None and settings.INFERENCE_WORKERS > 0:
+        with _lock:
+            if _inference_pool is None:
+                _inference_pool = InferencePool(settings.INFERENCE_WORKERS)
+    return _inference_pool
+
+
+def _assess_in_process(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return get_risk_service().assess_records(records)
+
+
+def get_risk_batcher() -> MicroBatcher:
+    global _risk_batcher
+    if _risk_batcher is None:
+        pool = get_inference_pool()
+        with _lock:
+            if _risk_batcher is None:
+                _risk_batcher = MicroBatcher(
+                    pool.assess_records if pool else _assess_in_process,
+                    max_batch_size=settings.INFERENCE_BATCH_MAX_SIZE,
+                    max_wait_ms=settings.INFERENCE_BATCH_WINDOW_MS,
+                    max_queue_size=settings.INFERENCE_QUEUE_MAX_SIZE,
+                    timeout_s=settings.INFERENCE_REQUEST_TIMEOUT_S,
+                    max_concurrency=max(settings.INFERENCE_WORKERS, 1)
+                )
+    return _risk_batcher
+
+
+def _refresh_features_periodically(interval_s: float) -> None:
+    from app.db.session import engine
+    from app.services.feature_store import FeatureStore
+
+    store = FeatureStore()
+    while not _stopping.wait(interval_s):
+        try:
+            # Skip the round if another process is already refreshing
+            totals = store.refresh(engine, wait=False)
+        except Exception:
+            logger.exception("Feature store refresh failed; retrying in %ss", interval_s)
+            continue
+        if totals is not None:
+            logger.info("feature store refreshed: %s", totals)
+
+
+def start_feature_refresh() -> None:
+    """Keep the feature store current with HealthRecord writes, every FEATURE_STORE_REFRESH_S (0: off)"""
+    global _feature_refresher
+    if settings.FEATURE_STORE_REFRESH_S <= 0:
+        return
+    with _lock:
+        if _feature_refresher is None or not _feature_refresher.is_alive():
+            _stopping.clear()
+            _feature_refresher = threading.Thread(
+                target=_refresh_features_periodically,
+                args=(settings.FEATURE_STORE_REFRESH_S,),
+                name="feature-store-refresh",
+                daemon=True
+            )
+            _feature_refresher.start()
+
+
+def warm_up() -> None:
+    """Load the model and spawn scoring workers, then mark the process ready (blocking)"""
+    try:
+        get_risk_service()
+        pool = get_inference_pool()
+        if pool is not None:
+            pool.warm_up()
+    except Exception:
+        logger.exception("Warm-up failed; the process will stay unready")
+        raise
+    _ready.set()
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+async def shutdown() -> None:
+    """Drain queued requests first, then let the workers finish their batches"""
+    _ready.clear()
+    _stopping.set()
+    if _risk_batcher is not None:
+        await _risk_batcher.stop()
+    if _inference_pool is not None:
+        await anyio.to_thread.run_sync(_inference_pool.shutdown)
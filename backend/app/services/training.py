@@ -0,0 +1,246 @@
+"""Nightly training pipeline for the risk model.
+
+Stages, each timed into the report stored with the published version:
+
+1. labels     one row per member from ``latest_risk_assessments``; a member is
+              high-risk when their latest overall score is at least
+              ``TRAINING_LABEL_THRESHOLD``
+2. rows       feature-store rows of labelled members, read in chunks of
+              ``TRAINING_CHUNK_ROWS`` (no DataFrame of the whole table)
+3. prepare    median imputation + scaling, cached on disk with joblib.Memory
+              and memory-mapped back on reruns over the same data
+4. search     successive-halving random search over forest hyperparameters
+              on a subsample, growing ``n_estimators`` only for survivors,
+              with cached stratified folds
+5. fit        final forest on every row, trees built on all cores
+6. publish    versioned artifacts in the model registry
+
+The labels are not outcomes: ``overall_risk_score`` is what the rule-based
+scorer in ``app.services.risk_assessment`` wrote, so the forest learns to
+imitate those rules from the feature-store columns. Replace the label query
+once claims or other observed outcomes are recorded.
+
+    python -m app.services.training --activate
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+import warnings
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from joblib import Memory
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.services.feature_store import FeatureStore
+from app.services.model_registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SPACE = {
+    'max_depth': [8, 12, 16, 24, None],
+    'min_samples_leaf': [1, 2, 5, 10, 25],
+    'max_features': ['sqrt', 0.5, 0.8],
+    'max_samples': [0.25, 0.5, 0.8, None],
+    'class_weight': [None, 'balanced'],
+}
+
+
+def _prepare(store_root: str, fingerprint: str, rows: np.ndarray, chunk_rows: int) -> Dict[str, Any]:
+    """Imputed, scaled float32 feature matrix for ``rows``.
+
+    Cached by joblib.Memory on its arguments: ``fingerprint`` identifies the
+    feature-store state, so a rerun over unchanged data skips this step.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    frame = FeatureStore(store_root).load()
+    X = np.empty((len(rows), len(frame.features)), dtype=np.float32)
+    for start in range(0, len(rows), chunk_rows):
+        chunk = rows[start:start + chunk_rows]
+        X[start:start + len(chunk)] = frame.matrix(chunk)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns impute to 0
+        medians = np.nanmedian(X, axis=0)
+    medians = np.where(np.isnan(medians), 0.0, medians).astype(np.float32)
+    missing = np.isnan(X)
+    X[missing] = np.take(medians, np.nonzero(missing)[1])
+
+    scaler = StandardScaler(copy=False).fit(X)
+    X = scaler.transform(X).astype(np.float32, copy=False)
+    return {'X': X, 'medians': medians, 'scaler': scaler}
+
+
+def _folds(y: np.ndarray, n_splits: int, seed: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Stratified CV folds over ``y``; cached so repeated searches reuse them"""
+    from sklearn.model_selection import StratifiedKFold
+
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    return [(train, test) for train, test in splitter.split(np.zeros(len(y)), y)]
+
+
+class TrainingPipeline:
+    def __init__(
+        self,
+        store: Optional[FeatureStore] = None,
+        registry: Optional[ModelRegistry] = None,
+        cache_dir: Optional[str] = None,
+        n_jobs: int = -1,
+        seed: int = 42
+    ):
+        self.store = store or FeatureStore()
+        self.registry = registry or ModelRegistry(settings.MODEL_REGISTRY_PATH)
+        self.memory = Memory(cache_dir or settings.TRAINING_CACHE_PATH, mmap_mode='r', verbose=0)
+        self.n_jobs = n_jobs
+        self.seed = seed
+        self.timings: Dict[str, float] = {}
+
+    @contextmanager
+    def _timed(self, stage: str) -> Iterator[None]:
+        started = time.perf_counter()
+        yield
+        self.timings[stage] = round(time.perf_counter() - started, 3)
+        logger.info("training stage %s took %.1fs", stage, self.timings[stage])
+
+    def _member_labels(self, engine: Engine) -> Tuple[np.ndarray, np.ndarray]:
+        """(sorted user ids, 0/1 labels) from each member's latest assessment"""
+        query = select(LatestRiskAssessment.user_id, RiskAssessment.overall_risk_score).join(
+            RiskAssessment, RiskAssessment.id == LatestRiskAssessment.risk_assessment_id
+        ).order_by(LatestRiskAssessment.user_id)
+        user_ids, scores = [], []
+        with engine.connect() as conn:
+            result = conn.execution_options(stream_results=True, yield_per=settings.TRAINING_CHUNK_ROWS).execute(query)
+            for rows in result.partitions():
+                user_ids.append(np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)))
+                scores.append(np.fromiter((row[1] for row in rows), dtype=np.float64, count=len(rows)))
+        if not user_ids:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8)
+        labels = (np.concatenate(scores) >= settings.TRAINING_LABEL_THRESHOLD).astype(np.int8)
+        return np.concatenate(user_ids), labels
+
+    def _labelled_rows(self, frame: Any, user_ids: np.ndarray, labels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature-store row numbers of labelled members, and their labels, chunk by chunk"""
+        rows, y = [], []
+        for start in range(0, len(frame), settings.TRAINING_CHUNK_ROWS):
+            members = np.asarray(frame['user_id'][start:start + settings.TRAINING_CHUNK_ROWS])
+            position = np.searchsorted(user_ids, members)
+            known = position < len(user_ids)
+            known[known] = user_ids[position[known]] == members[known]
+            rows.append(np.flatnonzero(known) + start)
+            y.append(labels[position[known]])
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int8)
+        return np.concatenate(rows), np.concatenate(y)
+
+    def _search(self, X: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+        """Successive-halving search; weak candidates are dropped before they get many trees"""
+        from sklearn.ensemble import RandomForestClassifier
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingRandomSearchCV
+
+        rng = np.random.default_rng(self.seed)
+        if len(y) > settings.TRAINING_SEARCH_ROWS:
+            subset = np.sort(rng.choice(len(y), settings.TRAINING_SEARCH_ROWS, replace=False))
+            X, y = X[subset], y[subset]
+        folds = self.memory.cache(_folds)(y, settings.TRAINING_CV_FOLDS, self.seed)
+
+        search = HalvingRandomSearchCV(
+            RandomForestClassifier(random_state=self.seed, n_jobs=1),
+            SEARCH_SPACE,
+            n_candidates=settings.TRAINING_SEARCH_CANDIDATES,
+            resource='n_estimators',
+            min_resources=max(settings.TRAINING_MAX_ESTIMATORS // 27, 4),
+            max_resources=settings.TRAINING_MAX_ESTIMATORS,
+            factor=3,
+            cv=folds,
+            scoring='roc_auc',
+            n_jobs=self.n_jobs,
+            random_state=self.seed,
+            refit=False
+        )
+        search.fit(X, y)
+        params = dict(search.best_params_)
+        params.pop('n_estimators', None)  # the halving resource; the final fit uses the maximum
+        return {
+            'params': params,
+            'cv_roc_auc': float(search.best_score_),
+            'iterations': int(search.n_iterations_),
+            'candidates': int(sum(search.n_candidates_)),
+        }
+
+    def run(self, engine: Engine, activate: bool = False, version: Optional[str] = None) -> Dict[str, Any]:
+        """Train, validate and publish a new model version; returns the report"""
+        from sklearn.ensemble import RandomForestClassifier
+
+        self.timings = {}
+        started = time.perf_counter()
+        frame = self.store.load()
+        if frame is None or not len(frame):
+            raise ValueError("The feature store is empty; run `python -m app.services.feature_store refresh`")
+
+        with self._timed('labels'):
+            user_ids, labels = self._member_labels(engine)
+        with self._timed('rows'):
+            rows, y = self._labelled_rows(frame, user_ids, labels)
+        if len(rows) < settings.TRAINING_MIN_ROWS or len(np.unique(y)) < 2:
+            raise ValueError(
+                f"Need at least {settings.TRAINING_MIN_ROWS} labelled rows covering both classes, got {len(rows)}"
+            )
+
+        with self._timed('prepare'):
+            prepared = self.memory.cache(_prepare)(self.store.root, frame.fingerprint, rows, settings.TRAINING_CHUNK_ROWS)
+            X = prepared['X']
+        with self._timed('search'):
+            search = self._search(X, y)
+        with self._timed('fit'):
+            model = RandomForestClassifier(
+                n_estimators=settings.TRAINING_MAX_ESTIMATORS,
+                random_state=self.seed,
+                n_jobs=self.n_jobs,
+                **search['params']
+            ).fit(X, y)
+        self.timings['total'] = round(time.perf_counter() - started, 3)
+
+        report = {
+            'rows': int(len(rows)),
+            'positive_rate': float(y.mean()),
+            'features': frame.features,
+            'categories': frame.categories,
+            'imputation_medians': prepared['medians'].tolist(),
+            'search': search,
+            'timings_s': self.timings,
+        }
+        with self._timed('publish'):
+            report['version'] = self.registry.publish(
+                model, prepared['scaler'], version=version, metadata=report, activate=activate,
+                preprocessing={
+                    'features': frame.features,
+                    'categories': frame.categories,
+                    'medians': report['imputation_medians'],
+                }
+            )
+        return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--activate", action="store_true", help="make the new version current")
+    parser.add_argument("--version", default=None)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    from app.db.session import engine
+
+    report = TrainingPipeline(n_jobs=args.n_jobs).run(engine, activate=args.activate, version=args.version)
+    print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""Scaling benchmark for cohort queries.
+
+Grows a risk_assessments table through --sizes and, at each size, times the
+cohort endpoint's statement (filters and aggregates in SQL over indexed typed
+columns) against the old approach of loading every latest assessment and
+filtering its health_data in Python.
+
+The cohort under test -- current smokers over 50 with cardiovascular_risk
+> 0.7 -- keeps a fixed size (--cohort members) while the table grows, which
+is the case an index must make cheap. Query time is fitted against table size
+on a log-log scale; the run fails when the indexed query's exponent exceeds
+--max-exponent (1.0 means linear, i.e. a full scan).
+
+    python -m benchmarks.cohort --sizes 10000 40000 160000
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+from benchmarks.harness import time_calls
+from benchmarks.suite import configure_environment, make_health_data, seed_users
+
+SCORES = ('cardiovascular_risk', 'diabetes_risk', 'respiratory_risk', 'metabolic_risk', 'lifestyle_risk')
+CHUNK_SIZE = 5000
+
+
+def make_row(rnd: random.Random, in_cohort: bool) -> Dict[str, Any]:
+    """Health data and scores that match the benchmark cohort only when ``in_cohort``"""
+    health_data = make_health_data(rnd)
+    scores = {name: rnd.random() for name in SCORES}
+    if in_cohort:
+        health_data.update(smoking_status='current', age=rnd.randint(51, 90))
+        scores['cardiovascular_risk'] = rnd.uniform(0.71, 1.0)
+    else:
+        scores['cardiovascular_risk'] = rnd.uniform(0.0, 0.7)
+        if health_data['smoking_status'] == 'current':
+            health_data['age'] = rnd.randint(18, 50)
+    return dict(scores, health_data=health_data, overall_risk_score=sum(scores.values()) / len(scores))
+
+
+def grow(engine: Any, members: int, history: int, cohort: int, rnd: random.Random) -> None:
+    """Add ``members`` members with ``history`` assessments each; the first ``cohort`` latest ones match"""
+    from sqlalchemy import insert
+    from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment, promoted_columns
+
+    assessments, latest = RiskAssessment.__table__, LatestRiskAssessment.__table__
+    started = datetime.utcnow() - timedelta(days=history)
+    for offset in range(0, members, CHUNK_SIZE):
+        user_ids = seed_users(min(CHUNK_SIZE, members - offset))
+        rows = []
+        for position, user_id in enumerate(user_ids):
+            for day in range(history):
+                is_latest = day == history - 1
+                row = make_row(rnd, in_cohort=is_latest and offset + position < cohort)
+                rows.append(dict(
+                    row, **promoted_columns(row['health_data']),
+                    user_id=user_id, recommendations=[], model_version='bench',
+                    created_at=started + timedelta(days=day), updated_at=started + timedelta(days=day)
+                ))
+        with engine.begin() as conn:
+            inserted = conn.execute(insert(assessments).returning(assessments.c.id, sort_by_parameter_order=True), rows)
+            ids = [row[0] for row in inserted]
+            # Every history-th row is a member's newest
+            conn.execute(insert(latest), [
+                {'user_id': rows[i]['user_id'], 'risk_assessment_id': ids[i], 'created_at': rows[i]['created_at']}
+                for i in range(history - 1, len(rows), history)
+            ])
+
+
+def analyze(engine: Any) -> None:
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def scan_cohort(conn: Any) -> int:
+    """The pre-index approach: fetch every latest assessment and filter health_data in Python"""
+    from sqlalchemy import select
+    from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+
+    rows = conn.execute(
+        select(RiskAssessment.health_data, RiskAssessment.cardiovascular_risk).join(
+            LatestRiskAssessment, LatestRiskAssessment.risk_assessment_id == RiskAssessment.id
+        )
+    ).all()
+    return sum(
+        1 for health_data, cardiovascular_risk in rows
+        if health_data.get('smoking_status') == 'current' and (health_data.get('age') or 0) > 50
+        and cardiovascular_risk > 0.7
+    )
+
+
+def growth_exponent(sizes: Sequence[int], timings_ms: Sequence[float]) -> float:
+    """Least-squares slope of log(time) over log(size): ~1 for a scan, ~0 for an index lookup"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(max(timing, 1e-6)) for timing in timings_ms]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    spread = sum((x - mean_x) ** 2 for x in xs)
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / spread if spread else 0.0
+
+
+def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    from app.api.v1.endpoints.cohort import cohort_query
+    from app.db.session import engine
+    from app.schemas.cohort import CohortQuery
+
+    query = cohort_query(CohortQuery(
+        smoking_status=['current'], age={'gt': 50}, cardiovascular_risk={'gt': 0.7}
+    ), engine.dialect.name)
+    rnd = random.Random(args.seed)
+    results, rows = [], 0
+    for size in sorted(args.sizes):
+        members = max((size - rows) // args.history, 0)
+        grow(engine, members, args.history, args.cohort if rows == 0 else 0, rnd)
+        rows += members * args.history
+        analyze(engine)
+
+        with engine.connect() as conn:
+            matched = conn.execute(query).one().members
+            scanned = scan_cohort(conn)
+            if matched != scanned:
+                raise AssertionError(f"cohort query found {matched} members, the scan {scanned}")
+            indexed = time_calls(lambda i: conn.execute(query).all(), args.iterations, warmup=5)
+            scan = time_calls(lambda i: scan_cohort(conn), args.scan_iterations, warmup=1)
+        results.append({'rows': rows, 'members': matched, 'indexed': indexed, 'scan': scan})
+        print(f"{rows:>10,} rows  {matched:>6} members  indexed p50 {indexed['p50_ms']:9.3f} ms  "
+              f"scan p50 {scan['p50_ms']:10.3f} ms")
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 40000, 160000],
+                        help="risk_assessments rows to measure at (the table only grows)")
+    parser.add_argument("--history", type=int, default=4, help="assessments per member")
+    parser.add_argument("--cohort", type=int, default=200, help="members matching the cohort filter")
+    parser.add_argument("--iterations", type=int, default=200, help="indexed queries per size")
+    parser.add_argument("--scan-iterations", type=int, default=5, help="full scans per size")
+    parser.add_argument("--max-exponent", type=float, default=0.5,
+                        help="fail when indexed query time grows faster than size**max_exponent")
+    parser.add_argument("--database-url", default=None, help="default: a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", default=None, help="also write the full results as JSON here")
+    args = parser.parse_args()
+    if len(args.sizes) < 2:
+        parser.error("--sizes needs at least two table sizes")
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        configure_environment(argparse.Namespace(database_url=args.database_url, inference_workers=0), workdir)
+        results = run(args)
+
+    sizes = [result['rows'] for result in results]
+    exponents = {
+        kind: round(growth_exponent(sizes, [result[kind]['p50_ms'] for result in results]), 3)
+        for kind in ('indexed', 'scan')
+    }
+    print(f"time ~ rows^k: indexed k={exponents['indexed']}, scan k={exponents['scan']}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'results': results, 'exponents': exponents}, f, indent=2)
+
+    if exponents['indexed'] > args.max_exponent:
+        print(f"FAIL: indexed cohort query grows as rows^{exponents['indexed']} "
+              f"(allowed {args.max_exponent})")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Cold-start budget check for the API process.
+
+Runs ``python -X importtime -c "import app.main"`` in a fresh interpreter,
+parses the per-module timings and fails when the total import time exceeds
+the budget or when a module that must stay lazy (sklearn, joblib, ...) is
+imported before the app serves its first request.
+
+    python -m benchmarks.cold_start --budget-ms 2000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_FORBIDDEN = ("sklearn", "joblib", "scipy", "pandas")
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def measure_imports(module: str) -> List[Tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) for every import of ``module``"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def summarize(imports: List[Tuple[str, int, int, int]], top: int) -> Dict[str, object]:
+    total_us = sum(self_us for _, self_us, _, _ in imports)
+    by_package: Dict[str, int] = {}
+    for name, self_us, _, _ in imports:
+        package = name.split('.')[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    slowest = sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]
+    return {
+        'total_ms': total_us / 1000,
+        'modules': len(imports),
+        'slowest': [(package, self_us / 1000) for package, self_us in slowest],
+        'imported': {name for name, _, _, _ in imports}
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument(
+        "--budget-ms", type=float, default=float(os.getenv("COLD_START_BUDGET_MS", "2000")),
+        help="maximum total import time (sum of self times)"
+    )
+    parser.add_argument(
+        "--forbid", action="append", default=None,
+        help="top-level package that must not be imported eagerly (repeatable)"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of N runs")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    forbidden = tuple(args.forbid or DEFAULT_FORBIDDEN)
+
+    summary = min(
+        (summarize(measure_imports(args.module), args.top) for _ in range(args.runs)),
+        key=lambda result: result['total_ms']
+    )
+
+    print(f"import {args.module}: {summary['total_ms']:.1f} ms across {summary['modules']} modules "
+          f"(budget {args.budget_ms:.0f} ms)")
+    for package, package_ms in summary['slowest']:
+        print(f"  {package_ms:9.1f} ms  {package}")
+
+    failures = []
+    if summary['total_ms'] > args.budget_ms:
+        failures.append(f"cold start {summary['total_ms']:.1f} ms exceeds budget {args.budget_ms:.0f} ms")
+    eager = sorted(
+        name for name in summary['imported']
+        if name.split('.')[0] in forbidden and '.' not in name
+    )
+    if eager:
+        failures.append(f"heavy packages imported at startup: {', '.join(eager)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""Timing, percentile and baseline helpers shared by the benchmark scripts.
+
+A baseline file holds one summary per benchmark name::
+
+    {"meta": {...}, "results": {"assess_risk": {"throughput": ..., "p50_ms": ..., ...}}}
+
+``compare`` flags a benchmark when a gated metric is worse than its baseline
+by more than the threshold (a fraction: 0.2 means 20% slower), and
+``missing_cases`` the baseline benchmarks a run did not produce. A run with
+failed operations is never saved as a baseline.
+"""
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# metric -> True when larger is better
+GATED_METRICS = {
+    'throughput': True,
+    'p95_ms': False,
+}
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Linear-interpolated percentile of an already sorted list (q in 0..100)"""
+    if not sorted_values:
+        return math.nan
+    position = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize(latencies_s: List[float], elapsed_s: float, units_per_op: int = 1, errors: int = 0) -> Dict[str, Any]:
+    """Throughput (units/s over wall time) and latency percentiles in milliseconds"""
+    latencies_ms = sorted(latency * 1000 for latency in latencies_s)
+    return {
+        'ops': len(latencies_ms),
+        'errors': errors,
+        'throughput': round(len(latencies_ms) * units_per_op / elapsed_s, 2) if elapsed_s else 0.0,
+        'mean_ms': round(sum(latencies_ms) / len(latencies_ms), 4) if latencies_ms else math.nan,
+        'p50_ms': round(percentile(latencies_ms, 50), 4),
+        'p95_ms': round(percentile(latencies_ms, 95), 4),
+        'p99_ms': round(percentile(latencies_ms, 99), 4),
+    }
+
+
+def time_calls(fn: Callable[[int], Any], iterations: int, warmup: int = 0, units_per_op: int = 1) -> Dict[str, Any]:
+    """Call ``fn(i)`` sequentially and summarize per-call latency"""
+    for i in range(warmup):
+        fn(i)
+    latencies = []
+    clock = time.perf_counter
+    started = clock()
+    for i in range(iterations):
+        call_started = clock()
+        fn(i)
+        latencies.append(clock() - call_started)
+    return summarize(latencies, clock() - started, units_per_op)
+
+
+class LatencyRecorder:
+    """Collects latencies per operation name, e.g. one entry per HTTP verb"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def timed(self, name: str, call: Awaitable[Any], ok: Callable[[Any], bool] = lambda _: True) -> Any:
+        """Await ``call``; an exception counts as an error of ``name`` and returns None"""
+        started = time.perf_counter()
+        try:
+            result = await call
+        except Exception:
+            result = None
+        self.latencies[name].append(time.perf_counter() - started)
+        if result is None or not ok(result):
+            self.errors[name] += 1
+        return result
+
+    def summaries(self, elapsed_s: float) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: summarize(latencies, elapsed_s, errors=self.errors[name])
+            for name, latencies in self.latencies.items()
+        }
+
+
+async def run_concurrent(task: Callable[[int], Awaitable[Any]], total: int, concurrency: int) -> float:
+    """Run ``task(i)`` for i in range(total) on ``concurrency`` workers; returns wall seconds"""
+    counter = iter(range(total))
+
+    async def worker() -> None:
+        for i in counter:
+            await task(i)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Dict[str, Any]]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def save_baseline(path: str, results: Dict[str, Dict[str, Any]], meta: Optional[Dict[str, Any]] = None) -> None:
+    """Write ``results`` as the baseline; raises ValueError if any benchmark had errors"""
+    failed = sorted(name for name, summary in results.items() if summary.get('errors'))
+    if failed:
+        raise ValueError(f"Not saving a baseline with failed operations: {', '.join(failed)}")
+    document = {
+        'meta': dict(
+            {
+                'created_at': datetime.utcnow().isoformat(),
+                'python': sys.version.split()[0],
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            **(meta or {})
+        ),
+        'results': {
+            name: {metric: summary[metric] for metric in ('throughput', 'p50_ms', 'p95_ms', 'p99_ms')}
+            for name, summary in results.items()
+        },
+    }
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float
+) -> List[Tuple[str, str, float, float, float]]:
+    """(name, metric, baseline, current, relative change) for every gated regression"""
+    regressions = []
+    for name, summary in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, higher_is_better in GATED_METRICS.items():
+            before, after = reference.get(metric), summary.get(metric)
+            if not before or after is None or math.isnan(after):
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions.append((name, metric, before, after, change))
+    return regressions
+
+
+def missing_cases(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> List[str]:
+    """Baseline benchmarks absent from ``results``, e.g. dropped or renamed"""
+    return sorted(set(baseline) - set(results))
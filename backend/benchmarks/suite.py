@@ -0,0 +1,294 @@
+"""Benchmark suite for risk scoring and the risk-assessment API, with regression gates.
+
+Cases:
+
+    assess_risk              RiskAssessmentService scoring of one record (uncached)
+    assess_risk_cached       the memoized assess_risk path on a hot working set
+    assess_batch             vectorized scoring of --batch-size rows (throughput in rows/s)
+    generate_recommendations recommendations for one set of risk scores
+    jwt_decode               token validation as done by the auth dependencies
+    api.<op>                 create / read / list / latest / update / delete through an
+                             in-process ASGI client, --concurrency requests in flight;
+                             each operation runs as its own phase over --requests
+                             assessments, so its throughput is that endpoint's rate
+
+Each case reports throughput and p50/p95/p99 latency. The API cases run
+against a throwaway SQLite database unless --database-url points at a
+disposable Postgres. Results are compared with the JSON baseline, and the run
+fails when throughput or p95 latency is worse by more than --threshold, when
+a selected baseline case did not run, when any operation failed, or when
+there is no baseline to compare with.
+
+    python -m benchmarks.suite --save-baseline       # record benchmarks/baseline.json
+    python -m benchmarks.suite --threshold 0.2       # gate a change against it
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List
+
+from benchmarks.harness import (
+    LatencyRecorder,
+    compare,
+    load_baseline,
+    missing_cases,
+    run_concurrent,
+    save_baseline,
+    time_calls,
+)
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(BENCHMARKS_DIR, "baseline.json")
+CASES = ('assess_risk', 'assess_risk_cached', 'assess_batch', 'generate_recommendations', 'jwt_decode', 'api')
+
+
+def make_health_data(rnd: random.Random) -> Dict[str, Any]:
+    return {
+        'age': rnd.randint(18, 90),
+        'bmi': round(rnd.uniform(16, 42), 1),
+        'systolic_bp': rnd.randint(95, 185),
+        'diastolic_bp': rnd.randint(60, 115),
+        'cholesterol': round(rnd.uniform(140, 300), 1),
+        'blood_sugar': round(rnd.uniform(65, 180), 1),
+        'smoking_status': rnd.choice(['never', 'former', 'current']),
+        'exercise_frequency': rnd.choice(['none', 'occasional', 'regular', 'very_active']),
+    }
+
+
+def configure_environment(args: argparse.Namespace, workdir: str) -> None:
+    """Point the app at scratch storage; must run before any ``app`` import"""
+    os.environ['SQLALCHEMY_DATABASE_URI'] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ['INFERENCE_WORKERS'] = str(args.inference_workers)
+    os.environ['WARM_UP_ON_STARTUP'] = 'false'
+    os.environ['SQLALCHEMY_READ_REPLICA_URI'] = ''
+    for name in ('MODEL_PATH', 'MODEL_REGISTRY_PATH', 'FEATURE_STORE_PATH', 'TRAINING_CACHE_PATH'):
+        os.environ[name] = os.path.join(workdir, name.lower())
+
+
+def bench_scoring(args: argparse.Namespace, cases: List[str]) -> Dict[str, Dict[str, Any]]:
+    from app.services.runtime import get_risk_service
+
+    service = get_risk_service()
+    rnd = random.Random(args.seed)
+    records = [make_health_data(rnd) for _ in range(args.iterations)]
+    results = {}
+
+    if 'assess_risk' in cases:
+        results['assess_risk'] = time_calls(
+            lambda i: service._assess_risk(records[i]), args.iterations, warmup=min(100, args.iterations)
+        )
+    if 'assess_risk_cached' in cases:
+        hot = records[:100]
+        for record in hot:
+            service.assess_risk(record)
+        results['assess_risk_cached'] = time_calls(lambda i: service.assess_risk(hot[i % len(hot)]), args.iterations)
+    if 'assess_batch' in cases:
+        batch_records = [make_health_data(rnd) for _ in range(args.batch_size)]
+        batch = {name: [record[name] for record in batch_records] for name in batch_records[0]}
+        rounds = max(args.iterations // args.batch_size, 20)
+        results['assess_batch'] = time_calls(
+            lambda i: service.assess_batch(batch), rounds, warmup=2, units_per_op=args.batch_size
+        )
+    if 'generate_recommendations' in cases:
+        scores = [
+            {name: rnd.random() for name in ('cardiovascular_risk', 'diabetes_risk', 'respiratory_risk',
+                                             'metabolic_risk', 'lifestyle_risk')}
+            for _ in range(1000)
+        ]
+        results['generate_recommendations'] = time_calls(
+            lambda i: service.generate_recommendations(scores[i % len(scores)]), args.iterations
+        )
+    return results
+
+
+def make_token(user_id: int, expires_in: timedelta = timedelta(hours=1)) -> str:
+    from jose import jwt
+    from app.core.config import settings
+
+    return jwt.encode(
+        {'sub': str(user_id), 'exp': datetime.utcnow() + expires_in},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+
+
+def bench_jwt(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    from app.api.deps import _decode_token
+
+    tokens = [make_token(user_id) for user_id in range(1, 101)]
+    return {'jwt_decode': time_calls(lambda i: _decode_token(tokens[i % len(tokens)]), args.iterations, warmup=100)}
+
+
+def seed_users(n_users: int) -> List[int]:
+    """Create the schema and ``n_users`` members; returns their ids"""
+    from sqlalchemy import insert
+    from app.db.base_class import Base
+    from app.db.session import engine
+    from app.models import user, health_record, risk_assessment, insurance_policy, insurance_product, job_checkpoint  # noqa: F401
+    from app.models.user import User
+
+    Base.metadata.create_all(bind=engine)
+    now = datetime.utcnow()
+    stamp = now.strftime("%Y%m%d%H%M%S%f")
+    with engine.begin() as conn:
+        result = conn.execute(insert(User.__table__).returning(User.__table__.c.id), [
+            {
+                'email': f"bench-{stamp}-{i}@example.com",
+                'hashed_password': 'x',
+                'date_of_birth': date(1980, 1, 1),
+                'gender': 'F',
+                'is_active': True,
+                'is_superuser': False,
+                'created_at': now,
+                'updated_at': now,
+            }
+            for i in range(n_users)
+        ])
+        return [row[0] for row in result]
+
+
+async def bench_api(args: argparse.Namespace) -> Dict[str, Dict[str, Any]]:
+    import httpx
+    from app.core.config import settings
+    from app.main import app
+    from app.services import runtime
+
+    user_ids = seed_users(args.users)
+    headers = [{'Authorization': f"Bearer {make_token(user_id)}"} for user_id in user_ids]
+    runtime.warm_up()
+
+    prefix = f"{settings.API_V1_STR}/risk-assessment"
+    rnd = random.Random(args.seed)
+    payloads = [{'health_data': make_health_data(rnd)} for _ in range(256)]
+    ok = lambda response: response.status_code < 400  # noqa: E731
+    results: Dict[str, Dict[str, Any]] = {}
+
+    async def phase(name: str, request: Any, total: int) -> List[Any]:
+        """Run ``request(i)`` for every i as one timed phase; returns the responses"""
+        recorder = LatencyRecorder()
+        responses: List[Any] = [None] * total
+
+        async def call(i: int) -> None:
+            responses[i] = await recorder.timed(name, request(i), ok)
+
+        elapsed = await run_concurrent(call, total, args.concurrency)
+        results.update(recorder.summaries(elapsed))
+        return responses
+
+    def auth(i: int) -> Dict[str, str]:
+        return headers[i % len(headers)]
+
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            def create(i: int) -> Any:
+                return client.post(f"{prefix}/", json=payloads[i % len(payloads)], headers=auth(i))
+
+            await phase('warmup', create, args.concurrency)
+            created = await phase('api.create', create, args.requests)
+            ids = [response.json()['id'] if response is not None and ok(response) else None for response in created]
+            # Later phases touch only the assessments that were created
+            live = [i for i, assessment_id in enumerate(ids) if assessment_id is not None]
+            await phase('api.read', lambda n: client.get(f"{prefix}/{ids[live[n]]}", headers=auth(live[n])), len(live))
+            await phase('api.list', lambda n: client.get(
+                f"{prefix}/", params={'limit': 20}, headers=auth(live[n])
+            ), len(live))
+            await phase('api.latest', lambda n: client.get(f"{prefix}/latest", headers=auth(live[n])), len(live))
+            await phase('api.update', lambda n: client.put(
+                f"{prefix}/{ids[live[n]]}", json={'recommendations': ['Benchmark']}, headers=auth(live[n])
+            ), len(live))
+            await phase('api.delete', lambda n: client.delete(
+                f"{prefix}/{ids[live[n]]}", headers=auth(live[n])
+            ), len(live))
+    finally:
+        await runtime.shutdown()
+    results.pop('warmup', None)
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]]) -> None:
+    print(f"{'benchmark':28} {'ops':>7} {'throughput/s':>14} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'vs base':>8}")
+    for name, summary in results.items():
+        reference = baseline.get(name, {})
+        change = ""
+        if reference.get('throughput'):
+            change = f"{(summary['throughput'] - reference['throughput']) / reference['throughput']:+.1%}"
+        errors = f"  ({summary['errors']} errors)" if summary.get('errors') else ""
+        print(f"{name:28} {summary['ops']:>7} {summary['throughput']:>14,.1f} {summary['p50_ms']:>9.3f} "
+              f"{summary['p95_ms']:>9.3f} {summary['p99_ms']:>9.3f} {change:>8}{errors}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", action="append", choices=CASES, help="run only these cases (repeatable)")
+    parser.add_argument("--iterations", type=int, default=20000, help="calls per in-process case")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=500, help="assessments created, then each read, listed, updated and deleted")
+    # SQLite serializes writers: more requests in flight only queue on its lock and time out
+    parser.add_argument("--concurrency", type=int, default=4, help="raise it against Postgres")
+    parser.add_argument("--users", type=int, default=500, help="members; one per assessment by default")
+    parser.add_argument("--inference-workers", type=int, default=0, help="scoring processes for the API cases")
+    parser.add_argument("--database-url", default=None, help="default: a temporary SQLite file")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    parser.add_argument(
+        "--threshold", type=float, default=float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.2")),
+        help="allowed relative regression of throughput and p95 latency"
+    )
+    parser.add_argument("--output", default=None, help="also write the full results as JSON here")
+    args = parser.parse_args()
+    cases = args.only or list(CASES)
+
+    with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+        configure_environment(args, workdir)
+        results: Dict[str, Dict[str, Any]] = {}
+        if set(cases) & {'assess_risk', 'assess_risk_cached', 'assess_batch', 'generate_recommendations'}:
+            results.update(bench_scoring(args, cases))
+        if 'jwt_decode' in cases:
+            results.update(bench_jwt(args))
+        if 'api' in cases:
+            results.update(asyncio.run(bench_api(args)))
+
+    baseline = load_baseline(args.baseline) or {}
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        try:
+            save_baseline(args.baseline, results, {'args': {
+                name: getattr(args, name) for name in ('iterations', 'batch_size', 'requests', 'concurrency', 'users')
+            }})
+        except ValueError as e:
+            print(f"FAIL: {e}", file=sys.stderr)
+            return 1
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"FAIL: no baseline at {args.baseline}; nothing to gate against. "
+              f"Record one with --save-baseline on the reference machine", file=sys.stderr)
+        return 1
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, metric, before, after, change in regressions:
+        print(f"FAIL: {name} {metric} {before:g} -> {after:g} ({change:+.1%}, threshold {args.threshold:.0%})")
+    # Only the selected cases are expected; api.<op> results belong to the 'api' case
+    selected = {name: reference for name, reference in baseline.items() if name.split('.')[0] in cases}
+    missing = missing_cases(results, selected)
+    for name in missing:
+        print(f"FAIL: {name} is in the baseline but did not run")
+    errors = sorted(name for name, summary in results.items() if summary.get('errors'))
+    for name in errors:
+        print(f"FAIL: {name} had {results[name]['errors']} failed requests")
+    return 1 if regressions or missing or errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Point the app at scratch storage before any ``app`` module is imported.
+
+Run from backend/: ``python -m pytest``
+"""
+import asyncio
+import itertools
+import os
+import tempfile
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict
+
+import pytest
+
+_workdir = tempfile.mkdtemp(prefix="healthcare-tests-")
+
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(_workdir, 'test.db')}")
+os.environ.setdefault('SQLALCHEMY_READ_REPLICA_URI', '')
+os.environ.setdefault('INFERENCE_WORKERS', '0')
+os.environ.setdefault('WARM_UP_ON_STARTUP', 'false')
+for _name in ('MODEL_PATH', 'MODEL_REGISTRY_PATH', 'FEATURE_STORE_PATH', 'TRAINING_CACHE_PATH'):
+    os.environ.setdefault(_name, os.path.join(_workdir, _name.lower()))
+
+
+_emails = itertools.count()
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Sync engine with every table created"""
+    from app.db.base_class import Base
+    from app.db.session import engine
+    from app.models import user, health_record, risk_assessment, insurance_policy, insurance_product, job_checkpoint  # noqa: F401
+
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+@pytest.fixture
+def make_user(engine) -> Callable[..., int]:
+    """Insert a member (override any column) and return its id"""
+    from sqlalchemy import insert
+    from app.models.user import User
+
+    def make(**columns: Any) -> int:
+        now = datetime.utcnow()
+        row = dict(
+            email=f"member-{next(_emails)}@example.com",
+            hashed_password='x',
+            date_of_birth=date(1980, 1, 1),
+            gender='F',
+            is_active=True,
+            is_superuser=False,
+            created_at=now,
+            updated_at=now,
+        )
+        row.update(columns)
+        with engine.begin() as conn:
+            return conn.execute(insert(User.__table__).returning(User.__table__.c.id), row).scalar_one()
+
+    return make
+
+
+def auth_headers(user_id: int) -> Dict[str, str]:
+    from jose import jwt
+    from app.core.config import settings
+
+    token = jwt.encode(
+        {'sub': str(user_id), 'exp': datetime.utcnow() + timedelta(hours=1)},
+        settings.SECRET_KEY,
+        algorithm=settings.ALGORITHM
+    )
+    return {'Authorization': f"Bearer {token}"}
+
+
+@pytest.fixture
+def api(engine) -> Callable[[Callable[[Any], Awaitable[Any]]], Any]:
+    """Run ``scenario(client)`` against the app on a fresh event loop"""
+    import httpx
+    from app.db.session import async_engine
+    from app.main import app
+
+    def run(scenario: Callable[[Any], Awaitable[Any]]) -> Any:
+        async def main() -> Any:
+            try:
+                async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                    return await scenario(client)
+            finally:
+                # Pooled aiosqlite connections belong to this loop
+                await async_engine.dispose()
+
+        return asyncio.run(main())
+
+    return run
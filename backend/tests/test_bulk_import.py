@@ -0,0 +1,91 @@
+import io
+
+import pytest
+from sqlalchemy import func, select, text
+
+from app.core.config import settings
+from app.models.health_record import HealthRecord
+from app.services import bulk_import
+from conftest import auth_headers
+
+URL = f"{settings.API_V1_STR}/health-records/import"
+
+
+def csv_upload(rows):
+    lines = ["user_id,date,heart_rate"] + [f"{user_id},{day},{heart_rate}" for user_id, day, heart_rate in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def count_records(engine, user_id):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).where(HealthRecord.user_id == user_id)).scalar_one()
+
+
+def upload(api, admin_id, content, filename="records.csv"):
+    async def scenario(client):
+        return await client.post(URL, files={'file': (filename, content, 'text/csv')}, headers=auth_headers(admin_id))
+    response = api(scenario)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_same_name_and_size_with_different_content_is_a_new_job(api, engine, make_user):
+    admin_id, member_id = make_user(is_superuser=True), make_user()
+    first = csv_upload([(member_id, '2024-01-01', 70), (member_id, '2024-01-02', 71)])
+    second = csv_upload([(member_id, '2024-02-01', 80), (member_id, '2024-02-02', 81)])
+    assert len(first) == len(second)
+
+    assert upload(api, admin_id, first)['imported'] == 2
+    assert upload(api, admin_id, first)['already_completed'] is True
+    report = upload(api, admin_id, second)
+    assert report['already_completed'] is False and report['imported'] == 2
+    assert count_records(engine, member_id) == 4
+
+
+def test_unknown_user_is_reported_per_row(api, engine, make_user):
+    admin_id, member_id = make_user(is_superuser=True), make_user()
+    content = csv_upload([(member_id, '2024-03-01', 70), (999999, '2024-03-02', 71), (member_id, '2024-03-03', 72)])
+
+    report = upload(api, admin_id, content)
+    assert (report['imported'], report['rejected']) == (2, 1)
+    assert report['errors'] == [{'chunk': 0, 'row': 2, 'field': 'user_id', 'error': 'unknown user', 'value': '999999'}]
+    assert count_records(engine, member_id) == 2
+
+
+@pytest.fixture
+def reject_heart_rate_299(engine):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TRIGGER reject_299 BEFORE INSERT ON health_records WHEN NEW.heart_rate = 299 "
+            "BEGIN SELECT RAISE(ABORT, 'heart rate 299 rejected'); END"
+        ))
+    yield
+    with engine.begin() as conn:
+        conn.execute(text("DROP TRIGGER reject_299"))
+
+
+def test_integrity_error_falls_back_to_row_by_row(engine, make_user, reject_heart_rate_299):
+    member_id = make_user()
+    source = io.StringIO(csv_upload([
+        (member_id, '2024-04-01', 70), (member_id, '2024-04-02', 299), (member_id, '2024-04-03', 72)
+    ]).decode())
+    reports = []
+
+    result = bulk_import.import_health_records(engine, source, 'csv', 'integrity-fallback', on_chunk=reports.append)
+    assert (result.imported, result.rejected) == (2, 1)
+    assert [(error['row'], error['field']) for error in reports[0].errors] == [(2, '<row>')]
+    assert count_records(engine, member_id) == 2
+
+
+def test_driver_integrity_error_from_copy_falls_back_to_row_by_row(engine, make_user, monkeypatch):
+    member_id = make_user()
+    source = io.StringIO(csv_upload([(member_id, '2024-05-01', 70), (member_id, '2024-05-02', 71)]).decode())
+
+    def copy_fails(conn, rows):
+        # What COPY on the raw psycopg2 cursor raises: the DBAPI error, not SQLAlchemy's
+        raise engine.dialect.dbapi.IntegrityError("violates foreign key constraint")
+
+    monkeypatch.setattr(bulk_import, 'write_rows', copy_fails)
+    result = bulk_import.import_health_records(engine, source, 'csv', 'copy-integrity-fallback')
+    assert (result.imported, result.rejected) == (2, 0)
+    assert count_records(engine, member_id) == 2
@@ -0,0 +1,105 @@
+import itertools
+from datetime import datetime
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment, promoted_columns
+from conftest import auth_headers
+
+URL = f"{settings.API_V1_STR}/cohort/"
+SCORES = ('overall_risk_score', 'cardiovascular_risk', 'diabetes_risk', 'respiratory_risk', 'metabolic_risk',
+          'lifestyle_risk')
+
+_versions = itertools.count()
+
+
+@pytest.fixture
+def model_version():
+    """A model version no other test writes, so each test sees only its own members"""
+    return f"cohort-test-{next(_versions)}"
+
+
+@pytest.fixture
+def make_member(engine, make_user, model_version):
+    """A member whose latest assessment has ``health_data`` and the given scores (0.5 otherwise)"""
+    def make(health_data, **scores) -> int:
+        user_id = make_user()
+        now = datetime.utcnow()
+        row = dict(
+            user_id=user_id, health_data=health_data, recommendations=[], model_version=model_version,
+            created_at=now, updated_at=now, **promoted_columns(health_data)
+        )
+        row.update({name: scores.get(name, 0.5) for name in SCORES})
+        with engine.begin() as conn:
+            assessment_id = conn.execute(
+                insert(RiskAssessment.__table__).returning(RiskAssessment.__table__.c.id), row
+            ).scalar_one()
+            conn.execute(insert(LatestRiskAssessment.__table__), {
+                'user_id': user_id, 'risk_assessment_id': assessment_id, 'created_at': now
+            })
+        return user_id
+
+    return make
+
+
+def query(api, make_user, **body):
+    admin_id = make_user(is_superuser=True)
+
+    async def scenario(client):
+        return await client.post(URL, json=body, headers=auth_headers(admin_id))
+    response = api(scenario)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_range_and_in_filters(api, make_user, make_member, model_version):
+    make_member({'age': 55, 'smoking_status': 'current'}, cardiovascular_risk=0.8)
+    make_member({'age': 62, 'smoking_status': 'former'}, cardiovascular_risk=0.9)
+    make_member({'age': 58, 'smoking_status': 'never'}, cardiovascular_risk=0.95)
+    make_member({'age': 45, 'smoking_status': 'current'}, cardiovascular_risk=0.8)
+    make_member({'age': 70, 'smoking_status': 'current'}, cardiovascular_risk=0.6)
+
+    summary = query(
+        api, make_user, model_version=[model_version], age={'gt': 50}, cardiovascular_risk={'gt': 0.7},
+        smoking_status=['current', 'former']
+    )
+    assert summary['members'] == 2
+    [group] = summary['groups']
+    assert group['members'] == 2
+    assert group['avg_age'] == pytest.approx(58.5)
+    assert group['avg_cardiovascular_risk'] == pytest.approx(0.85)
+
+
+def test_health_data_containment(api, make_user, make_member, model_version):
+    make_member({'age': 40, 'alcohol_consumption': 'heavy', 'family_history': True})
+    make_member({'age': 41, 'alcohol_consumption': 'heavy', 'family_history': False})
+    make_member({'age': 42, 'alcohol_consumption': 'none', 'family_history': True})
+
+    summary = query(
+        api, make_user, model_version=[model_version],
+        health_data={'alcohol_consumption': 'heavy', 'family_history': True}
+    )
+    assert summary['members'] == 1
+    assert summary['groups'][0]['avg_age'] == 40
+
+
+def test_group_by_age_band(api, make_user, make_member, model_version):
+    for age, overall in ((51, 0.2), (59, 0.4), (60, 0.9), (34, 0.1)):
+        make_member({'age': age}, overall_risk_score=overall)
+
+    summary = query(api, make_user, model_version=[model_version], group_by='age_band')
+    assert summary['members'] == 4
+    assert [(group['key'], group['members']) for group in summary['groups']] == [(30, 1), (50, 2), (60, 1)]
+    assert summary['groups'][1]['avg_overall_risk_score'] == pytest.approx(0.3)
+    assert summary['groups'][1]['max_overall_risk_score'] == pytest.approx(0.4)
+
+
+def test_empty_cohort(api, make_user, make_member, model_version):
+    make_member({'age': 30})
+
+    assert query(api, make_user, model_version=[model_version], age={'ge': 90}) == {'members': 0, 'groups': []}
+    assert query(api, make_user, model_version=[model_version], age={'ge': 90}, group_by='age_band') == {
+        'members': 0, 'groups': []
+    }
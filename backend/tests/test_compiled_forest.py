@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from app.services.compiled_forest import CompiledForest
+
+
+@pytest.fixture(scope="module", params=[2, 3], ids=["binary", "multiclass"])
+def forest(request):
+    rng = np.random.default_rng(request.param)
+    X = rng.normal(size=(600, 6))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] > 0).astype(int) + (request.param > 2) * (X[:, 3] > 0.5)
+    model = RandomForestClassifier(n_estimators=25, max_depth=8, random_state=0).fit(X, y)
+    return model, CompiledForest.from_sklearn(model)
+
+
+def boundary_rows(compiled: CompiledForest, n_rows: int = 400) -> np.ndarray:
+    """Rows whose value for a split feature sits on, or one float step either side of, its threshold"""
+    rng = np.random.default_rng(1)
+    splits = np.flatnonzero(compiled.children_left != np.arange(compiled.children_left.shape[0]))
+    chosen = rng.choice(splits, size=n_rows)
+    threshold = compiled.threshold[chosen]
+    rows = []
+    # sklearn compares float32 inputs with float64 thresholds, so probe both precisions
+    for value in (
+        threshold,
+        np.nextafter(threshold, -np.inf),
+        np.nextafter(threshold, np.inf),
+        np.nextafter(threshold.astype(np.float32), np.float32(-np.inf)).astype(np.float64),
+        np.nextafter(threshold.astype(np.float32), np.float32(np.inf)).astype(np.float64),
+    ):
+        row = rng.normal(size=(n_rows, compiled.n_features_in_))
+        row[np.arange(n_rows), compiled.feature[chosen]] = value
+        rows.append(row)
+    return np.vstack(rows)
+
+
+def test_predict_proba_matches_sklearn_on_random_rows(forest):
+    model, compiled = forest
+    X = np.random.default_rng(2).normal(size=(2000, model.n_features_in_))
+    np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+    np.testing.assert_array_equal(compiled.predict(X), model.predict(X))
+
+
+def test_predict_proba_matches_sklearn_on_threshold_boundaries(forest):
+    model, compiled = forest
+    X = boundary_rows(compiled)
+    np.testing.assert_array_equal(compiled.apply(X), np.column_stack([
+        estimator.apply(X.astype(np.float32)) + root
+        for estimator, root in zip(model.estimators_, compiled.roots)
+    ]))
+    np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+
+
+def test_single_row(forest):
+    model, compiled = forest
+    row = np.random.default_rng(3).normal(size=model.n_features_in_)
+    np.testing.assert_array_equal(compiled.predict_proba(row), model.predict_proba(row.reshape(1, -1)))
+
+
+def test_saved_forest_loads_memory_mapped(forest, tmp_path):
+    model, compiled = forest
+    compiled.save(str(tmp_path))
+    loaded = CompiledForest.load(str(tmp_path))
+    assert isinstance(loaded.threshold, np.memmap)
+    X = boundary_rows(compiled, n_rows=50)
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
@@ -0,0 +1,57 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, update
+
+from app.models.health_record import HealthRecord
+from app.services.feature_store import FeatureStore
+
+
+def add_record(engine, user_id: int, changed_at: datetime, **columns) -> int:
+    row = dict(user_id=user_id, date=date(2024, 1, 1), age=40, bmi=24.0, smoking_status='never', created_at=changed_at)
+    row.update(columns)
+    with engine.begin() as conn:
+        return conn.execute(insert(HealthRecord).returning(HealthRecord.id), row).scalar_one()
+
+
+def test_refresh_picks_up_rows_committed_behind_the_watermark(engine, make_user, tmp_path):
+    store = FeatureStore(root=str(tmp_path))
+    user_id = make_user()
+    now = datetime.utcnow()
+    add_record(engine, user_id, now)
+    store.refresh(engine)
+
+    # A long transaction stamped this row before the watermark, but committed after the refresh
+    late_id = add_record(engine, user_id, now - timedelta(seconds=30))
+    totals = store.refresh(engine)
+
+    assert totals['appended'] == 1
+    assert late_id in store.load()['record_id']
+
+
+def test_refresh_never_writes_changed_rows_into_the_live_generation(engine, make_user, tmp_path):
+    store = FeatureStore(root=str(tmp_path))
+    user_id = make_user()
+    record_id = add_record(engine, user_id, datetime.utcnow(), bmi=24.0)
+    store.refresh(engine)
+    before = store.load()
+    row = list(before['record_id']).index(record_id)
+
+    unchanged = store.refresh(engine)
+    assert unchanged['updated'] == 0
+    with engine.begin() as conn:
+        conn.execute(update(HealthRecord).where(HealthRecord.id == record_id).values(
+            bmi=31.0, updated_at=datetime.utcnow()
+        ))
+    assert store.refresh(engine)['updated'] == 1
+
+    after = store.load()
+    assert after.fingerprint != before.fingerprint
+    assert before['bmi'][row] == 24.0
+    assert after['bmi'][row] == 31.0
+
+
+def test_refresh_without_waiting_skips_while_another_writer_holds_the_lock(engine, tmp_path):
+    writer, other = FeatureStore(root=str(tmp_path)), FeatureStore(root=str(tmp_path))
+    with writer._writer():
+        assert other.refresh(engine, wait=False) is None
+    assert other.refresh(engine, wait=False) is not None
@@ -0,0 +1,64 @@
+import math
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.health_record import HealthRecord
+from conftest import auth_headers
+
+URL = f"{settings.API_V1_STR}/health-records/metrics"
+
+
+@pytest.fixture
+def member_with_history(engine, make_user):
+    user_id = make_user()
+    first = date(2000, 1, 1)
+    rows = [
+        {
+            'user_id': user_id,
+            'date': first + timedelta(days=i),
+            'bmi': 25 + 5 * math.sin(i / 40),
+            'heart_rate': 60 + (i * 7919) % 40,
+            'systolic_bp': None if i % 5 else 110 + i % 30,
+        }
+        for i in range(3000)
+    ]
+    rows[1234]['bmi'] = 60.0  # a spike downsampling must keep
+    with engine.begin() as conn:
+        conn.execute(insert(HealthRecord.__table__), rows)
+    return user_id, rows
+
+
+def fetch(api, user_id, **params):
+    async def scenario(client):
+        return await client.get(URL, params=params, headers=auth_headers(user_id))
+    response = api(scenario)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_short_history_is_returned_whole(api, member_with_history):
+    user_id, rows = member_with_history
+    points = fetch(api, user_id, metrics=['bmi'], end=str(rows[9]['date']), points=10)
+    assert [point['date'] for point in points] == [str(row['date']) for row in rows[:10]]
+
+
+@pytest.mark.parametrize("method", ['lttb', 'minmax'])
+@pytest.mark.parametrize("n_points", [3, 7, 100])
+def test_long_history_is_bounded_and_keeps_extremes(api, member_with_history, method, n_points):
+    user_id, rows = member_with_history
+    metrics = ['bmi', 'heart_rate', 'blood_pressure_systolic']
+    points = fetch(api, user_id, metrics=metrics, points=n_points, method=method)
+
+    assert len(points) <= n_points
+    dates = [point['date'] for point in points]
+    assert dates == sorted(set(dates))
+    assert dates[0] == str(rows[0]['date']) and dates[-1] == str(rows[-1]['date'])
+    if n_points >= 7:
+        assert max(point['bmi'] for point in points) == 60.0
+    # Every point is a real reading
+    by_date = {str(row['date']): row for row in rows}
+    for point in points:
+        assert point['bmi'] == pytest.approx(by_date[point['date']]['bmi'])
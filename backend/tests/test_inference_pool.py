@@ -0,0 +1,29 @@
+import time
+
+import pytest
+
+from app.services.inference_pool import InferencePool
+
+
+@pytest.fixture
+def pool():
+    pool = InferencePool(2, health_timeout_s=1.0)
+    pool.warm_up()
+    yield pool
+    pool.shutdown()
+
+
+def test_every_worker_must_answer(pool):
+    health = pool.health_check()
+    assert health['healthy'] is True
+    assert len(health['responding_pids']) == 2
+
+
+def test_an_unresponsive_worker_makes_the_pool_unhealthy(pool):
+    stuck = pool._submit(time.sleep, 4)
+    health = pool.health_check()
+    assert health['healthy'] is False
+    assert health['unresponsive'] >= 1
+
+    stuck.result()
+    assert pool.health_check()['healthy'] is True
@@ -0,0 +1,86 @@
+import asyncio
+
+from app.services.inference_queue import MicroBatcher, QueueFullError
+
+
+def double_all(items):
+    return [item * 2 for item in items]
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_items_share_a_batch():
+    calls = []
+
+    def predict(items):
+        calls.append(list(items))
+        return double_all(items)
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        finally:
+            await batcher.stop()
+
+    assert run(scenario()) == [0, 2, 4, 6, 8]
+    assert calls == [[0, 1, 2, 3, 4]]
+
+
+def test_bad_item_fails_only_its_own_request():
+    def predict(items):
+        if any(item == 'unknown' for item in items):
+            raise ValueError("not a number")
+        return double_all(items)
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(item) for item in (1, 'unknown', 3)), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    good, bad, other = run(scenario())
+    assert (good, other) == (2, 6)
+    assert isinstance(bad, ValueError)
+
+
+def test_scorer_failure_reaches_every_request():
+    def predict(items):
+        raise RuntimeError("scorer is down")
+
+    async def scenario():
+        batcher = MicroBatcher(predict, max_batch_size=8, max_wait_ms=50)
+        try:
+            return await asyncio.gather(*(batcher.submit(i) for i in range(3)), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in run(scenario()))
+
+
+def test_batcher_follows_the_running_event_loop():
+    batcher = MicroBatcher(double_all, max_batch_size=8, max_wait_ms=5, timeout_s=1.0)
+
+    async def scenario(item):
+        return await batcher.submit(item)
+
+    # A second asyncio.run (a reloaded server, another test client) must still be served
+    assert run(scenario(1)) == 2
+    assert run(scenario(2)) == 4
+
+
+def test_stop_fails_a_half_collected_batch():
+    async def scenario():
+        batcher = MicroBatcher(double_all, max_batch_size=8, max_wait_ms=10000, timeout_s=30)
+        submitted = asyncio.ensure_future(batcher.submit(1))
+        while batcher._queue is None or batcher._queue.qsize():
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.01)  # the collector now holds the item, waiting for batch-mates
+        await batcher.stop()
+        return await asyncio.wait_for(asyncio.gather(submitted, return_exceptions=True), 1)
+
+    outcome, = run(scenario())
+    assert isinstance(outcome, QueueFullError)
@@ -0,0 +1,25 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sklearn.preprocessing import StandardScaler
+
+from app.services.model_registry import ModelRegistry
+
+
+def test_publishes_in_the_same_second_get_distinct_versions(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    with ThreadPoolExecutor(4) as executor:
+        versions = list(executor.map(lambda i: registry.publish({'model': i}, StandardScaler()), range(8)))
+
+    assert len(set(versions)) == 8
+    assert registry.versions() == sorted(versions)
+    for version in versions:
+        assert registry.manifest(version)['version'] == version
+
+
+def test_explicit_version_is_never_overwritten(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.publish({'model': 1}, StandardScaler(), version='v1')
+    with pytest.raises(ValueError):
+        registry.publish({'model': 2}, StandardScaler(), version='v1')
+    assert registry.load('v1').model == {'model': 1}
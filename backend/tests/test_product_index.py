@@ -0,0 +1,124 @@
+import asyncio
+
+from sqlalchemy import insert, select, update
+
+from app.models.insurance_policy import PolicyType
+from app.models.insurance_product import InsuranceProduct
+from app.services.product_index import ProductEntry, ProductIndex
+from app.services.risk_assessment import RISK_DIMENSIONS
+
+
+def add_product(engine, **columns) -> int:
+    row = dict(
+        name='Plan', policy_type=PolicyType.HEALTH, coverage_amount=100000.0, base_premium=1200.0,
+        target_profile={}
+    )
+    row.update(columns)
+    with engine.begin() as conn:
+        return conn.execute(insert(InsuranceProduct).returning(InsuranceProduct.id), row).scalar_one()
+
+
+def run(scenario):
+    from app.db.session import async_engine
+
+    async def main():
+        try:
+            return await scenario()
+        finally:
+            await async_engine.dispose()
+
+    return asyncio.run(main())
+
+
+def test_requests_during_the_first_load_wait_for_it(engine):
+    add_product(engine)
+    index = ProductIndex(max_age=120, refresh_s=60)
+
+    async def refresh_then_count():
+        await index.refresh(db=None)
+        return len(index)
+
+    async def scenario():
+        return await asyncio.gather(*(refresh_then_count() for _ in range(5)))
+
+    counts = run(scenario)
+    assert min(counts) >= 1
+    assert len(set(counts)) == 1
+
+
+def test_updated_at_comes_from_the_database(engine):
+    product_id = add_product(engine)
+    with engine.begin() as conn:
+        created = conn.execute(select(InsuranceProduct.updated_at).where(InsuranceProduct.id == product_id)).scalar_one()
+        conn.execute(update(InsuranceProduct).where(InsuranceProduct.id == product_id).values(base_premium=1300.0))
+        updated = conn.execute(select(InsuranceProduct.updated_at).where(InsuranceProduct.id == product_id)).scalar_one()
+    assert created is not None
+    assert updated >= created
+
+
+def entry(product_id, policy_type=PolicyType.HEALTH, target=0.5) -> ProductEntry:
+    return ProductEntry(
+        id=product_id, name=f'Plan {product_id}', provider=None, policy_type=policy_type, coverage_amount=100000.0,
+        base_premium=1200.0, min_age=0, max_age=120, max_overall_risk_score=1.0,
+        target=(target,) * len(RISK_DIMENSIONS)
+    )
+
+
+def test_ties_at_k_go_to_the_lowest_product_id():
+    index = ProductIndex(max_age=120, refresh_s=60)
+    # Equidistant products spread over partitions, inserted out of id order
+    for product_id, policy_type in ((7, PolicyType.LIFE), (3, PolicyType.HEALTH), (9, PolicyType.HEALTH),
+                                    (5, PolicyType.LIFE), (4, PolicyType.DISABILITY)):
+        index.upsert(entry(product_id, policy_type, target=0.6))
+    index.upsert(entry(8, PolicyType.LIFE, target=0.5))
+    risk = {dimension: 0.5 for dimension in RISK_DIMENSIONS}
+
+    assert [match.id for match, _ in index.search(40, risk, 0.5, k=3)] == [8, 3, 4]
+    assert [match.id for match, _ in index.search(40, risk, 0.5, k=6)] == [8, 3, 4, 5, 7, 9]
+    assert [match.id for match, _ in index.search(40, risk, 0.5, [PolicyType.LIFE, PolicyType.HEALTH], k=2)] == [8, 3]
+
+
+class FlakyDatabase:
+    """Stands in for a session whose first query fails"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, query):
+        from app.db.session import AsyncReadSessionLocal
+
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("replica unavailable")
+        async with AsyncReadSessionLocal() as db:
+            result = await db.execute(query)
+            products = result.scalars().all()
+
+        class Result:
+            def scalars(self):
+                return self
+
+            def all(self):
+                return products
+
+        return Result()
+
+
+def test_failed_poll_is_retried_on_the_next_request(engine):
+    index = ProductIndex(max_age=120, refresh_s=60)
+    db = FlakyDatabase()
+
+    async def scenario():
+        await index.refresh(db=None)
+        product_id = add_product(engine, name='Added after the first load')
+        index._refreshed_at -= 61
+        try:
+            await index.refresh(db)
+        except ConnectionError:
+            pass
+        await index.refresh(db)
+        return product_id
+
+    product_id = run(scenario)
+    assert db.calls == 2
+    assert product_id in {match.id for match in index._entries[PolicyType.HEALTH].values()}
@@ -0,0 +1,73 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.db.query_counter import assert_query_count
+from app.models.health_record import HealthRecord
+from app.models.risk_assessment import RiskAssessment
+from conftest import auth_headers
+
+URL = f"{settings.API_V1_STR}/profile"
+
+
+@pytest.fixture
+def make_member(engine, make_user):
+    """A member with a few health records and risk assessments"""
+    def make(**columns) -> int:
+        user_id = make_user(**columns)
+        now = datetime.utcnow()
+        with engine.begin() as conn:
+            conn.execute(insert(HealthRecord.__table__), [
+                {'user_id': user_id, 'date': date(2024, 1, 1) + timedelta(days=i), 'bmi': 24.0 + i}
+                for i in range(3)
+            ])
+            conn.execute(insert(RiskAssessment.__table__), [
+                dict(
+                    user_id=user_id, health_data={'age': 40}, recommendations=[], created_at=now - timedelta(days=i),
+                    updated_at=now, **{name: 0.5 for name in (
+                        'overall_risk_score', 'cardiovascular_risk', 'diabetes_risk', 'respiratory_risk',
+                        'metabolic_risk', 'lifestyle_risk'
+                    )}
+                )
+                for i in range(3)
+            ])
+        return user_id
+
+    return make
+
+
+def get(api, path, user_id, **params):
+    async def scenario(client):
+        return await client.get(f"{URL}{path}", params=params, headers=auth_headers(user_id))
+    return api(scenario)
+
+
+def test_my_profile_costs_five_queries(api, make_member):
+    user_id = make_member()
+    get(api, "/me", user_id)  # connect and warm the mappers outside the count
+
+    with assert_query_count(5):
+        response = get(api, "/me", user_id, recent=2)
+
+    assert response.status_code == 200, response.text
+    profile = response.json()
+    assert len(profile['health_records']) == 2
+    assert len(profile['risk_assessments']) == 2
+
+
+@pytest.mark.parametrize("page_size", [1, 10])
+def test_admin_page_costs_six_queries_whatever_its_size(api, make_member, make_user, page_size):
+    for _ in range(page_size):
+        make_member()
+    admin_id = make_user(is_superuser=True)
+    get(api, "/", admin_id, limit=page_size)
+
+    with assert_query_count(6):
+        response = get(api, "/", admin_id, limit=page_size, recent=2)
+
+    assert response.status_code == 200, response.text
+    items = response.json()['items']
+    assert len(items) == page_size
+    assert all(len(item['health_records']) <= 2 for item in items)
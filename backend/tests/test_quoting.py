@@ -0,0 +1,134 @@
+import copy
+import itertools
+import math
+from datetime import datetime
+
+import numpy as np
+import pytest
+from sqlalchemy import insert, select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.insurance_policy import InsurancePolicy, PolicyType
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.services.quoting import DEFAULT_RATE_TABLE, QuoteEngine, RateTable
+from app.services.risk_assessment import RISK_DIMENSIONS
+from conftest import auth_headers
+
+URL = f"{settings.API_V1_STR}/policies/"
+RISK = {dimension: 0.32 for dimension in RISK_DIMENSIONS}
+# Health at every score 0.32: bucket [0.3, 0.35) is priced at 0.325 and the loadings sum to 2.0
+HEALTH_FACTOR = 1 + 2.0 * 0.325
+# 100000 coverage (tier factor 0.96), 500 deductible (factor 0.93), base rate 0.008, fee 25
+HEALTH_100K_500 = round(100000 * 0.96 * 0.008 * HEALTH_FACTOR * 0.93 + 25, 2)
+
+_caches = itertools.count()
+
+
+def quote_engine() -> QuoteEngine:
+    return QuoteEngine(RateTable.from_dict(DEFAULT_RATE_TABLE), 0.05, TTLCache(f"quote-test-{next(_caches)}", 100, 60))
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda table: table['tier_factors'].pop(), "one entry per coverage tier"),
+    (lambda table: table['products']['life']['deductible_factors'].pop(), "one entry per deductible"),
+    (lambda table: table['products']['health']['risk_loadings'].update(kidney_risk=0.1), "unknown risk dimensions"),
+])
+def test_inconsistent_rate_table_is_rejected(change, message):
+    table = copy.deepcopy(DEFAULT_RATE_TABLE)
+    change(table)
+    with pytest.raises(ValueError, match=message):
+        RateTable.from_dict(table)
+
+
+def test_unknown_product_is_rejected():
+    table = copy.deepcopy(DEFAULT_RATE_TABLE)
+    table['products']['pet'] = table['products']['health']
+    with pytest.raises(ValueError):
+        RateTable.from_dict(table)
+
+
+def test_grid_matches_the_premium_formula():
+    engine = quote_engine()
+    [quote] = engine.quote(RISK, [PolicyType.HEALTH])
+
+    assert quote.premiums.shape == (5, 5)
+    assert quote.risk_adjustment_factor == pytest.approx(HEALTH_FACTOR)
+    assert quote.premiums[1, 1] == pytest.approx(HEALTH_100K_500)
+    assert quote.premiums[0, 0] == pytest.approx(round(50000 * 0.008 * HEALTH_FACTOR + 25, 2))
+
+
+def test_deductibles_a_product_does_not_offer_are_nan():
+    engine = quote_engine()
+    [life] = engine.quote(RISK, [PolicyType.LIFE])
+
+    assert not np.isnan(life.premiums[:, 0]).any()
+    assert np.isnan(life.premiums[:, 1:]).all()
+    options = engine.options([life], deductible=500)
+    assert options == []
+    assert {option['deductible'] for option in engine.options([life])} == {0}
+
+
+def test_grids_are_cached_per_bucket_and_product(monkeypatch):
+    engine = quote_engine()
+    priced = []
+    price = engine.price
+    monkeypatch.setattr(engine, 'price', lambda risk, products: priced.append(list(products)) or price(risk, products))
+    health, life = engine.table.products.index(PolicyType.HEALTH), engine.table.products.index(PolicyType.LIFE)
+
+    first = engine.quote(RISK, [PolicyType.HEALTH])
+    # Same bucket, so the same cached grid
+    assert engine.quote({dimension: 0.34 for dimension in RISK_DIMENSIONS}, [PolicyType.HEALTH]) == first
+    # Only the product not yet cached for this bucket is priced
+    engine.quote(RISK, [PolicyType.HEALTH, PolicyType.LIFE])
+    engine.quote({dimension: 0.36 for dimension in RISK_DIMENSIONS}, [PolicyType.HEALTH])
+    assert priced == [[health], [life], [health]]
+
+
+@pytest.fixture
+def assessed_member(engine, make_user):
+    """A member whose latest assessment scores 0.32 on every risk dimension"""
+    user_id = make_user()
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        assessment_id = conn.execute(insert(RiskAssessment.__table__).returning(RiskAssessment.__table__.c.id), dict(
+            user_id=user_id, health_data={}, recommendations=[], overall_risk_score=0.3, created_at=now,
+            updated_at=now, **RISK
+        )).scalar_one()
+        conn.execute(insert(LatestRiskAssessment.__table__), {
+            'user_id': user_id, 'risk_assessment_id': assessment_id, 'created_at': now
+        })
+    return user_id, assessment_id
+
+
+def apply(api, user_id, **body):
+    body = dict({'start_date': '2025-01-01', 'end_date': '2026-01-01'}, **body)
+
+    async def scenario(client):
+        return await client.post(URL, json=body, headers=auth_headers(user_id))
+    return api(scenario)
+
+
+@pytest.mark.parametrize('body', [
+    {'policy_type': 'health', 'coverage_amount': 123456, 'deductible': 0},
+    {'policy_type': 'life', 'coverage_amount': 100000, 'deductible': 500},
+])
+def test_policy_must_be_an_offered_option(api, assessed_member, body):
+    user_id, _ = assessed_member
+    response = apply(api, user_id, **body)
+    assert response.status_code == 400
+    assert "not offered" in response.json()['detail']
+
+
+def test_policy_is_priced_on_the_server(api, engine, assessed_member):
+    user_id, assessment_id = assessed_member
+    response = apply(api, user_id, policy_type='health', coverage_amount=100000, deductible=500, premium=1.0)
+    assert response.status_code == 200, response.text
+
+    with engine.connect() as conn:
+        policy = conn.execute(select(InsurancePolicy.__table__).where(InsurancePolicy.user_id == user_id)).one()
+    assert policy.premium == pytest.approx(HEALTH_100K_500)
+    assert policy.risk_adjustment_factor == pytest.approx(HEALTH_FACTOR)
+    assert policy.risk_assessment_id == assessment_id
+    assert policy.deductible == 500
+    assert math.isclose(response.json()['premium'], policy.premium)
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app.services.recommendations import DEFAULT_RULES, RecommendationEngine, RecommendationRule
+from app.services.risk_assessment import RISK_DIMENSIONS
+
+
+def test_batch_matches_one_at_a_time():
+    engine = RecommendationEngine(DEFAULT_RULES, RISK_DIMENSIONS)
+    rng = np.random.default_rng(0)
+    n_rows = 500
+    scores = {dimension: rng.uniform(0.4, 1.0, n_rows) for dimension in RISK_DIMENSIONS}
+    # Exactly at a threshold does not trigger
+    scores['cardiovascular_risk'][:10] = 0.7
+
+    batch = engine.evaluate_batch(scores, n_rows)
+    assert batch == [
+        engine.evaluate({dimension: float(values[row]) for dimension, values in scores.items()})
+        for row in range(n_rows)
+    ]
+    assert len({tuple(row) for row in batch}) > 1
+
+
+def test_scalar_scores_broadcast_over_the_batch():
+    engine = RecommendationEngine(DEFAULT_RULES, RISK_DIMENSIONS)
+    scores = {dimension: 0.5 for dimension in RISK_DIMENSIONS}
+    scores['diabetes_risk'] = np.array([0.9, 0.1])
+
+    assert engine.evaluate_batch(scores, 2) == [list(DEFAULT_RULES[1].recommendations), []]
+
+
+def test_priority_order_and_de_duplication():
+    rules = [
+        RecommendationRule('lifestyle_risk', 0.5, ("Walk daily", "Sleep well"), priority=1),
+        RecommendationRule('cardiovascular_risk', 0.5, ("See a cardiologist", "Walk daily"), priority=5),
+        RecommendationRule('diabetes_risk', 0.5, ("Sleep well", "Cut sugar"), priority=1),
+    ]
+    engine = RecommendationEngine(rules, RISK_DIMENSIONS)
+    everything = {dimension: 0.9 for dimension in RISK_DIMENSIONS}
+
+    # Highest priority first; equal priorities keep declaration order; repeats stay at their first position
+    expected = ["See a cardiologist", "Walk daily", "Sleep well", "Cut sugar"]
+    assert engine.evaluate(everything) == expected
+    assert engine.evaluate_batch({name: np.full(3, 0.9) for name in RISK_DIMENSIONS}, 3) == [expected] * 3
+    assert RecommendationEngine(rules, RISK_DIMENSIONS).evaluate(everything) == expected
+
+
+def test_too_many_rules():
+    rules = [RecommendationRule('diabetes_risk', 0.5, (f"Rule {i}",))
+             for i in range(RecommendationEngine.MAX_RULES + 1)]
+    with pytest.raises(ValueError, match="At most"):
+        RecommendationEngine(rules, RISK_DIMENSIONS)
+    assert len(RecommendationEngine(rules[:-1], RISK_DIMENSIONS).rules) == RecommendationEngine.MAX_RULES
+
+
+def test_unknown_dimension():
+    with pytest.raises(ValueError, match="kidney_risk"):
+        RecommendationEngine([RecommendationRule('kidney_risk', 0.5, ("Drink water",))], RISK_DIMENSIONS)
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from datetime import datetime
+
+import pytest
+from sqlalchemy import delete, insert, select
+
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.services.job_checkpoints import load_checkpoint
+from app.services.rescoring import Throttle, rescore_latest_assessments, score_rows, write_scores
+from app.services.risk_assessment import RiskAssessmentService
+
+Row = namedtuple('Row', 'user_id id health_data created_at')
+
+
+@pytest.fixture(scope="module")
+def service():
+    return RiskAssessmentService()
+
+
+def add_assessment(engine, user_id: int, health_data: dict, latest: bool = True) -> int:
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        assessment_id = conn.execute(insert(RiskAssessment).returning(RiskAssessment.id), dict(
+            user_id=user_id, health_data=health_data, recommendations=[], model_version='old', created_at=now,
+            updated_at=now, **{name: 0.0 for name in (
+                'overall_risk_score', 'cardiovascular_risk', 'diabetes_risk', 'respiratory_risk',
+                'metabolic_risk', 'lifestyle_risk'
+            )}
+        )).scalar_one()
+        if latest:
+            conn.execute(insert(LatestRiskAssessment), dict(
+                user_id=user_id, risk_assessment_id=assessment_id, created_at=now
+            ))
+    return assessment_id
+
+
+def test_a_malformed_record_only_skips_itself(service):
+    rows = [Row(1, 10, {'age': 40}, None), Row(2, 11, {'age': 'forty'}, None), Row(3, 12, {}, None)]
+    values, rejected = score_rows(service, rows, 'v2')
+
+    assert rejected == [11]
+    assert [value['row_id'] for value in values] == [10, 12]
+    assert values[0]['overall_risk_score'] == service._assess_risk({'age': 40})['overall_risk_score']
+
+
+def test_write_scores_never_recreates_a_deleted_assessment(engine, make_user, service):
+    user_id = make_user()
+    kept = add_assessment(engine, user_id, {'age': 40}, latest=False)
+    deleted = add_assessment(engine, user_id, {'age': 50}, latest=False)
+    rows = [Row(user_id, kept, {'age': 40}, None), Row(user_id, deleted, {'age': 50}, None)]
+    values, _ = score_rows(service, rows, 'v2')
+    with engine.begin() as conn:
+        conn.execute(delete(RiskAssessment).where(RiskAssessment.id == deleted))
+        write_scores(conn, values)
+        versions = dict(conn.execute(
+            select(RiskAssessment.id, RiskAssessment.model_version).where(RiskAssessment.id.in_([kept, deleted]))
+        ).all())
+
+    assert versions == {kept: 'v2'}
+
+
+def test_rejected_assessments_are_recorded_in_the_checkpoint(engine, make_user, service):
+    good = add_assessment(engine, make_user(), {'age': 40})
+    bad = add_assessment(engine, make_user(), {'bmi': None})
+    job_id = f"rescore-test:{bad}"
+
+    result = rescore_latest_assessments(engine, service, job_id=job_id, throttle=Throttle(max_pause_s=0))
+
+    with engine.connect() as conn:
+        state = load_checkpoint(conn, job_id)['state']
+        versions = dict(conn.execute(
+            select(RiskAssessment.id, RiskAssessment.model_version).where(RiskAssessment.id.in_([good, bad]))
+        ).all())
+    assert bad in state['rejected_ids']
+    assert result.rejected == state['rejected'] >= 1
+    assert versions == {good: service.model_version, bad: 'old'}
+
+
+def test_throttle_keeps_an_explicit_zero():
+    throttle = Throttle(slowdown_factor=0, max_saturation=0, max_pause_s=0)
+    assert (throttle.slowdown_factor, throttle.max_saturation, throttle.max_pause_s) == (0, 0, 0)
@@ -0,0 +1,79 @@
+import math
+
+import pytest
+
+from app.services.risk_assessment import RISK_DIMENSIONS, RiskAssessmentService
+
+
+@pytest.fixture(scope="module")
+def service():
+    return RiskAssessmentService()
+
+
+@pytest.mark.parametrize("health_data", [
+    {},
+    {'exercise_frequency': None},
+    {'exercise_frequency': 'regular', 'smoking_status': 'current', 'bmi': 31.5},
+    {'exercise_frequency': 'daily', 'smoking_status': None, 'age': 64, 'blood_sugar': 140},
+    {'smoking_status': math.nan, 'exercise_frequency': math.nan, 'systolic_bp': 150},
+])
+def test_batch_scores_match_scalar(service, health_data):
+    scalar = service._assess_risk(health_data)
+    batch = service.assess_batch(service.records_to_batch([health_data]))
+    for name in ('overall_risk_score',) + RISK_DIMENSIONS:
+        assert batch[name][0] == scalar[name]
+    assert batch['recommendations'][0] == scalar['recommendations']
+
+
+@pytest.mark.parametrize("health_data", [{'age': '45'}, {'bmi': None}])
+def test_batch_rejects_what_scalar_rejects(service, health_data):
+    with pytest.raises(TypeError):
+        service._assess_risk(health_data)
+    with pytest.raises(ValueError):
+        service.assess_records([health_data])
+    assert service.score_cache_key(health_data) is None
+
+
+def test_results_are_cached_under_the_version_that_scored_them(service):
+    health_data = {'age': 52, 'bmi': 27.5}
+    result = service.assess_records([health_data])[0]
+    assert result['model_version'] == service.model_version
+
+    stale = dict(result, overall_risk_score=0.0, model_version='older-model')
+    service.score_cache.clear()
+    service.put_cached(health_data, stale)
+    assert service.get_cached(health_data) is None
+    service.put_cached(health_data, result)
+    assert service.get_cached(health_data) == result
+
+
+def test_no_model_is_trained_on_the_serving_path(service):
+    assert service.registry.versions() == []
+    assert not getattr(service.model, 'estimators_', None)
+
+
+def test_predict_proba_applies_the_training_preprocessing(monkeypatch, tmp_path):
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.preprocessing import StandardScaler
+    from app.core.config import settings
+    from app.services.model_registry import ModelRegistry
+
+    rng = np.random.default_rng(0)
+    X = np.column_stack([rng.uniform(18, 90, 200), rng.integers(0, 3, 200)])
+    y = (X[:, 0] > 50).astype(int)
+    scaler = StandardScaler().fit(X)
+    model = RandomForestClassifier(n_estimators=5, random_state=0).fit(scaler.transform(X), y)
+    ModelRegistry(str(tmp_path)).publish(model, scaler, activate=True, preprocessing={
+        'features': ['age', 'smoking_status'],
+        'categories': {'smoking_status': ['never', 'former', 'current']},
+        'medians': [61.0, 1.0],
+    })
+    monkeypatch.setattr(settings, 'MODEL_REGISTRY_PATH', str(tmp_path))
+    trained = RiskAssessmentService()
+
+    features = trained.encode_features([{'smoking_status': 'current'}, {'age': 61, 'smoking_status': 'current'}])
+    np.testing.assert_array_equal(features, [[np.nan, 2], [61, 2]])
+    proba = trained.predict_proba(features)
+    np.testing.assert_array_equal(proba[0], proba[1])
+    np.testing.assert_array_equal(proba[1], model.predict_proba(scaler.transform([[61, 2]]))[0])
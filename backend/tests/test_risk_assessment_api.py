@@ -0,0 +1,203 @@
+import base64
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.risk_assessment import RiskAssessment
+from app.schemas.risk_assessment import RiskAssessmentInDB
+from conftest import auth_headers
+
+URL = f"{settings.API_V1_STR}/risk-assessment"
+HEALTH_DATA = {'age': 52, 'bmi': 31.5, 'smoking_status': 'current', 'exercise_frequency': 'rarely'}
+
+
+def call(api, method, path, user_id, **kwargs):
+    async def scenario(client):
+        return await client.request(method, f"{URL}{path}", headers=auth_headers(user_id), **kwargs)
+    return api(scenario)
+
+
+def create(api, user_id, **health_data):
+    response = call(api, 'POST', '/', user_id, json={'health_data': dict(HEALTH_DATA, **health_data)})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def add_assessments(engine, user_id, created_at):
+    """Insert one assessment per ``created_at``, in that order; returns their ids"""
+    rows = [
+        dict(
+            user_id=user_id, health_data=HEALTH_DATA, recommendations=[], created_at=moment, updated_at=moment,
+            **{name: 0.5 for name in ('overall_risk_score', 'cardiovascular_risk', 'diabetes_risk',
+                                      'respiratory_risk', 'metabolic_risk', 'lifestyle_risk')}
+        )
+        for moment in created_at
+    ]
+    with engine.begin() as conn:
+        return [conn.execute(insert(RiskAssessment.__table__).returning(RiskAssessment.__table__.c.id), row)
+                .scalar_one() for row in rows]
+
+
+def test_create_read_update_and_delete(api, make_user):
+    member_id, other_id = make_user(), make_user()
+
+    created = create(api, member_id)
+    assert created['user_id'] == member_id
+    assert created['health_data'] == HEALTH_DATA
+    assert 0 <= created['overall_risk_score'] <= 1
+    assert created['model_version']
+
+    assert call(api, 'GET', f"/{created['id']}", member_id).json() == created
+    assert [item['id'] for item in call(api, 'GET', '/', member_id).json()['items']] == [created['id']]
+    # Another member can neither see nor change it
+    assert call(api, 'GET', f"/{created['id']}", other_id).status_code == 404
+    assert call(api, 'DELETE', f"/{created['id']}", other_id).status_code == 404
+    assert call(api, 'GET', '/', other_id).json() == {'items': [], 'next_cursor': None}
+
+    response = call(api, 'PUT', f"/{created['id']}", member_id, json={'recommendations': ["Walk daily"]})
+    assert response.status_code == 200, response.text
+    assert response.json()['recommendations'] == ["Walk daily"]
+    assert call(api, 'GET', f"/{created['id']}", member_id).json()['recommendations'] == ["Walk daily"]
+
+    assert call(api, 'DELETE', f"/{created['id']}", member_id).json() == {'status': 'success'}
+    assert call(api, 'GET', f"/{created['id']}", member_id).status_code == 404
+    assert call(api, 'GET', '/', member_id).json()['items'] == []
+
+
+def test_invalid_health_data_is_rejected(api, make_user):
+    response = call(api, 'POST', '/', make_user(), json={'health_data': {'age': 'fifty'}})
+    assert response.status_code == 400
+
+
+def test_pages_follow_next_cursor_newest_first(api, engine, make_user):
+    member_id = make_user()
+    start = datetime(2024, 1, 1)
+    # Pairs share a timestamp, so pages must also be ordered and split by id
+    ids = add_assessments(engine, member_id, [start + timedelta(hours=i // 2) for i in range(7)])
+    newest_first = ids[::-1]
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {'limit': 3} if cursor is None else {'limit': 3, 'cursor': cursor}
+        response = call(api, 'GET', '/', member_id, params=params)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        seen.extend(item['id'] for item in page['items'])
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == newest_first
+    assert pages == 3
+
+
+@pytest.mark.parametrize('cursor', [
+    'not a cursor',
+    base64.urlsafe_b64encode(b'{"created_at": 1}').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", 1]').decode(),
+])
+def test_bad_cursor_is_a_400(api, make_user, cursor):
+    response = call(api, 'GET', '/', make_user(), params={'cursor': cursor})
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Invalid cursor"
+
+
+def test_latest_follows_creates_and_rewinds_on_delete(api, make_user):
+    member_id = make_user()
+    assert call(api, 'GET', '/latest', member_id).status_code == 404
+
+    first, second, third = (create(api, member_id, age=age)['id'] for age in (40, 41, 42))
+    latest = call(api, 'GET', '/latest', member_id).json()
+    assert (latest['id'], latest['health_data']['age']) == (third, 42)
+
+    # Deleting an older assessment leaves the pointer alone
+    call(api, 'DELETE', f"/{first}", member_id)
+    assert call(api, 'GET', '/latest', member_id).json()['id'] == third
+    # Deleting the latest moves it back to the newest remaining one
+    call(api, 'DELETE', f"/{third}", member_id)
+    assert call(api, 'GET', '/latest', member_id).json()['id'] == second
+    call(api, 'DELETE', f"/{second}", member_id)
+    assert call(api, 'GET', '/latest', member_id).status_code == 404
+
+
+@pytest.fixture
+def exported_member(engine, make_user, monkeypatch):
+    """An admin, and a member with three assessments exported two rows per chunk"""
+    monkeypatch.setattr(settings, 'EXPORT_CHUNK_SIZE', 2)
+    member_id = make_user()
+    start = datetime(2024, 2, 1, 8, 30)
+    ids = add_assessments(engine, member_id, [start + timedelta(days=i) for i in range(3)])
+    return make_user(is_superuser=True), member_id, ids, start
+
+
+def export(api, admin_id, member_id, fmt, columns=('id', 'created_at', 'health_data', 'overall_risk_score')):
+    response = call(api, 'GET', '/export', admin_id, params={'format': fmt, 'user_id': member_id, 'columns': columns})
+    assert response.status_code == 200, response.text
+    return response
+
+
+def test_export_ndjson(api, exported_member):
+    admin_id, member_id, ids, start = exported_member
+    response = export(api, admin_id, member_id, 'ndjson')
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row['id'] for row in rows] == ids
+    assert rows[0] == {
+        'id': ids[0], 'created_at': start.isoformat(), 'health_data': HEALTH_DATA, 'overall_risk_score': 0.5
+    }
+
+
+def test_export_csv(api, exported_member):
+    admin_id, member_id, ids, start = exported_member
+    response = export(api, admin_id, member_id, 'csv')
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row['id']) for row in rows] == ids
+    assert rows[1]['created_at'] == (start + timedelta(days=1)).isoformat()
+    assert json.loads(rows[1]['health_data']) == HEALTH_DATA
+    assert float(rows[1]['overall_risk_score']) == 0.5
+
+
+def test_export_parquet(api, exported_member):
+    pq = pytest.importorskip('pyarrow.parquet')
+    admin_id, member_id, ids, start = exported_member
+    response = export(api, admin_id, member_id, 'parquet')
+
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read().to_pydict()
+    assert table['id'] == ids
+    assert table['created_at'][2] == start + timedelta(days=2)
+    assert [json.loads(value) for value in table['health_data']] == [HEALTH_DATA] * 3
+
+
+def test_export_rejects_unknown_columns_and_members(api, exported_member):
+    admin_id, member_id, _, _ = exported_member
+    response = call(api, 'GET', '/export', admin_id, params={'columns': ['id', 'password']})
+    assert response.status_code == 400
+    assert call(api, 'GET', '/export', member_id).status_code == 403
+
+
+def test_list_rows_match_the_response_schema(api, engine, make_user):
+    from app.db.session import SessionLocal
+
+    member_id = make_user()
+    created = create(api, member_id, family_history={'diabetes': True}, medications=['metformin'])['id']
+    # Rows from before model versions were recorded, timestamped on a whole second and with microseconds
+    add_assessments(engine, member_id, [datetime(2023, 5, 1), datetime(2023, 5, 2, 9, 15, 30, 250)])
+
+    items = call(api, 'GET', '/', member_id).json()['items']
+    assert items[0]['id'] == created
+    with SessionLocal() as db:
+        expected = [
+            RiskAssessmentInDB.model_validate(db.get(RiskAssessment, item['id'])).model_dump(mode='json')
+            for item in items
+        ]
+    assert items == expected
+    assert [RiskAssessmentInDB.model_validate(item).model_dump(mode='json') for item in items] == items
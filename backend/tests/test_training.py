@@ -0,0 +1,65 @@
+import os
+from datetime import date, datetime
+
+import joblib
+import numpy as np
+from sqlalchemy import insert
+
+from app.core.config import settings
+from app.models.health_record import HealthRecord
+from app.models.risk_assessment import LatestRiskAssessment, RiskAssessment
+from app.services.compiled_forest import CompiledForest
+from app.services.feature_store import FeatureStore
+from app.services.model_registry import ModelRegistry
+from app.services.training import TrainingPipeline
+
+SCORES = ('cardiovascular_risk', 'diabetes_risk', 'respiratory_risk', 'metabolic_risk', 'lifestyle_risk')
+
+
+def add_member(engine, make_user, bmi: float, overall_risk_score: float) -> int:
+    """A member with one health record and a latest assessment scoring ``overall_risk_score``"""
+    user_id = make_user()
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(HealthRecord.__table__), {
+            'user_id': user_id, 'date': date(2024, 6, 1), 'age': 30 + int(bmi) % 40, 'bmi': bmi,
+            'smoking_status': 'current' if bmi > 30 else 'never', 'created_at': now
+        })
+        assessment_id = conn.execute(insert(RiskAssessment.__table__).returning(RiskAssessment.__table__.c.id), dict(
+            user_id=user_id, health_data={'bmi': bmi}, recommendations=[], overall_risk_score=overall_risk_score,
+            created_at=now, updated_at=now, **{name: overall_risk_score for name in SCORES}
+        )).scalar_one()
+        conn.execute(insert(LatestRiskAssessment.__table__), {
+            'user_id': user_id, 'risk_assessment_id': assessment_id, 'created_at': now
+        })
+    return user_id
+
+
+def test_trains_publishes_and_loads_a_compiled_forest(engine, make_user, tmp_path, monkeypatch):
+    for name, value in (('TRAINING_MIN_ROWS', 20), ('TRAINING_MAX_ESTIMATORS', 27), ('TRAINING_CV_FOLDS', 2),
+                        ('TRAINING_SEARCH_CANDIDATES', 3)):
+        monkeypatch.setattr(settings, name, value)
+    rng = np.random.default_rng(0)
+    for bmi in rng.uniform(18, 40, 60):
+        add_member(engine, make_user, round(float(bmi), 1), 0.8 if bmi > 30 else 0.2)
+    store = FeatureStore(root=str(tmp_path / "features"))
+    store.refresh(engine)
+    registry = ModelRegistry(str(tmp_path / "registry"))
+
+    report = TrainingPipeline(store, registry, str(tmp_path / "cache"), n_jobs=1).run(engine, activate=True)
+    assert report['rows'] >= 60
+    assert 0 < report['positive_rate'] < 1
+    assert set(report['timings_s']) >= {'labels', 'rows', 'prepare', 'search', 'fit', 'publish'}
+    assert registry.current_version() == report['version']
+
+    bundle = registry.load(report['version'])
+    assert isinstance(bundle.model, CompiledForest)
+    assert bundle.preprocessing['features'] == report['features']
+    sklearn_model = joblib.load(os.path.join(registry.version_dir(report['version']), "model.joblib"))
+
+    frame = store.load()
+    X = frame.matrix()
+    missing = np.isnan(X)
+    X[missing] = np.take(np.asarray(bundle.preprocessing['medians'], dtype=np.float32), np.nonzero(missing)[1])
+    X = bundle.scaler.transform(X).astype(np.float32)
+    np.testing.assert_array_equal(bundle.model.predict_proba(X), sklearn_model.predict_proba(X))